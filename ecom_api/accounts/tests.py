@@ -1,3 +1,201 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from benchmarks.seed import BENCHMARK_PASSWORD, seed_all
+from ecom_api.query_budget import QueryBudgetMixin
+from .models import User
+from .urls import query_budgets, urlpatterns
+from .utils import generate_verification_token
+
+IN_MEMORY_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+}
+
+
+class AccountEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 0, "products": 0, "users": 20, "addresses": 10})
+        cls.user = User.objects.get(email="bench-user-0@example.com")
+        cls.unverified = User.objects.get(email="bench-user-1@example.com")
+        cls.unverified.is_email_verified = False
+        cls.unverified.save()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        response = self.client.post(
+            reverse("login"),
+            {"email": self.user.email, "password": BENCHMARK_PASSWORD},
+            format="json",
+        )
+        self.tokens = response.data["data"]
+        self.auth_client = APIClient()
+        self.auth_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_register(self):
+        response = self.assertWithinQueryBudget(
+            "register",
+            self.client.post,
+            reverse("register"),
+            {
+                "email": "new-user@example.com",
+                "first_name": "New",
+                "last_name": "User",
+                "password": "Str0ng-pass-word",
+                "password_confirm": "Str0ng-pass-word",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_verify_email(self):
+        token = generate_verification_token(self.unverified)
+        response = self.assertWithinQueryBudget(
+            "verify_email",
+            self.client.post,
+            reverse("verify_email"),
+            {"token": str(token.token)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_login(self):
+        response = self.assertWithinQueryBudget(
+            "login",
+            self.client.post,
+            reverse("login"),
+            {"email": self.user.email, "password": BENCHMARK_PASSWORD},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile(self):
+        response = self.assertWithinQueryBudget(
+            "profile", self.auth_client.get, reverse("profile")
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]["addresses"]), 10)
+
+    def test_refresh_token(self):
+        response = self.assertWithinQueryBudget(
+            "refresh_token",
+            self.client.post,
+            reverse("refresh_token"),
+            {"refresh": self.tokens["refresh"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_token_verify(self):
+        response = self.assertWithinQueryBudget(
+            "token_verify",
+            self.client.post,
+            reverse("token_verify"),
+            {"token": self.tokens["access"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_resend_verification(self):
+        response = self.assertWithinQueryBudget(
+            "resend_verification",
+            self.client.post,
+            reverse("resend_verification"),
+            {"email": self.unverified.email},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_change_password(self):
+        response = self.assertWithinQueryBudget(
+            "change_password",
+            self.auth_client.post,
+            reverse("change_password"),
+            {
+                "old_password": BENCHMARK_PASSWORD,
+                "new_password": "An0ther-pass-word",
+                "confirm_password": "An0ther-pass-word",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_forgot_password(self):
+        response = self.assertWithinQueryBudget(
+            "forgot_password",
+            self.client.post,
+            reverse("forgot_password"),
+            {"email": self.user.email},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_logout_all(self):
+        response = self.assertWithinQueryBudget(
+            "logout_all", self.auth_client.post, reverse("logout_all")
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_profile(self):
+        response = self.assertWithinQueryBudget(
+            "update_profile",
+            self.auth_client.put,
+            reverse("update_profile"),
+            {"first_name": "Updated", "profile": {"preferred_language": "hi"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    def test_profile_avatar(self):
+        avatar = SimpleUploadedFile("avatar.png", b"png", content_type="image/png")
+        response = self.assertWithinQueryBudget(
+            "profile_avatar",
+            self.auth_client.post,
+            reverse("profile_avatar"),
+            {"avatar": avatar},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    def test_profile_cover(self):
+        cover = SimpleUploadedFile("cover.png", b"png", content_type="image/png")
+        response = self.assertWithinQueryBudget(
+            "profile_cover",
+            self.auth_client.post,
+            reverse("profile_cover"),
+            {"cover": cover},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_address_list(self):
+        response = self.assertWithinQueryBudget(
+            "address_list", self.auth_client.get, reverse("address_list")
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]), 10)
+
+    def test_address_detail(self):
+        address = self.user.addresses.first()
+        response = self.assertWithinQueryBudget(
+            "address_detail",
+            self.auth_client.get,
+            reverse("address_detail", kwargs={"pk": address.pk}),
+        )
+        self.assertEqual(response.status_code, 200)
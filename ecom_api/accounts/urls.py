@@ -33,3 +33,22 @@ urlpatterns = [
     path("addresses/", views.address_list, name="address_list"),
     path("addresses/<int:pk>", views.address_detail, name="address_detail"),
 ]
+
+# Maximum SQL queries per request, enforced by accounts/tests.py
+query_budgets = {
+    "register": 4,
+    "verify_email": 7,
+    "login": 3,
+    "profile": 3,
+    "refresh_token": 13,
+    "token_verify": 1,
+    "resend_verification": 4,
+    "change_password": 4,
+    "forgot_password": 5,
+    "logout_all": 4,
+    "update_profile": 5,
+    "profile_avatar": 2,
+    "profile_cover": 2,
+    "address_list": 2,
+    "address_detail": 2,
+}
@@ -40,6 +40,7 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.shortcuts import get_object_or_404
 from accounts.models import Address
+from cart.utils import CART_TOKEN_HEADER, merge_anonymous_cart
 
 # Create your views here.
 
@@ -116,6 +117,11 @@ def login_user(request):
         is_active=True,
     )
 
+    # Move the cart the visitor filled before logging in into their account
+    cart_token = request.headers.get(CART_TOKEN_HEADER)
+    if cart_token:
+        merge_anonymous_cart(user, cart_token)
+
     return Response(
         {
             "success": True,
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import setup_databases, teardown_databases
+
+from accounts.models import User
+from benchmarks.management.commands.run_benchmarks import git_commit
+from benchmarks.scenarios import summarize
+from benchmarks.seed import seed_all
+from cart.utils import UserCart
+from orders.services import place_order
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and measure order placement "
+        "throughput with several workers checking out concurrently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--orders", type=int, default=400, help="Total orders.")
+        parser.add_argument("--lines", type=int, default=3, help="Cart lines per order.")
+        parser.add_argument(
+            "--hot-products",
+            type=int,
+            default=20,
+            help="Every order draws from this many products, so workers "
+            "contend for the same stock rows.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Result file (default: benchmarks/results/checkout-<commit>.json).",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database between runs.",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=options["keepdb"]
+        )
+        try:
+            if connection.vendor == "sqlite" and workers > 1:
+                # SQLite serialises writers with a database-wide lock.
+                self.stderr.write("SQLite does not support concurrent writers; using 1 worker.")
+                workers = 1
+            seed_all(
+                {
+                    "categories": 10,
+                    "products": options["hot_products"],
+                    "variants": 0,
+                    "images": 0,
+                    "users": workers,
+                    "addresses": 1,
+                }
+            )
+            Product.objects.update(
+                stock_quantity=10**6, track_inventory=True, allow_backorder=False
+            )
+            result = self.run_workers(workers, options)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+
+        report = {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "workers": workers,
+            "lines": options["lines"],
+            "hot_products": options["hot_products"],
+            "result": result,
+        }
+        output = Path(
+            options["output"]
+            or Path(settings.BASE_DIR)
+            / "benchmarks"
+            / "results"
+            / f"checkout-{report['commit']}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+
+        self.stdout.write(
+            f"{result['orders']} orders by {workers} workers in {result['seconds']:.2f}s: "
+            f"{result['orders_per_second']:.1f} orders/s, "
+            f"median {result['median_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+    def run_workers(self, workers, options):
+        users = list(
+            User.objects.filter(email__startswith="bench-user-")
+            .prefetch_related("addresses")
+            .order_by("id")[:workers]
+        )
+        product_ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+        per_worker = max(1, options["orders"] // workers)
+        lines = options["lines"]
+        timings = []
+        lock = threading.Lock()
+
+        def work(index):
+            user = users[index]
+            address = user.addresses.all()[0]
+            cart = UserCart(user)
+            local = []
+            try:
+                for number in range(per_worker):
+                    for line in range(lines):
+                        position = (index + number + line) % len(product_ids)
+                        cart.add(product_ids[position])
+                    start = time.perf_counter()
+                    place_order(user, address=address)
+                    local.append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+            with lock:
+                timings.extend(local)
+
+        start = time.perf_counter()
+        # Measure placement only, not the broker round trip of the email task
+        with mock.patch("orders.services.send_order_confirmation"):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(work, range(workers)))
+        elapsed = time.perf_counter() - start
+
+        result = summarize(timings, queries=None)
+        result.update(
+            {
+                "orders": len(timings),
+                "seconds": round(elapsed, 3),
+                # Wall-clock throughput; includes filling the carts
+                "orders_per_second": round(len(timings) / elapsed, 2),
+            }
+        )
+        return result
@@ -0,0 +1,131 @@
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.management.commands.run_benchmarks import git_commit
+from benchmarks.scenarios import summarize
+from benchmarks.seed import seed_all
+from ecom_api import renderers
+from products.models import Product
+from products.serializers import (
+    CategorySerializers,
+    ProductListSerializer,
+    main_image_subquery,
+)
+from products.utils import CategoryTree
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and compare JSONRenderer with "
+        "ORJSONRenderer on the category tree and product list payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=500)
+        parser.add_argument("--products", type=int, default=100, help="Products per list page.")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--output",
+            help="Result file (default: benchmarks/results/json-<commit>.json).",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database between runs.",
+        )
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError("orjson is not installed.")
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=options["keepdb"]
+        )
+        try:
+            seed_all(
+                {
+                    "categories": options["categories"],
+                    "products": options["products"],
+                    "images": 1,
+                    "users": 0,
+                }
+            )
+            payloads = self.build_payloads(options["products"])
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+
+        results = {
+            name: self.compare(data, options["iterations"])
+            for name, data in payloads.items()
+        }
+        report = {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "orjson": renderers.orjson.__version__,
+            "results": results,
+        }
+        output = Path(
+            options["output"]
+            or Path(settings.BASE_DIR)
+            / "benchmarks"
+            / "results"
+            / f"json-{report['commit']}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name}: {result['bytes']} bytes, "
+                f"json {result['json']['median_ms']:.3f} ms, "
+                f"orjson {result['orjson']['median_ms']:.3f} ms "
+                f"({result['speedup']:.1f}x)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+    def build_payloads(self, page_size):
+        tree = CategoryTree.build()
+        products = (
+            Product.objects.select_related("category")
+            .only(*ProductListSerializer.only_fields)
+            .annotate(main_image_path=main_image_subquery())
+            .order_by("-created_at", "-id")[:page_size]
+        )
+        return {
+            "category_tree": CategorySerializers(
+                tree.roots(), many=True, context={"category_tree": tree}
+            ).data,
+            "product_list": {
+                "next": None,
+                "results": ProductListSerializer(products, many=True).data,
+            },
+        }
+
+    def compare(self, data, iterations):
+        result = {}
+        outputs = {}
+        for name, renderer in (
+            ("json", JSONRenderer()),
+            ("orjson", renderers.ORJSONRenderer()),
+        ):
+            renderer.render(data)
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                outputs[name] = renderer.render(data)
+                timings.append(time.perf_counter() - start)
+            result[name] = summarize(timings, queries=None)
+        result["bytes"] = len(outputs["json"])
+        result["identical"] = outputs["json"] == outputs["orjson"]
+        result["speedup"] = round(
+            result["json"]["median_ms"] / result["orjson"]["median_ms"], 2
+        )
+        return result
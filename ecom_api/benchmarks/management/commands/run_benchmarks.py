@@ -0,0 +1,140 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from benchmarks.scenarios import ENDPOINT_SCENARIOS, get_access_token, run_scenario
+from benchmarks.seed import DEFAULT_VOLUMES, seed_all
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic catalog/user data, "
+        "time the main API endpoints and write the results to a JSON file."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f"--{name}", type=int, default=default)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Only run the named scenario (repeatable).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Result file (default: benchmarks/results/<commit>.json).",
+        )
+        parser.add_argument(
+            "--compare", help="Previous result file to print deltas against."
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database between runs.",
+        )
+
+    def handle(self, *args, **options):
+        volumes = {name: options[name] for name in DEFAULT_VOLUMES}
+        scenarios = [
+            scenario
+            for scenario in ENDPOINT_SCENARIOS
+            if not options["scenarios"] or scenario["name"] in options["scenarios"]
+        ]
+
+        # The test client's requests go to "testserver", which the test
+        # environment adds to ALLOWED_HOSTS
+        setup_test_environment()
+        try:
+            old_config = setup_databases(
+                verbosity=0, interactive=False, keepdb=options["keepdb"]
+            )
+            try:
+                self.stdout.write(f"Seeding {volumes} ...")
+                seed_all(volumes)
+                cache.clear()
+                results = self.run_scenarios(scenarios, options["iterations"])
+            finally:
+                teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+        finally:
+            teardown_test_environment()
+
+        report = {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "volumes": volumes,
+            "results": results,
+        }
+        output = Path(
+            options["output"]
+            or Path(settings.BASE_DIR) / "benchmarks" / "results" / f"{report['commit']}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+
+        previous = None
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text())["results"]
+        self.print_results(results, previous)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+    def run_scenarios(self, scenarios, iterations):
+        results = {}
+        # Benchmarks issue far more requests than the API throttles allow.
+        with mock.patch.dict(
+            SimpleRateThrottle.THROTTLE_RATES, {"anon": None, "user": None}
+        ):
+            token = get_access_token(APIClient())
+            for scenario in scenarios:
+                self.stdout.write(f"  {scenario['name']} ...")
+                results[scenario["name"]] = run_scenario(scenario, iterations, token)
+        return results
+
+    def print_results(self, results, previous=None):
+        header = f"{'scenario':<24}{'median ms':>12}{'p95 ms':>12}{'queries':>10}"
+        if previous:
+            header += f"{'median Δ':>12}"
+        self.stdout.write(header)
+        for name, result in results.items():
+            line = (
+                f"{name:<24}{result['median_ms']:>12.2f}"
+                f"{result['p95_ms']:>12.2f}{result['queries']:>10}"
+            )
+            if previous and name in previous:
+                before = previous[name]["median_ms"]
+                change = (result["median_ms"] - before) / before * 100 if before else 0
+                line += f"{change:>+11.1f}%"
+            self.stdout.write(line)
@@ -0,0 +1,101 @@
+"""
+Endpoint benchmark scenarios.
+
+Each scenario is timed ``iterations`` times through the full Django stack
+(URL routing, middleware, authentication, serialization) with DRF's test
+client. ``cold`` scenarios clear the cache before every iteration;
+``revalidate`` scenarios send the ETag of the warm-up response back in
+If-None-Match, as a client holding a cached copy would.
+"""
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .seed import BENCHMARK_PASSWORD
+
+BENCHMARK_USER = "bench-user-0@example.com"
+
+ENDPOINT_SCENARIOS = [
+    {"name": "category_tree_cold", "url": "/api/category/tree/", "cold": True},
+    {"name": "category_tree_warm", "url": "/api/category/tree/"},
+    {
+        "name": "category_tree_not_modified",
+        "url": "/api/category/tree/",
+        "revalidate": True,
+    },
+    {"name": "category_list", "url": "/api/category/"},
+    {
+        "name": "login_user",
+        "method": "post",
+        "url": "/api/auth/login/",
+        "data": {"email": BENCHMARK_USER, "password": BENCHMARK_PASSWORD},
+    },
+    {"name": "get_user_profile", "url": "/api/auth/profile/", "auth": True},
+    {"name": "address_list", "url": "/api/auth/addresses/", "auth": True},
+    {"name": "order_list", "url": "/api/orders/", "auth": True},
+]
+
+
+def get_access_token(client, email=BENCHMARK_USER):
+    response = client.post(
+        "/api/auth/login/",
+        {"email": email, "password": BENCHMARK_PASSWORD},
+        format="json",
+    )
+    if response.status_code != 200:
+        raise CommandError(
+            f"Logging in as {email} returned {response.status_code}: "
+            f"{response.content[:200]!r}"
+        )
+    return response.data["data"]["access"]
+
+
+def summarize(timings, queries):
+    timings = sorted(timings)
+    p95_index = max(0, int(round(len(timings) * 0.95)) - 1)
+    return {
+        "iterations": len(timings),
+        "min_ms": round(timings[0] * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "p95_ms": round(timings[p95_index] * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+        "queries": queries,
+    }
+
+
+def run_scenario(scenario, iterations, token=None):
+    client = APIClient()
+    if scenario.get("auth"):
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    request = getattr(client, scenario.get("method", "get"))
+
+    # Warm-up request so import/URL resolution costs are not measured.
+    response = request(scenario["url"], scenario.get("data"), format="json")
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f"{scenario['name']} returned {response.status_code}: {response.content[:200]}"
+        )
+
+    headers = {}
+    if scenario.get("revalidate"):
+        headers["If-None-Match"] = response["ETag"]
+
+    timings = []
+    queries = 0
+    for _ in range(iterations):
+        if scenario.get("cold"):
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            request(
+                scenario["url"], scenario.get("data"), format="json", headers=headers
+            )
+            timings.append(time.perf_counter() - start)
+        queries = len(captured)
+    return summarize(timings, queries)
@@ -0,0 +1,162 @@
+"""
+Synthetic data for benchmarks and query-budget tests.
+
+Everything is written with ``bulk_create`` so large volumes seed quickly;
+the model ``save()`` hooks (slug/SKU generation) are bypassed by providing
+those values up front.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+
+from accounts.models import Address, User, UserProfile
+from products.models import Category, Product, ProductImage, ProductVariant
+
+BENCHMARK_PASSWORD = "Bench-pass-123"
+
+DEFAULT_VOLUMES = {
+    "categories": 100,
+    "products": 1000,
+    "variants": 3,
+    "images": 2,
+    "users": 50,
+    "addresses": 3,
+}
+
+
+def seed_categories(count, rng, max_depth=3):
+    """Create ``count`` categories spread over ``max_depth`` levels."""
+    roots = max(1, count // 10)
+    created = []
+    levels = [[]]
+    for index in range(count):
+        depth = 0 if index < roots else rng.randint(1, max_depth - 1)
+        while depth and not levels[depth - 1]:
+            depth -= 1
+        parent = rng.choice(levels[depth - 1]) if depth else None
+        category = Category.objects.create(
+            name=f"Bench Category {index}",
+            slug=f"bench-category-{index}",
+            parent=parent,
+            order=index % 10,
+        )
+        created.append(category)
+        while len(levels) <= depth:
+            levels.append([])
+        levels[depth].append(category)
+    return created
+
+
+def seed_products(count, categories, rng, variants=0, images=0):
+    products = [
+        Product(
+            name=f"Bench Product {index}",
+            slug=f"bench-product-{index}",
+            sku=f"BEN-{index:08d}",
+            description="Synthetic benchmark product",
+            category=rng.choice(categories) if categories else None,
+            price=Decimal(rng.randint(100, 100000)) / 100,
+            compare_at_price=(
+                Decimal(rng.randint(100000, 150000)) / 100 if index % 3 == 0 else None
+            ),
+            stock_quantity=rng.randint(0, 200),
+            weight=Decimal(rng.randint(1, 500)) / 100,
+            is_digital=index % 10 == 0,
+        )
+        for index in range(count)
+    ]
+    Product.objects.bulk_create(products, batch_size=500)
+    # MySQL does not return primary keys from bulk inserts.
+    product_ids = list(
+        Product.objects.filter(sku__startswith="BEN-")
+        .order_by("sku")
+        .values_list("id", "sku")
+    )
+
+    ProductImage.objects.bulk_create(
+        [
+            ProductImage(
+                product_id=product_id,
+                image=f"products/bench/{sku}-{position}.jpg",
+                is_primary=position == 0,
+                display_order=position,
+            )
+            for product_id, sku in product_ids
+            for position in range(images)
+        ],
+        batch_size=1000,
+    )
+    ProductVariant.objects.bulk_create(
+        [
+            ProductVariant(
+                product_id=product_id,
+                variant_type="size",
+                variant_value=f"Size {position}",
+                sku=f"{sku}-S{position}",
+                price_adjustment=Decimal(position),
+                stock_quantity=rng.randint(0, 50),
+                display_order=position,
+            )
+            for product_id, sku in product_ids
+            for position in range(variants)
+        ],
+        batch_size=1000,
+    )
+    return product_ids
+
+
+def seed_users(count, addresses=0):
+    password = make_password(BENCHMARK_PASSWORD)
+    User.objects.bulk_create(
+        [
+            User(
+                email=f"bench-user-{index}@example.com",
+                first_name="Bench",
+                last_name=str(index),
+                password=password,
+                is_email_verified=True,
+            )
+            for index in range(count)
+        ],
+        batch_size=500,
+    )
+    user_ids = list(
+        User.objects.filter(email__startswith="bench-user-").values_list("id", flat=True)
+    )
+    UserProfile.objects.bulk_create(
+        [UserProfile(user_id=user_id) for user_id in user_ids], batch_size=500
+    )
+    Address.objects.bulk_create(
+        [
+            Address(
+                user_id=user_id,
+                full_name=f"Bench User {user_id}",
+                address_line_1=f"{position} Benchmark Street",
+                city="Pune",
+                state="MH",
+                postal_code="411001",
+                is_default_shipping=position == 0,
+            )
+            for user_id in user_ids
+            for position in range(addresses)
+        ],
+        batch_size=1000,
+    )
+    return user_ids
+
+
+def seed_all(volumes=None, seed=42):
+    """Seed every benchmark dataset; returns the volumes used."""
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    rng = random.Random(seed)
+    categories = seed_categories(volumes["categories"], rng)
+    seed_products(
+        volumes["products"],
+        categories,
+        rng,
+        variants=volumes["variants"],
+        images=volumes["images"],
+    )
+    seed_users(volumes["users"], addresses=volumes["addresses"])
+    return volumes
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:23
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    """Fold variant-less lines added twice into the first of them."""
+    CartItem = apps.get_model('cart', 'CartItem')
+    lines = CartItem.objects.filter(variant__isnull=True)
+    duplicates = (
+        lines.values('cart_id', 'product_id')
+        .annotate(lines=Count('id'), first=Min('id'), quantity=Sum('quantity'))
+        .filter(lines__gt=1)
+    )
+    for duplicate in duplicates:
+        lines.filter(pk=duplicate['first']).update(quantity=duplicate['quantity'])
+        lines.filter(
+            cart_id=duplicate['cart_id'], product_id=duplicate['product_id']
+        ).exclude(pk=duplicate['first']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+        ('products', '0006_child_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(condition=models.Q(('variant__isnull', True)), fields=('cart', 'product'), name='unique_cart_product_without_variant'),
+        ),
+    ]
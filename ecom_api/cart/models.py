@@ -1,3 +1,67 @@
 from django.db import models
+from django.conf import settings
+from django.core.validators import MinValueValidator
 
-# Create your models here.
+
+class Cart(models.Model):
+    """Persistent cart of a logged-in user (anonymous carts live in the cache)."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='cart'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'carts'
+        verbose_name = 'Cart'
+        verbose_name_plural = 'Carts'
+
+    def __str__(self):
+        return f"Cart of {self.user.email}"
+
+
+class CartItem(models.Model):
+    cart = models.ForeignKey(
+        Cart,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='cart_items'
+    )
+    variant = models.ForeignKey(
+        'products.ProductVariant',
+        on_delete=models.CASCADE,
+        related_name='cart_items',
+        blank=True,
+        null=True
+    )
+    quantity = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)]
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'cart_items'
+        ordering = ['created_at']
+        unique_together = ['cart', 'product', 'variant']
+        constraints = [
+            # NULL variants never clash in unique_together; MySQL lacks
+            # partial indexes and relies on UserCart locking the cart row
+            models.UniqueConstraint(
+                fields=['cart', 'product'],
+                condition=models.Q(variant__isnull=True),
+                name='unique_cart_product_without_variant'
+            ),
+        ]
+        verbose_name = 'Cart Item'
+        verbose_name_plural = 'Cart Items'
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id}"
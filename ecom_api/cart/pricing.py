@@ -0,0 +1,201 @@
+"""
+Batched cart pricing.
+
+``price_cart`` prices every line of a cart with at most two queries (one for
+the products, one for the variants when any line has one) and a single pass
+over the lines, instead of letting ``ProductVariant.final_price`` and
+``Product.discount_percentage`` lazily load each product.
+"""
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from products.models import Product, ProductVariant
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+
+PRODUCT_PRICING_FIELDS = (
+    "id",
+    "name",
+    "sku",
+    "price",
+    "compare_at_price",
+    "weight",
+    "is_active",
+    "is_digital",
+    "track_inventory",
+    "allow_backorder",
+    "stock_quantity",
+    "category_id",
+    "vendor_id",
+)
+VARIANT_PRICING_FIELDS = (
+    "id",
+    "product_id",
+    "sku",
+    "variant_value",
+    "price_adjustment",
+    "weight_adjustment",
+    "stock_quantity",
+    "is_active",
+)
+
+
+@dataclass
+class PricedLine:
+    product_id: int
+    variant_id: int = None
+    quantity: int = 0
+    name: str = ""
+    sku: str = ""
+    available: bool = False
+    in_stock: bool = False
+    is_digital: bool = False
+    category_id: int = None
+    vendor_id: int = None
+    unit_price: Decimal = ZERO
+    compare_at_price: Decimal = None
+    line_total: Decimal = ZERO
+    discount: Decimal = ZERO
+    weight: Decimal = ZERO
+
+    def as_dict(self):
+        return {
+            "product": self.product_id,
+            "variant": self.variant_id,
+            "quantity": self.quantity,
+            "name": self.name,
+            "sku": self.sku,
+            "available": self.available,
+            "in_stock": self.in_stock,
+            "is_digital": self.is_digital,
+            "unit_price": str(self.unit_price),
+            "compare_at_price": (
+                str(self.compare_at_price) if self.compare_at_price is not None else None
+            ),
+            "line_total": str(self.line_total),
+            "discount": str(self.discount),
+            "weight": str(self.weight),
+        }
+
+
+@dataclass
+class CartPricing:
+    lines: list = field(default_factory=list)
+    item_count: int = 0
+    subtotal: Decimal = ZERO
+    discount_total: Decimal = ZERO
+    # Shipping weight; digital lines are excluded
+    total_weight: Decimal = ZERO
+    digital_subtotal: Decimal = ZERO
+    physical_subtotal: Decimal = ZERO
+
+    @property
+    def requires_shipping(self):
+        return self.physical_subtotal > 0
+
+    def as_dict(self):
+        return {
+            "items": [line.as_dict() for line in self.lines],
+            "item_count": self.item_count,
+            "subtotal": str(self.subtotal),
+            "discount_total": str(self.discount_total),
+            "total_weight": str(self.total_weight),
+            "digital_subtotal": str(self.digital_subtotal),
+            "physical_subtotal": str(self.physical_subtotal),
+            "requires_shipping": self.requires_shipping,
+        }
+
+
+def load_catalog(lines):
+    """Products and variants referenced by ``lines``, keyed by id."""
+    product_ids = {product_id for product_id, variant_id, quantity in lines}
+    variant_ids = {variant_id for product_id, variant_id, quantity in lines if variant_id}
+
+    products = {
+        product.id: product
+        for product in Product.objects.filter(id__in=product_ids).only(
+            *PRODUCT_PRICING_FIELDS
+        )
+    }
+    variants = {}
+    if variant_ids:
+        product_field = ProductVariant._meta.get_field("product")
+        for variant in ProductVariant.objects.filter(id__in=variant_ids).only(
+            *VARIANT_PRICING_FIELDS
+        ):
+            # Reuse the product we already loaded so final_price/final_weight
+            # never trigger a lazy load
+            product_field.set_cached_value(variant, products.get(variant.product_id))
+            variants[variant.id] = variant
+    return products, variants
+
+
+def price_line(product_id, variant_id, quantity, product, variant):
+    line = PricedLine(product_id=product_id, variant_id=variant_id, quantity=quantity)
+    if product is None or not product.is_active:
+        return line
+    if variant_id and (
+        variant is None or not variant.is_active or variant.product_id != product_id
+    ):
+        return line
+
+    line.available = True
+    line.name = product.name
+    line.sku = product.sku
+    line.is_digital = product.is_digital
+    line.category_id = product.category_id
+    line.vendor_id = product.vendor_id
+
+    unit_price = product.price
+    compare_at = product.compare_at_price
+    weight = product.weight or ZERO
+    if variant is not None:
+        line.name = f"{product.name} - {variant.variant_value}"
+        line.sku = variant.sku
+        unit_price = variant.final_price
+        weight = variant.final_weight
+        if compare_at is not None:
+            compare_at += variant.price_adjustment
+        line.in_stock = variant.is_in_stock or product.allow_backorder
+    else:
+        line.in_stock = product.is_in_stock or product.allow_backorder
+
+    line.unit_price = unit_price.quantize(CENT)
+    line.line_total = (unit_price * quantity).quantize(CENT)
+    line.weight = (weight * quantity).quantize(CENT)
+    if compare_at is not None and compare_at > unit_price:
+        line.compare_at_price = compare_at.quantize(CENT)
+        line.discount = ((compare_at - unit_price) * quantity).quantize(CENT)
+    return line
+
+
+def price_cart(lines):
+    """
+    Price ``(product_id, variant_id, quantity)`` lines in one pass.
+
+    Lines whose product or variant is missing or inactive are returned with
+    ``available=False`` and left out of every total.
+    """
+    products, variants = load_catalog(lines)
+    pricing = CartPricing()
+    for product_id, variant_id, quantity in lines:
+        line = price_line(
+            product_id,
+            variant_id,
+            quantity,
+            products.get(product_id),
+            variants.get(variant_id),
+        )
+        pricing.lines.append(line)
+        if not line.available:
+            continue
+        pricing.item_count += quantity
+        pricing.subtotal += line.line_total
+        pricing.discount_total += line.discount
+        if line.is_digital:
+            pricing.digital_subtotal += line.line_total
+        else:
+            pricing.physical_subtotal += line.line_total
+            pricing.total_weight += line.weight
+    return pricing
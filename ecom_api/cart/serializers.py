@@ -0,0 +1,26 @@
+from rest_framework import serializers
+from products.models import Product, ProductVariant
+
+
+class CartItemSerializer(serializers.Serializer):
+    product = serializers.PrimaryKeyRelatedField(
+        queryset=Product.objects.filter(is_active=True)
+    )
+    variant = serializers.PrimaryKeyRelatedField(
+        queryset=ProductVariant.objects.filter(is_active=True),
+        required=False,
+        allow_null=True,
+    )
+    quantity = serializers.IntegerField(min_value=0, default=1)
+
+    def validate(self, attrs):
+        variant = attrs.get("variant")
+        if variant and variant.product_id != attrs["product"].id:
+            raise serializers.ValidationError(
+                {"variant": "Variant does not belong to this product."}
+            )
+        if self.context.get("adding") and attrs["quantity"] < 1:
+            raise serializers.ValidationError(
+                {"quantity": "Quantity must be at least 1."}
+            )
+        return attrs
@@ -1,3 +1,217 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from benchmarks.seed import BENCHMARK_PASSWORD, seed_all
+from ecom_api.query_budget import QueryBudgetMixin
+from products.models import Product, ProductVariant
+from .models import CartItem
+from .pricing import price_cart
+from .urls import query_budgets, urlpatterns
+from .utils import CART_TOKEN_HEADER, UserCart
+
+
+class CartTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 5, "products": 10, "users": 2, "addresses": 0})
+        cls.user = User.objects.get(email="bench-user-0@example.com")
+        cls.products = list(Product.objects.order_by("id")[:3])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def add(self, client, product, quantity=1, token=None, variant=None):
+        headers = {CART_TOKEN_HEADER: token} if token else {}
+        return self.assertWithinQueryBudget(
+            "cart_items",
+            client.post,
+            reverse("cart_items"),
+            {"product": product.id, "variant": variant, "quantity": quantity},
+            format="json",
+            headers=headers,
+        )
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_anonymous_cart_lives_in_cache(self):
+        response = self.add(self.client, self.products[0], 2)
+        token = response.data["data"]["cart_token"]
+        self.add(self.client, self.products[0], 1, token=token)
+
+        response = self.assertWithinQueryBudget(
+            "cart_detail",
+            self.client.get,
+            reverse("cart_detail"),
+            headers={CART_TOKEN_HEADER: token},
+        )
+        data = response.data["data"]
+        self.assertEqual(len(data["items"]), 1)
+        self.assertEqual(data["items"][0]["quantity"], 3)
+        self.assertEqual(data["item_count"], 3)
+        self.assertEqual(data["subtotal"], str(self.products[0].price * 3))
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_anonymous_cart_merges_on_login(self):
+        client = APIClient()
+        response = client.post(
+            reverse("login"),
+            {"email": self.user.email, "password": BENCHMARK_PASSWORD},
+            format="json",
+        )
+        auth = APIClient()
+        auth.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['data']['access']}")
+        self.add(auth, self.products[0], 1)
+
+        token = self.add(self.client, self.products[0], 2).data["data"]["cart_token"]
+        self.add(self.client, self.products[1], 1, token=token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("login"),
+                {"email": self.user.email, "password": BENCHMARK_PASSWORD},
+                format="json",
+                headers={CART_TOKEN_HEADER: token},
+            )
+
+        quantities = dict(
+            CartItem.objects.filter(cart__user=self.user).values_list(
+                "product_id", "quantity"
+            )
+        )
+        self.assertEqual(
+            quantities, {self.products[0].id: 3, self.products[1].id: 1}
+        )
+        self.assertIsNone(cache.get(f"cart:anon:{token}"))
+
+    def test_patch_zero_removes_line(self):
+        token = self.add(self.client, self.products[0]).data["data"]["cart_token"]
+        response = self.client.patch(
+            reverse("cart_items"),
+            {"product": self.products[0].id, "quantity": 0},
+            format="json",
+            headers={CART_TOKEN_HEADER: token},
+        )
+        self.assertEqual(response.data["data"]["items"], [])
+
+    def test_user_cart_keeps_one_line_per_product(self):
+        cart = UserCart(self.user)
+        cart.add(self.products[0].id)
+        cart.set_quantity(self.products[0].id, quantity=4)
+        cart.add(self.products[0].id, quantity=2)
+        self.assertEqual(cart.lines(), [(self.products[0].id, None, 6)])
+
+        # A NULL variant does not clash in unique_together
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CartItem.objects.create(
+                cart=self.user.cart, product=self.products[0], quantity=1
+            )
+
+
+class PriceCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.shirt = Product.objects.create(
+            name="Shirt",
+            description="Shirt",
+            price=Decimal("20.00"),
+            compare_at_price=Decimal("25.00"),
+            weight=Decimal("0.50"),
+            stock_quantity=10,
+        )
+        cls.large = ProductVariant.objects.create(
+            product=cls.shirt,
+            variant_type="size",
+            variant_value="L",
+            price_adjustment=Decimal("2.00"),
+            weight_adjustment=Decimal("0.10"),
+            stock_quantity=5,
+        )
+        cls.ebook = Product.objects.create(
+            name="Ebook",
+            description="Ebook",
+            price=Decimal("9.99"),
+            is_digital=True,
+            stock_quantity=1,
+        )
+        cls.retired = Product.objects.create(
+            name="Retired",
+            description="Retired",
+            price=Decimal("5.00"),
+            is_active=False,
+        )
+
+    def price(self, lines):
+        # One query for the products and one for the variants
+        with self.assertNumQueries(2):
+            return price_cart(lines)
+
+    def test_variant_lines_use_the_variant_price(self):
+        pricing = self.price(
+            [(self.shirt.id, None, 2), (self.shirt.id, self.large.id, 1)]
+        )
+        plain, large = pricing.lines
+        self.assertEqual(plain.unit_price, Decimal("20.00"))
+        self.assertEqual(plain.line_total, Decimal("40.00"))
+        self.assertEqual(large.unit_price, Decimal("22.00"))
+        self.assertEqual(large.name, "Shirt - L")
+        self.assertEqual(large.sku, self.large.sku)
+        self.assertEqual(pricing.subtotal, Decimal("62.00"))
+        self.assertEqual(pricing.item_count, 3)
+
+    def test_compare_at_price_discount(self):
+        pricing = self.price(
+            [
+                (self.shirt.id, None, 2),
+                (self.shirt.id, self.large.id, 1),
+                (self.ebook.id, None, 1),
+            ]
+        )
+        plain, large, ebook = pricing.lines
+        self.assertEqual(plain.compare_at_price, Decimal("25.00"))
+        self.assertEqual(plain.discount, Decimal("10.00"))
+        # The variant adjustment applies to the compare-at price as well
+        self.assertEqual(large.compare_at_price, Decimal("27.00"))
+        self.assertEqual(large.discount, Decimal("5.00"))
+        self.assertIsNone(ebook.compare_at_price)
+        self.assertEqual(ebook.discount, Decimal("0"))
+        self.assertEqual(pricing.discount_total, Decimal("15.00"))
+
+    def test_digital_and_physical_subtotals(self):
+        pricing = self.price(
+            [
+                (self.shirt.id, self.large.id, 1),
+                (self.ebook.id, None, 3),
+                (self.retired.id, None, 4),
+            ]
+        )
+        self.assertEqual(pricing.physical_subtotal, Decimal("22.00"))
+        self.assertEqual(pricing.digital_subtotal, Decimal("29.97"))
+        self.assertEqual(pricing.subtotal, Decimal("51.97"))
+        self.assertTrue(pricing.requires_shipping)
+        # Inactive products are returned but left out of every total
+        self.assertFalse(pricing.lines[2].available)
+        self.assertEqual(pricing.item_count, 4)
 
-# Create your tests here.
+    def test_total_weight_excludes_digital_lines(self):
+        pricing = self.price(
+            [
+                (self.shirt.id, None, 2),
+                (self.shirt.id, self.large.id, 1),
+                (self.ebook.id, None, 3),
+            ]
+        )
+        self.assertEqual(
+            [line.weight for line in pricing.lines],
+            [Decimal("1.00"), Decimal("0.60"), Decimal("0.00")],
+        )
+        self.assertEqual(pricing.total_weight, Decimal("1.60"))
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.cart_detail, name="cart_detail"),
+    path("items/", views.cart_items, name="cart_items"),
+]
+
+# Maximum SQL queries per request, enforced by cart/tests.py
+query_budgets = {
+    "cart_detail": 2,
+    "cart_items": 14,
+}
@@ -0,0 +1,196 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from products.models import Product, ProductVariant
+from .models import Cart, CartItem
+
+CART_TOKEN_HEADER = "X-Cart-Token"
+
+
+def _line_key(product_id, variant_id):
+    return f"{product_id}:{variant_id or ''}"
+
+
+def _parse_line_key(key):
+    product_id, _, variant_id = key.partition(":")
+    return int(product_id), int(variant_id) if variant_id else None
+
+
+class AnonymousCart:
+    """
+    Cart of a visitor who is not logged in, stored in the shared cache.
+
+    The client keeps the cart token (sent back in ``X-Cart-Token``) so adding
+    to and reading the cart never touches the database.
+    """
+
+    def __init__(self, token=None):
+        self.token = token or uuid.uuid4().hex
+
+    @property
+    def cache_key(self):
+        return f"cart:anon:{self.token}"
+
+    def _load(self):
+        return cache.get(self.cache_key) or {}
+
+    def _store(self, lines):
+        if lines:
+            cache.set(self.cache_key, lines, timeout=settings.ANONYMOUS_CART_TTL)
+        else:
+            cache.delete(self.cache_key)
+
+    def lines(self):
+        """List of ``(product_id, variant_id, quantity)``."""
+        return [
+            (*_parse_line_key(key), quantity) for key, quantity in self._load().items()
+        ]
+
+    def add(self, product_id, variant_id=None, quantity=1):
+        lines = self._load()
+        key = _line_key(product_id, variant_id)
+        lines[key] = lines.get(key, 0) + quantity
+        self._store(lines)
+
+    def set_quantity(self, product_id, variant_id=None, quantity=1):
+        lines = self._load()
+        key = _line_key(product_id, variant_id)
+        if quantity:
+            lines[key] = quantity
+        else:
+            lines.pop(key, None)
+        self._store(lines)
+
+    def clear(self):
+        cache.delete(self.cache_key)
+
+
+class UserCart:
+    """Database backed cart of an authenticated user."""
+
+    token = None
+
+    def __init__(self, user):
+        self.user = user
+
+    def _locked_cart(self):
+        """
+        The user's cart row, locked until the transaction ends.
+
+        Concurrent writes to the same cart queue up behind the lock, so the
+        update-or-create of a line never races another request's.
+        """
+        cart, created = Cart.objects.select_for_update().get_or_create(user=self.user)
+        return cart
+
+    def _items(self):
+        return CartItem.objects.filter(cart__user=self.user)
+
+    def lines(self):
+        return list(self._items().values_list("product_id", "variant_id", "quantity"))
+
+    def add(self, product_id, variant_id=None, quantity=1):
+        with transaction.atomic():
+            cart = self._locked_cart()
+            updated = CartItem.objects.filter(
+                cart=cart, product_id=product_id, variant_id=variant_id
+            ).update(quantity=F("quantity") + quantity)
+            if not updated:
+                CartItem.objects.create(
+                    cart=cart,
+                    product_id=product_id,
+                    variant_id=variant_id,
+                    quantity=quantity,
+                )
+
+    def set_quantity(self, product_id, variant_id=None, quantity=1):
+        if not quantity:
+            self._items().filter(product_id=product_id, variant_id=variant_id).delete()
+            return
+        with transaction.atomic():
+            cart = self._locked_cart()
+            items = CartItem.objects.filter(
+                cart=cart, product_id=product_id, variant_id=variant_id
+            )
+            if not items.update(quantity=quantity):
+                CartItem.objects.create(
+                    cart=cart,
+                    product_id=product_id,
+                    variant_id=variant_id,
+                    quantity=quantity,
+                )
+
+    def clear(self):
+        self._items().delete()
+
+
+def get_cart(request):
+    """Cart for the current request: the user's cart or the anonymous one."""
+    if request.user.is_authenticated:
+        return UserCart(request.user)
+    return AnonymousCart(request.headers.get(CART_TOKEN_HEADER))
+
+
+def merge_anonymous_cart(user, token):
+    """
+    Move an anonymous cart into ``user``'s persistent cart.
+
+    Quantities of lines already in the user's cart are added together. All
+    writes happen in one transaction and the cached cart is only dropped
+    once it has committed.
+    """
+    anonymous = AnonymousCart(token)
+    lines = anonymous.lines()
+    if not lines:
+        return 0
+
+    # Drop lines whose product or variant was removed since it was added
+    product_ids = set(
+        Product.objects.filter(
+            id__in={line[0] for line in lines}, is_active=True
+        ).values_list("id", flat=True)
+    )
+    variant_ids = {line[1] for line in lines if line[1]}
+    if variant_ids:
+        variant_ids = set(
+            ProductVariant.objects.filter(
+                id__in=variant_ids, is_active=True
+            ).values_list("id", flat=True)
+        )
+    lines = [
+        line
+        for line in lines
+        if line[0] in product_ids and (line[1] is None or line[1] in variant_ids)
+    ]
+
+    with transaction.atomic():
+        cart, created = Cart.objects.select_for_update().get_or_create(user=user)
+        existing = {
+            (item.product_id, item.variant_id): item
+            for item in ([] if created else cart.items.all())
+        }
+        to_update, to_create = [], []
+        for product_id, variant_id, quantity in lines:
+            item = existing.get((product_id, variant_id))
+            if item:
+                item.quantity += quantity
+                to_update.append(item)
+            else:
+                to_create.append(
+                    CartItem(
+                        cart=cart,
+                        product_id=product_id,
+                        variant_id=variant_id,
+                        quantity=quantity,
+                    )
+                )
+        if to_update:
+            CartItem.objects.bulk_update(to_update, ["quantity"])
+        if to_create:
+            CartItem.objects.bulk_create(to_create)
+        transaction.on_commit(anonymous.clear)
+    return len(lines)
@@ -1,3 +1,77 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
-# Create your views here.
+from .pricing import price_cart
+from .serializers import CartItemSerializer
+from .utils import get_cart
+
+
+def cart_response(cart, message, status_code=status.HTTP_200_OK):
+    return Response(
+        {
+            "success": True,
+            "message": message,
+            "data": {
+                "cart_token": cart.token,
+                **price_cart(cart.lines()).as_dict(),
+            },
+        },
+        status=status_code,
+    )
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([AllowAny])
+def cart_detail(request):
+    """
+    Retrieve or empty the current cart.
+    GET /api/cart/
+    DELETE /api/cart/
+
+    Logged-in users get their persistent cart; anonymous visitors pass the
+    token returned by earlier cart calls in the X-Cart-Token header.
+    """
+    cart = get_cart(request)
+    if request.method == "DELETE":
+        cart.clear()
+        return cart_response(cart, "Cart cleared successfully")
+    return cart_response(cart, "Cart retrieved successfully")
+
+
+@api_view(["POST", "PATCH", "DELETE"])
+@permission_classes([AllowAny])
+def cart_items(request):
+    """
+    Add, update or remove a cart line.
+    POST /api/cart/items/    add quantity of a product/variant
+    PATCH /api/cart/items/   set the quantity (0 removes the line)
+    DELETE /api/cart/items/  remove the line
+    """
+    serializer = CartItemSerializer(
+        data=request.data, context={"adding": request.method == "POST"}
+    )
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "message": "Invalid cart item",
+                "code": "invalid_cart_item",
+                "errors": serializer.errors,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    cart = get_cart(request)
+    product = serializer.validated_data["product"]
+    variant = serializer.validated_data.get("variant")
+    quantity = serializer.validated_data["quantity"]
+
+    if request.method == "POST":
+        cart.add(product.id, variant.id if variant else None, quantity)
+        return cart_response(cart, "Item added to cart", status.HTTP_201_CREATED)
+    if request.method == "DELETE":
+        quantity = 0
+    cart.set_quantity(product.id, variant.id if variant else None, quantity)
+    return cart_response(cart, "Cart updated successfully")
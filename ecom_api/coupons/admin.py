@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import Coupon, CouponRedemption
 
-# Register your models here.
+
+@admin.register(Coupon)
+class CouponAdmin(admin.ModelAdmin):
+    list_display = ('code', 'discount_type', 'value', 'scope', 'used_count', 'usage_limit', 'is_active', 'ends_at')
+    list_filter = ('discount_type', 'scope', 'is_active')
+    search_fields = ('code', 'description')
+    raw_id_fields = ('category', 'vendor')
+    readonly_fields = ('used_count',)
+
+
+@admin.register(CouponRedemption)
+class CouponRedemptionAdmin(admin.ModelAdmin):
+    list_display = ('coupon', 'user', 'order', 'discount', 'created_at')
+    search_fields = ('coupon__code', 'user__email', 'order__order_number')
+    raw_id_fields = ('coupon', 'user', 'order')
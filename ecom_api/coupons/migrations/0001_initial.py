@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:27
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('orders', '0002_order_history'),
+        ('products', '0005_product_wishlist_count'),
+        ('vendors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Coupon',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True)),
+                ('description', models.CharField(blank=True, default='', max_length=255)),
+                ('discount_type', models.CharField(choices=[('percentage', 'Percentage'), ('fixed', 'Fixed Amount')], max_length=20)),
+                ('value', models.DecimalField(decimal_places=2, help_text='Percentage (0-100) or fixed amount', max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('scope', models.CharField(choices=[('all', 'Whole Order'), ('category', 'Category'), ('vendor', 'Vendor')], default='all', max_length=20)),
+                ('min_order_amount', models.DecimalField(decimal_places=2, default=0, help_text='Minimum amount of eligible items', max_digits=10)),
+                ('max_discount_amount', models.DecimalField(blank=True, decimal_places=2, help_text='Cap for percentage discounts', max_digits=10, null=True)),
+                ('usage_limit', models.PositiveIntegerField(blank=True, help_text='Total redemptions allowed (empty for unlimited)', null=True)),
+                ('per_user_limit', models.PositiveIntegerField(blank=True, null=True)),
+                ('used_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('starts_at', models.DateTimeField(blank=True, null=True)),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, help_text='For category coupons; includes its subcategories', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='coupons', to='products.category')),
+                ('vendor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='coupons', to='vendors.vendor')),
+            ],
+            options={
+                'verbose_name': 'Coupon',
+                'verbose_name_plural': 'Coupons',
+                'db_table': 'coupons',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CouponRedemption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('discount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('coupon', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='redemptions', to='coupons.coupon')),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_redemption', to='orders.order')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_redemptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Coupon Redemption',
+                'verbose_name_plural': 'Coupon Redemptions',
+                'db_table': 'coupon_redemptions',
+                'indexes': [models.Index(fields=['coupon', 'user'], name='coupon_rede_coupon__1d3d2e_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,136 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
 
-# Create your models here.
+
+def coupon_cache_key(code):
+    return f"coupon:{code.strip().upper()}"
+
+
+class Coupon(models.Model):
+    DISCOUNT_TYPES = (
+        ('percentage', 'Percentage'),
+        ('fixed', 'Fixed Amount'),
+    )
+    SCOPES = (
+        ('all', 'Whole Order'),
+        ('category', 'Category'),
+        ('vendor', 'Vendor'),
+    )
+
+    code = models.CharField(max_length=50, unique=True)
+    description = models.CharField(max_length=255, blank=True, default='')
+    discount_type = models.CharField(max_length=20, choices=DISCOUNT_TYPES)
+    value = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(0)],
+        help_text='Percentage (0-100) or fixed amount'
+    )
+    scope = models.CharField(max_length=20, choices=SCOPES, default='all')
+    category = models.ForeignKey(
+        'products.Category',
+        on_delete=models.CASCADE,
+        related_name='coupons',
+        blank=True,
+        null=True,
+        help_text='For category coupons; includes its subcategories'
+    )
+    vendor = models.ForeignKey(
+        'vendors.Vendor',
+        on_delete=models.CASCADE,
+        related_name='coupons',
+        blank=True,
+        null=True
+    )
+    min_order_amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        help_text='Minimum amount of eligible items'
+    )
+    max_discount_amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        help_text='Cap for percentage discounts'
+    )
+    usage_limit = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text='Total redemptions allowed (empty for unlimited)'
+    )
+    per_user_limit = models.PositiveIntegerField(blank=True, null=True)
+    used_count = models.PositiveIntegerField(default=0, editable=False)
+    starts_at = models.DateTimeField(blank=True, null=True)
+    ends_at = models.DateTimeField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'coupons'
+        ordering = ['-created_at']
+        verbose_name = 'Coupon'
+        verbose_name_plural = 'Coupons'
+
+    def __str__(self):
+        return self.code
+
+    def clean(self):
+        if self.discount_type == 'percentage' and self.value is not None and self.value > 100:
+            raise ValidationError({'value': 'A percentage discount cannot exceed 100.'})
+        if self.scope == 'category' and not self.category_id:
+            raise ValidationError({'category': 'Category coupons need a category.'})
+        if self.scope == 'vendor' and not self.vendor_id:
+            raise ValidationError({'vendor': 'Vendor coupons need a vendor.'})
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({'ends_at': 'End must be after the start.'})
+
+    def save(self, *args, **kwargs):
+        self.code = self.code.strip().upper()
+        super().save(*args, **kwargs)
+        self.invalidate_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.invalidate_cache()
+        return result
+
+    def invalidate_cache(self):
+        key = coupon_cache_key(self.code)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+class CouponRedemption(models.Model):
+    coupon = models.ForeignKey(
+        Coupon,
+        on_delete=models.PROTECT,
+        related_name='redemptions'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='coupon_redemptions'
+    )
+    order = models.OneToOneField(
+        'orders.Order',
+        on_delete=models.CASCADE,
+        related_name='coupon_redemption'
+    )
+    discount = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'coupon_redemptions'
+        verbose_name = 'Coupon Redemption'
+        verbose_name_plural = 'Coupon Redemptions'
+        indexes = [
+            models.Index(fields=['coupon', 'user']),
+        ]
+
+    def __str__(self):
+        return f"{self.coupon_id} on {self.order_id}"
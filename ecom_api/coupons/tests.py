@@ -1,3 +1,233 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from benchmarks.seed import seed_all
+from cart.pricing import price_cart
+from cart.utils import UserCart
+from ecom_api.query_budget import QueryBudgetMixin
+from orders.models import Order
+from products.models import Category, Product
+from vendors.models import Vendor
+from .models import Coupon, CouponRedemption
+from .urls import query_budgets, urlpatterns
+from .utils import CouponError, load_coupon, redeem_coupon, validate_coupon
+
+
+class CouponTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all(
+            {"categories": 3, "products": 6, "variants": 0, "users": 3, "addresses": 1}
+        )
+        Product.objects.update(
+            price=Decimal("50.00"),
+            compare_at_price=None,
+            stock_quantity=100,
+            track_inventory=True,
+            allow_backorder=False,
+        )
+        cls.users = list(
+            User.objects.filter(email__startswith="bench-user-").order_by("email")
+        )
+        cls.products = list(Product.objects.order_by("id"))
+        cls.vendor = Vendor.objects.create(name="Acme")
+        Product.objects.filter(pk=cls.products[0].pk).update(vendor=cls.vendor)
+
+        cls.parent = Category.objects.create(name="Coupon Parent")
+        cls.child = Category.objects.create(name="Coupon Child", parent=cls.parent)
+        Product.objects.filter(pk=cls.products[1].pk).update(category=cls.child)
+        Product.objects.filter(pk=cls.products[2].pk).update(category=cls.parent)
+
+    def setUp(self):
+        cache.clear()
+
+    def pricing(self, *products):
+        return price_cart([(product.id, None, 1) for product in products])
+
+    def make_coupon(self, **fields):
+        fields.setdefault("code", "save10")
+        fields.setdefault("discount_type", "percentage")
+        fields.setdefault("value", Decimal("10"))
+        return Coupon.objects.create(**fields)
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_codes_are_case_insensitive(self):
+        self.make_coupon()
+        coupon, discount = validate_coupon(" Save10 ", self.pricing(self.products[0]))
+        self.assertEqual(coupon["code"], "SAVE10")
+        self.assertEqual(discount, Decimal("5.00"))
+
+    def test_percentage_discount_is_capped(self):
+        self.make_coupon(value=Decimal("50"), max_discount_amount=Decimal("30"))
+        coupon, discount = validate_coupon(
+            "SAVE10", self.pricing(self.products[0], self.products[1])
+        )
+        self.assertEqual(discount, Decimal("30.00"))
+
+    def test_fixed_discount_never_exceeds_the_eligible_amount(self):
+        self.make_coupon(discount_type="fixed", value=Decimal("80"))
+        coupon, discount = validate_coupon("SAVE10", self.pricing(self.products[0]))
+        self.assertEqual(discount, Decimal("50.00"))
+
+    def test_category_scope_includes_subcategories(self):
+        self.make_coupon(scope="category", category=self.parent)
+        pricing = self.pricing(self.products[1], self.products[2], self.products[3])
+        coupon, discount = validate_coupon("SAVE10", pricing)
+        self.assertEqual(discount, Decimal("10.00"))
+
+        with self.assertRaises(CouponError) as raised:
+            validate_coupon("SAVE10", self.pricing(self.products[3]))
+        self.assertEqual(raised.exception.code, "not_applicable")
+
+    def test_vendor_scope(self):
+        self.make_coupon(
+            discount_type="fixed", value=Decimal("5"), scope="vendor", vendor=self.vendor
+        )
+        coupon, discount = validate_coupon(
+            "SAVE10", self.pricing(self.products[0], self.products[3])
+        )
+        self.assertEqual(discount, Decimal("5.00"))
+
+    def test_minimum_spend_and_dates(self):
+        self.make_coupon(code="MIN", min_order_amount=Decimal("100"))
+        self.make_coupon(code="LATER", starts_at=timezone.now() + timedelta(days=1))
+        self.make_coupon(code="OVER", ends_at=timezone.now() - timedelta(days=1))
+        pricing = self.pricing(self.products[0])
+        for code, error in (
+            ("MIN", "minimum_not_met"),
+            ("LATER", "coupon_not_started"),
+            ("OVER", "coupon_expired"),
+            ("NOPE", "invalid_coupon"),
+        ):
+            with self.subTest(code=code), self.assertRaises(CouponError) as raised:
+                validate_coupon(code, pricing)
+            self.assertEqual(raised.exception.code, error)
+
+    def test_validation_is_served_from_the_cache(self):
+        self.make_coupon(scope="category", category=self.parent)
+        self.assertIsNone(load_coupon("UNKNOWN"))
+        load_coupon("SAVE10")
+        pricing = self.pricing(self.products[1])
+
+        with CaptureQueriesContext(connection) as captured:
+            validate_coupon("SAVE10", pricing)
+            with self.assertRaises(CouponError):
+                validate_coupon("UNKNOWN", pricing)
+        self.assertEqual(len(captured), 0)
+
+    def test_saving_a_coupon_refreshes_the_cache(self):
+        coupon = self.make_coupon()
+        load_coupon("SAVE10")
+        with self.captureOnCommitCallbacks(execute=True):
+            coupon.is_active = False
+            coupon.save()
+        with self.assertRaises(CouponError):
+            validate_coupon("SAVE10", self.pricing(self.products[0]))
+
+    def test_usage_limit_is_never_exceeded(self):
+        coupon = self.make_coupon(usage_limit=2)
+        snapshot = load_coupon("SAVE10")
+        redeemed = 0
+        for index in range(4):
+            order = Order.objects.create(
+                order_number=f"ORD-CPN{index}", user=self.users[index % 3], subtotal=50, total=50
+            )
+            try:
+                redeem_coupon(snapshot, order.user, order, Decimal("5.00"))
+                redeemed += 1
+            except CouponError as exc:
+                self.assertEqual(exc.code, "usage_limit_reached")
+        coupon.refresh_from_db()
+        self.assertEqual(redeemed, 2)
+        self.assertEqual(coupon.used_count, 2)
+        self.assertEqual(CouponRedemption.objects.count(), 2)
+        # Later validations fail straight from the cache
+        pricing = self.pricing(self.products[0])
+        with CaptureQueriesContext(connection) as captured:
+            with self.assertRaises(CouponError) as raised:
+                validate_coupon("SAVE10", pricing)
+        self.assertEqual(raised.exception.code, "usage_limit_reached")
+        self.assertEqual(len(captured), 0)
+
+    def test_per_user_limit(self):
+        self.make_coupon(per_user_limit=1)
+        snapshot = load_coupon("SAVE10")
+        first = Order.objects.create(order_number="ORD-CPNA", user=self.users[0], subtotal=50, total=50)
+        second = Order.objects.create(order_number="ORD-CPNB", user=self.users[0], subtotal=50, total=50)
+        redeem_coupon(snapshot, self.users[0], first, Decimal("5.00"))
+        with self.assertRaises(CouponError) as raised:
+            redeem_coupon(snapshot, self.users[0], second, Decimal("5.00"))
+        self.assertEqual(raised.exception.code, "per_user_limit_reached")
+
+    def test_validate_endpoint(self):
+        self.make_coupon()
+        user = self.users[0]
+        UserCart(user).add(self.products[0].id, quantity=2)
+        client = APIClient()
+        client.force_authenticate(user)
+        load_coupon("SAVE10")
+
+        response = self.assertWithinQueryBudget(
+            "coupon_validate",
+            client.post,
+            reverse("coupon_validate"),
+            {"code": "save10"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["discount"], "10.00")
+        self.assertEqual(response.data["data"]["total"], "90.00")
+
+        response = client.post(
+            reverse("coupon_validate"), {"code": "bogus"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["code"], "invalid_coupon")
+
+    def test_checkout_applies_and_redeems_the_coupon(self):
+        self.make_coupon(usage_limit=1)
+        user, other = self.users[0], self.users[1]
+        for customer in (user, other):
+            UserCart(customer).add(self.products[0].id, quantity=2)
+        client = APIClient()
+
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks():
+            response = client.post(
+                reverse("checkout"),
+                {"address": user.addresses.get().pk, "coupon_code": "save10"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.data["data"]["id"])
+        self.assertEqual(order.coupon_code, "SAVE10")
+        self.assertEqual(order.coupon_discount, Decimal("10.00"))
+        self.assertEqual(order.total, Decimal("90.00"))
+        self.assertTrue(CouponRedemption.objects.filter(order=order).exists())
 
-# Create your tests here.
+        # The cap is reached: the second checkout fails and leaves stock alone
+        client.force_authenticate(other)
+        stock = Product.objects.get(pk=self.products[0].pk).stock_quantity
+        response = client.post(
+            reverse("checkout"),
+            {"address": other.addresses.get().pk, "coupon_code": "SAVE10"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["code"], "usage_limit_reached")
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock_quantity, stock)
+        self.assertEqual(Order.objects.filter(user=other).count(), 0)
+        self.assertEqual(len(UserCart(other).lines()), 1)
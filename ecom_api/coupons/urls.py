@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("validate/", views.validate_coupon_code, name="coupon_validate"),
+]
+
+# Maximum SQL queries per request, enforced by coupons/tests.py
+query_budgets = {
+    "coupon_validate": 2,
+}
@@ -0,0 +1,185 @@
+"""
+Coupon validation and redemption.
+
+Validating a code never touches the database once the coupon is cached:
+each code is cached as a plain snapshot of its rules (unknown codes are
+cached too, so guessing codes cannot hammer the table), and category
+coupons store the ids of the whole category subtree so eligibility is a
+set lookup per cart line. Saving or deleting a coupon drops its snapshot
+once the transaction commits.
+
+Usage limits are enforced by the redemption itself, with a conditional
+increment::
+
+    UPDATE coupons SET used_count = used_count + 1
+     WHERE id = %s AND (usage_limit IS NULL OR used_count < usage_limit)
+
+The check and the increment happen in one statement under the row lock, so
+concurrent checkouts during a flash sale can never redeem a coupon more
+often than its cap.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+from products.models import Category
+from .models import Coupon, CouponRedemption, coupon_cache_key
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+
+SNAPSHOT_FIELDS = (
+    "id",
+    "code",
+    "discount_type",
+    "value",
+    "scope",
+    "category_id",
+    "vendor_id",
+    "min_order_amount",
+    "max_discount_amount",
+    "per_user_limit",
+    "starts_at",
+    "ends_at",
+    "is_active",
+)
+
+
+class CouponError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def category_subtree(category_id):
+    """Ids of ``category_id`` and all of its descendants, from one query."""
+    children = {}
+    for pk, parent_id in Category.objects.values_list("id", "parent_id"):
+        children.setdefault(parent_id, []).append(pk)
+    ids = set()
+    pending = [category_id]
+    while pending:
+        pk = pending.pop()
+        if pk not in ids:
+            ids.add(pk)
+            pending.extend(children.get(pk, []))
+    return ids
+
+
+def load_coupon(code):
+    """Cached snapshot of the coupon with ``code``, or None if there is none."""
+    key = coupon_cache_key(code)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        coupon = (
+            Coupon.objects.filter(code=code.strip().upper())
+            .values(*SNAPSHOT_FIELDS)
+            .first()
+        )
+        # Unknown codes are cached as an empty snapshot
+        snapshot = coupon or {}
+        if coupon and coupon["scope"] == "category" and coupon["category_id"]:
+            snapshot["category_ids"] = category_subtree(coupon["category_id"])
+        cache.set(key, snapshot, timeout=settings.COUPON_CACHE_TIMEOUT)
+    return snapshot or None
+
+
+def is_eligible(snapshot, line):
+    if snapshot["scope"] == "category":
+        return line.category_id in snapshot.get("category_ids", ())
+    if snapshot["scope"] == "vendor":
+        return line.vendor_id == snapshot["vendor_id"]
+    return True
+
+
+def compute_discount(snapshot, pricing):
+    """Discount the coupon gives on the eligible lines of ``pricing``."""
+    eligible = sum(
+        (
+            line.line_total
+            for line in pricing.lines
+            if line.available and is_eligible(snapshot, line)
+        ),
+        ZERO,
+    )
+    if not eligible:
+        raise CouponError(
+            "This coupon does not apply to any item in your cart", "not_applicable"
+        )
+    if eligible < snapshot["min_order_amount"]:
+        raise CouponError(
+            f"This coupon requires a minimum spend of {snapshot['min_order_amount']}",
+            "minimum_not_met",
+        )
+
+    if snapshot["discount_type"] == "percentage":
+        discount = (eligible * snapshot["value"] / 100).quantize(CENT)
+        if snapshot["max_discount_amount"] is not None:
+            discount = min(discount, snapshot["max_discount_amount"])
+    else:
+        discount = snapshot["value"]
+    return min(discount, eligible).quantize(CENT)
+
+
+def validate_coupon(code, pricing):
+    """
+    Check ``code`` against a priced cart without querying the database.
+
+    Returns ``(snapshot, discount)`` or raises ``CouponError``. Per-user
+    limits and the usage cap are only enforced by ``redeem_coupon``.
+    """
+    snapshot = load_coupon(code)
+    if snapshot is None or not snapshot["is_active"]:
+        raise CouponError("Invalid coupon code", "invalid_coupon")
+    now = timezone.now()
+    if snapshot["starts_at"] and now < snapshot["starts_at"]:
+        raise CouponError("This coupon is not active yet", "coupon_not_started")
+    if snapshot["ends_at"] and now >= snapshot["ends_at"]:
+        raise CouponError("This coupon has expired", "coupon_expired")
+    if snapshot.get("exhausted"):
+        raise CouponError("This coupon has been fully redeemed", "usage_limit_reached")
+    return snapshot, compute_discount(snapshot, pricing)
+
+
+def _mark_exhausted(snapshot):
+    # Later validations fail from the cache until the coupon is edited
+    cache.set(
+        coupon_cache_key(snapshot["code"]),
+        {**snapshot, "exhausted": True},
+        timeout=settings.COUPON_CACHE_TIMEOUT,
+    )
+
+
+def redeem_coupon(snapshot, user, order, discount):
+    """
+    Record one use of the coupon for ``order``; call inside the checkout
+    transaction so a failure rolls the order back.
+
+    Callers must serialise checkouts per user (``place_order`` locks the
+    cart row) for the per-user limit to hold.
+    """
+    if snapshot["per_user_limit"] is not None:
+        used = CouponRedemption.objects.filter(
+            coupon_id=snapshot["id"], user=user
+        ).count()
+        if used >= snapshot["per_user_limit"]:
+            raise CouponError(
+                "You have already used this coupon", "per_user_limit_reached"
+            )
+
+    claimed = (
+        Coupon.objects.filter(pk=snapshot["id"], is_active=True)
+        .filter(Q(usage_limit__isnull=True) | Q(used_count__lt=F("usage_limit")))
+        .update(used_count=F("used_count") + 1)
+    )
+    if not claimed:
+        _mark_exhausted(snapshot)
+        raise CouponError("This coupon has been fully redeemed", "usage_limit_reached")
+
+    return CouponRedemption.objects.create(
+        coupon_id=snapshot["id"], user=user, order=order, discount=discount
+    )
@@ -1,3 +1,57 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
-# Create your views here.
+from cart.pricing import price_cart
+from cart.utils import get_cart
+from .serializers import CouponCodeSerializer
+from .utils import CouponError, validate_coupon
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def validate_coupon_code(request):
+    """
+    Check a coupon against the current cart and preview the discount.
+    POST /api/coupons/validate/
+    {"code": "SUMMER10"}
+
+    The coupon rules come from the cache; the usage cap and per-user
+    limits are enforced when the order is placed.
+    """
+    serializer = CouponCodeSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "message": "Invalid coupon data",
+                "code": "invalid_coupon",
+                "errors": serializer.errors,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    pricing = price_cart(get_cart(request).lines())
+    try:
+        coupon, discount = validate_coupon(serializer.validated_data["code"], pricing)
+    except CouponError as exc:
+        return Response(
+            {"success": False, "message": exc.message, "code": exc.code},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return Response(
+        {
+            "success": True,
+            "message": "Coupon applied",
+            "data": {
+                "code": coupon["code"],
+                "discount_type": coupon["discount_type"],
+                "value": str(coupon["value"]),
+                "subtotal": str(pricing.subtotal),
+                "discount": str(discount),
+                "total": str(pricing.subtotal - discount),
+            },
+        }
+    )
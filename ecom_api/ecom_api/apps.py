@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class EcomApiConfig(AppConfig):
+    name = "ecom_api"
+
+    def ready(self):
+        from . import db_metrics
+
+        db_metrics.install()
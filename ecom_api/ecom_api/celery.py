@@ -0,0 +1,23 @@
+import os
+
+from celery import Celery
+from celery.signals import task_prerun
+
+from .routers import reset_pinning
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecom_api.settings")
+
+app = Celery("ecom_api")
+
+# Read CELERY_* settings from Django settings
+app.config_from_object("django.conf:settings", namespace="CELERY")
+
+# Load tasks.py from every installed app
+app.autodiscover_tasks()
+
+
+@task_prerun.connect
+def reset_database_routing(**kwargs):
+    # A worker runs many tasks in one context; a write in one task must not
+    # pin the reads of every later task to the primary
+    reset_pinning()
@@ -0,0 +1,114 @@
+"""
+Connection reuse metrics for persistent database connections.
+
+With ``CONN_MAX_AGE`` set, Django keeps a connection open across requests.
+This module counts, per database alias, how many requests found a connection
+already open (reused) versus how many connections had to be opened, and
+records how long each connection lived and how many requests it served
+before Django closed it.
+
+The numbers are per process; ``snapshot()`` returns them and a summary line
+is logged every time a connection is closed. The receivers are installed by
+``EcomApiConfig.ready()``.
+"""
+import logging
+import threading
+import time
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def _alias_stats(alias):
+    return _stats.setdefault(
+        alias,
+        {
+            "opened": 0,
+            "reused": 0,
+            "closed": 0,
+            "total_lifetime": 0.0,
+            "max_lifetime": 0.0,
+            "total_requests": 0,
+        },
+    )
+
+
+def snapshot():
+    """Return a copy of the per-alias counters with derived averages."""
+    with _lock:
+        result = {}
+        for alias, stats in _stats.items():
+            closed = stats["closed"]
+            result[alias] = {
+                **stats,
+                "avg_lifetime": stats["total_lifetime"] / closed if closed else 0.0,
+                "avg_requests_per_connection": (
+                    stats["total_requests"] / closed if closed else 0.0
+                ),
+            }
+        return result
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    connection._metrics_opened_at = time.monotonic()
+    connection._metrics_requests = 0
+    with _lock:
+        _alias_stats(connection.alias)["opened"] += 1
+
+
+def _on_request_started(sender, **kwargs):
+    # Runs after Django's close_old_connections(), so any connection still
+    # open here will be reused by this request.
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is None:
+            continue
+        conn._metrics_requests = getattr(conn, "_metrics_requests", 0) + 1
+        with _lock:
+            _alias_stats(conn.alias)["reused"] += 1
+
+
+def _on_request_finished(sender, **kwargs):
+    # Runs after Django's close_old_connections(); a connection that has
+    # just been closed still carries the timestamp we stamped on it.
+    for conn in connections.all(initialized_only=True):
+        opened_at = getattr(conn, "_metrics_opened_at", None)
+        if opened_at is None:
+            continue
+        if conn.connection is None:
+            lifetime = time.monotonic() - opened_at
+            served = getattr(conn, "_metrics_requests", 0) + 1
+            conn._metrics_opened_at = None
+            with _lock:
+                stats = _alias_stats(conn.alias)
+                stats["closed"] += 1
+                stats["total_lifetime"] += lifetime
+                stats["max_lifetime"] = max(stats["max_lifetime"], lifetime)
+                stats["total_requests"] += served
+                opened, reused = stats["opened"], stats["reused"]
+            logger.info(
+                "db connection closed alias=%s lifetime=%.1fs requests=%d "
+                "(opened=%d reused=%d)",
+                conn.alias,
+                lifetime,
+                served,
+                opened,
+                reused,
+            )
+
+
+def install():
+    """Connect the signal receivers; safe to call more than once."""
+    connection_created.connect(_on_connection_created, dispatch_uid="db_metrics")
+    request_started.connect(_on_request_started, dispatch_uid="db_metrics")
+    request_finished.connect(_on_request_finished, dispatch_uid="db_metrics")
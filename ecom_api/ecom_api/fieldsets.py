@@ -0,0 +1,42 @@
+"""
+Sparse fieldsets.
+
+``?fields=id,name,slug`` limits each serialized object, nested ones
+included, to the listed fields. Fields that cost queries of their own, such
+as a category's ``children`` and ``product_count``, are then left out
+unless they are listed there or in ``?expand=``::
+
+    GET /api/category/?fields=id,name,slug&expand=product_count
+
+Without ``?fields=`` every field is serialized as before. Views pass the
+selection to the serializer as ``context['fields']`` and use
+``wants_field`` to skip the prefetches and aggregates of fields that are
+not serialized.
+"""
+
+
+def parse_field_list(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+def requested_fields(request):
+    """Field names selected by the query string, or None for all fields."""
+    fields = parse_field_list(request.query_params.get("fields"))
+    if not fields:
+        return None
+    return fields | parse_field_list(request.query_params.get("expand"))
+
+
+def wants_field(fields, name):
+    return fields is None or name in fields
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin that drops fields missing from ``context['fields']``."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get("fields")
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
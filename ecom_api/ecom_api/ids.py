@@ -0,0 +1,194 @@
+"""
+Unique identifiers for SKUs and order numbers.
+
+IDs are 63-bit time-ordered integers in the "snowflake" layout::
+
+    | 41 bits: ms since ID_EPOCH | 10 bits: node | 12 bits: sequence |
+
+and are rendered in upper-case base 36 (at most 13 characters). Every
+process takes a node number when it first needs an ID and can then hand out
+4096 IDs per millisecond without talking to the database, so generating a
+SKU never needs an ``exists()`` probe.
+
+Node numbers are leased from ``IdNodeLease`` rows in the database, the one
+store every process shares (the default cache may be local memory). A
+process takes the lowest node no live process holds, under a unique
+constraint, and renews its lease while it keeps generating IDs; leases left
+by processes that exited expire after ``ID_NODE_LEASE_SECONDS`` and are
+handed out again, so at most 1024 rows ever exist.
+
+A lease taken or renewed inside a transaction that is rolled back is lost
+with it. The process notices at its next renewal and takes a new node, but
+until then another process may lease the same one. The unique constraints
+on SKUs and order numbers are the backstop for that window: product and
+variant ``save()`` and ``place_order`` retry with a new ID if one is taken.
+"""
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Now
+
+ID_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def to_base36(number):
+    digits = []
+    while True:
+        number, remainder = divmod(number, 36)
+        digits.append(ALPHABET[remainder])
+        if not number:
+            return "".join(reversed(digits))
+
+
+class IdGenerator:
+    def __init__(self, node=None):
+        if node is None:
+            node = random.SystemRandom().randint(0, MAX_NODE)
+        if not 0 <= node <= MAX_NODE:
+            raise ValueError(f"node must be between 0 and {MAX_NODE}")
+        self.node = node
+        self.epoch_ms = int(ID_EPOCH.timestamp() * 1000)
+        self.last_ms = -1
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def _now_ms(self):
+        return time.time_ns() // 1_000_000 - self.epoch_ms
+
+    def next_ints(self, count):
+        """``count`` increasing integer IDs."""
+        ids = []
+        with self.lock:
+            while len(ids) < count:
+                now = self._now_ms()
+                if now < self.last_ms:
+                    # Clock went backwards: keep issuing from the last millisecond
+                    now = self.last_ms
+                if now == self.last_ms:
+                    if self.sequence == MAX_SEQUENCE:
+                        # Sequence exhausted for this millisecond
+                        while self._now_ms() <= self.last_ms:
+                            time.sleep(0.0001)
+                        continue
+                    self.sequence += 1
+                else:
+                    self.last_ms = now
+                    self.sequence = 0
+                ids.append(
+                    (now << (NODE_BITS + SEQUENCE_BITS))
+                    | (self.node << SEQUENCE_BITS)
+                    | self.sequence
+                )
+        return ids
+
+    def next_int(self):
+        return self.next_ints(1)[0]
+
+
+_generator = None
+_generator_lock = threading.Lock()
+# (holder, monotonic time of the next renewal) of the current node lease
+_lease = None
+
+
+def claim_node():
+    """
+    Lease the lowest free node and return ``(node, holder)``.
+
+    Leases that were not renewed within ``ID_NODE_LEASE_SECONDS`` are
+    dropped first. Raises ``RuntimeError`` if every node is held.
+    """
+    from .models import IdNodeLease
+
+    holder = uuid.uuid4()
+    expired = Now() - timedelta(seconds=settings.ID_NODE_LEASE_SECONDS)
+    IdNodeLease.objects.filter(renewed_at__lt=expired).delete()
+    for _ in range(3):
+        taken = set(IdNodeLease.objects.values_list("node", flat=True))
+        node = next((node for node in range(MAX_NODE + 1) if node not in taken), None)
+        if node is None:
+            raise RuntimeError(f"All {MAX_NODE + 1} ID generator nodes are leased")
+        try:
+            with transaction.atomic():
+                IdNodeLease.objects.create(node=node, holder=holder, renewed_at=Now())
+        except IntegrityError:
+            # Another process leased the same node first
+            continue
+        return node, holder
+    raise RuntimeError("Could not lease an ID generator node")
+
+
+def renew_node(node, holder):
+    """Extend a lease; False if it expired and another process took the node."""
+    from .models import IdNodeLease
+
+    return bool(
+        IdNodeLease.objects.filter(node=node, holder=holder).update(renewed_at=Now())
+    )
+
+
+def get_generator():
+    """
+    The process's generator, leasing a node on first use.
+
+    The lease is renewed every quarter of ``ID_NODE_LEASE_SECONDS``, so one
+    renewal lost to a rollback still leaves time for the next.
+    """
+    global _generator, _lease
+    generator, lease = _generator, _lease
+    if generator is not None and time.monotonic() < lease[1]:
+        return generator
+    with _generator_lock:
+        now = time.monotonic()
+        renew_every = settings.ID_NODE_LEASE_SECONDS / 4
+        if _generator is not None and now >= _lease[1]:
+            if renew_node(_generator.node, _lease[0]):
+                _lease = (_lease[0], now + renew_every)
+            else:
+                _generator = None
+        if _generator is None:
+            node, holder = claim_node()
+            _lease = (holder, now + renew_every)
+            _generator = IdGenerator(node)
+        return _generator
+
+
+def _reset_after_fork():
+    # A forked worker must lease its own node instead of sharing the parent's
+    global _generator, _lease
+    _generator = None
+    _lease = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def next_id():
+    """A new unique ID as a base 36 string."""
+    return to_base36(get_generator().next_int())
+
+
+def next_ids(count):
+    """``count`` new unique IDs, for bulk creation."""
+    return [to_base36(number) for number in get_generator().next_ints(count)]
+
+
+def make_sku(prefix):
+    return f"{prefix}-{next_id()}"
+
+
+def make_order_number():
+    return f"ORD-{next_id()}"
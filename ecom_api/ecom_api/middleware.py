@@ -0,0 +1,72 @@
+import logging
+
+from django.conf import settings
+
+from .profiling import profile_request
+from .routers import has_written, reset_pinning
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PIN_COOKIE = "db_pin"
+
+
+class ReplicaPinningMiddleware:
+    """
+    Give clients read-your-writes consistency when catalog reads use replicas.
+
+    Each request starts with a clean routing context. If the request writes
+    to the primary, the response sets a short-lived cookie and the client's
+    following requests read from the primary until it expires.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset_pinning(pinned=REPLICA_PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+            if has_written():
+                response.set_cookie(
+                    REPLICA_PIN_COOKIE,
+                    "1",
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                    samesite="Lax",
+                )
+            return response
+        finally:
+            reset_pinning()
+
+
+class RequestProfilingMiddleware:
+    """
+    Record query count, DB time, cache hits/misses and the time spent in the
+    rest of the middleware stack and the view per request.
+
+    The numbers are returned in a ``Server-Timing`` header. Statements that
+    run ``settings.N_PLUS_ONE_THRESHOLD`` times or more with different
+    parameters are flagged in the header and logged as likely N+1 queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.N_PLUS_ONE_THRESHOLD
+
+    def __call__(self, request):
+        if not settings.REQUEST_PROFILING_ENABLED:
+            return self.get_response(request)
+
+        with profile_request() as profile:
+            response = self.get_response(request)
+
+        response["Server-Timing"] = profile.server_timing(self.threshold)
+        for sql, count in profile.repeated_queries(self.threshold):
+            logger.warning(
+                "Possible N+1 on %s %s: query ran %d times: %s",
+                request.method,
+                request.path,
+                count,
+                sql,
+            )
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecom_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdNodeLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node', models.PositiveSmallIntegerField(unique=True)),
+                ('holder', models.UUIDField()),
+                ('renewed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'id_node_leases',
+            },
+        ),
+        migrations.DeleteModel(
+            name='IdNodeClaim',
+        ),
+    ]
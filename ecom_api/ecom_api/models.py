@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class IdNodeLease(models.Model):
+    """
+    A node of the ID generator (see ``ecom_api.ids``) held by one process,
+    which renews ``renewed_at`` while it runs.
+    """
+
+    node = models.PositiveSmallIntegerField(unique=True)
+    holder = models.UUIDField()
+    renewed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "id_node_leases"
@@ -0,0 +1,116 @@
+"""
+Keyset ("seek") pagination.
+
+``PageNumberPagination`` pages with ``OFFSET``, so the database reads and
+throws away every row before the requested page and the cost grows with
+the page number. ``KeysetPagination`` orders by a unique key such as
+``(-created_at, -id)`` and encodes the key of the last row of a page in an
+opaque cursor; the next page is a range scan starting right after it::
+
+    WHERE created_at < %s OR (created_at = %s AND id < %s)
+    ORDER BY created_at DESC, id DESC
+    LIMIT 21
+
+With an index whose columns match the filter and ordering, every page costs
+the same however deep the client scrolls.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    #: Must end with a unique field so every row has a distinct position
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None, page_size=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        page = list(queryset[: size + 1])
+        self.has_next = len(page) > size
+        self.page = page[:size]
+        return self.page
+
+    def after(self, position):
+        """Rows that sort after ``position`` in ``self.ordering``."""
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, position):
+            lookup = "lt" if name.startswith("-") else "gt"
+            name = name.lstrip("-")
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, obj):
+        position = [getattr(obj, name.lstrip("-")) for name in self.ordering]
+        raw = json.dumps(
+            [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in position
+            ]
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            values = json.loads(raw)
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self.model._meta.get_field(name.lstrip("-")).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1]),
+        )
+
+    def get_paginated_data(self, data):
+        return {"next": self.get_next_link(), "results": data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
@@ -0,0 +1,102 @@
+"""
+Per-request SQL, cache and latency instrumentation.
+
+A ``RequestProfile`` is bound to the current request by
+``RequestProfilingMiddleware``. Every query executed on any database alias is
+timed through ``connection.execute_wrapper`` and cache lookups are counted by
+the instrumented cache backends in ``ecom_api.cache``.
+"""
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+_current_profile = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Everything below the profiling middleware: other middleware and the view
+        self.app_time = 0.0
+        # sql -> [executions, set of distinct params]
+        self.statements = {}
+
+    def record_query(self, sql, params, duration):
+        self.query_count += 1
+        self.db_time += duration
+        entry = self.statements.setdefault(sql, [0, set()])
+        entry[0] += 1
+        try:
+            entry[1].add(repr(params))
+        except Exception:
+            pass
+
+    def record_cache(self, hits=0, misses=0):
+        self.cache_hits += hits
+        self.cache_misses += misses
+
+    def repeated_queries(self, threshold):
+        """
+        Statements executed at least ``threshold`` times with different
+        parameters, most frequent first - the usual signature of an N+1.
+        """
+        repeated = [
+            (sql, count)
+            for sql, (count, params) in self.statements.items()
+            if count >= threshold and len(params) > 1
+        ]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+    def server_timing(self, threshold):
+        metrics = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries"',
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses"',
+            f'app;dur={self.app_time * 1000:.2f};desc="middleware and view"',
+        ]
+        repeated = self.repeated_queries(threshold)
+        if repeated:
+            metrics.append(f'nplusone;desc="{len(repeated)} repeated queries"')
+        return ", ".join(metrics)
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+def record_cache(hits=0, misses=0):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record_cache(hits=hits, misses=misses)
+
+
+def _query_recorder(profile):
+    def recorder(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            profile.record_query(sql, params, time.perf_counter() - start)
+
+    return recorder
+
+
+@contextmanager
+def profile_request():
+    """Collect a ``RequestProfile`` for everything executed inside the block."""
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    recorder = _query_recorder(profile)
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            yield profile
+    finally:
+        profile.app_time = time.perf_counter() - start
+        _current_profile.reset(token)
@@ -0,0 +1,48 @@
+"""
+Query budgets for API endpoints.
+
+Each app's ``urls.py`` declares ``query_budgets``, a mapping of URL name to
+the maximum number of SQL queries one request to that URL may run. The
+endpoint tests use ``QueryBudgetMixin`` to enforce those budgets on seeded
+data, so a serializer or view change that introduces an N+1 fails the test
+suite instead of reaching production.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .ids import get_generator
+
+
+class QueryBudgetMixin:
+    #: the ``query_budgets`` mapping of the app under test
+    query_budgets = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The ID node is claimed once per process, not by each request
+        get_generator()
+
+    def assertUrlsHaveBudgets(self, urlpatterns):
+        missing = [
+            pattern.name
+            for pattern in urlpatterns
+            if pattern.name and pattern.name not in self.query_budgets
+        ]
+        self.assertEqual(missing, [], "URLs without a declared query budget")
+
+    def assertWithinQueryBudget(self, url_name, func, *args, **kwargs):
+        """Call ``func`` and fail if it runs more queries than ``url_name`` allows."""
+        budget = self.query_budgets[url_name]
+        with CaptureQueriesContext(connection) as captured:
+            response = func(*args, **kwargs)
+        if len(captured) > budget:
+            statements = "\n".join(
+                f"{index}. {query['sql']}"
+                for index, query in enumerate(captured.captured_queries, start=1)
+            )
+            self.fail(
+                f"{url_name} ran {len(captured)} queries, budget is {budget}:\n"
+                f"{statements}"
+            )
+        return response
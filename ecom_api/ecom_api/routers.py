@@ -0,0 +1,100 @@
+"""
+Database routing for catalog reads.
+
+Reads for the catalog apps (``products`` and ``vendors``) are spread across
+the replica aliases listed in ``settings.REPLICA_DATABASES``. Everything else,
+and every write, goes to ``default``.
+
+Once a request has written to the primary it is "pinned": all further reads in
+that request, and in the same client's requests for
+``settings.REPLICA_PIN_SECONDS`` afterwards (see
+``ecom_api.middleware.ReplicaPinningMiddleware``), are served by ``default`` so
+users always read their own writes despite replication lag. Celery tasks
+start each run with a fresh context (see ``ecom_api.celery``).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DATABASE = "default"
+CATALOG_APP_LABELS = frozenset({"products", "vendors"})
+
+# True when reads in the current request/thread must go to the primary.
+_pinned = ContextVar("db_pinned_to_primary", default=False)
+# True once the current request/thread has routed a write to the primary.
+_wrote = ContextVar("db_wrote_to_primary", default=False)
+
+
+def pin_to_primary():
+    """Send every remaining read in the current context to the primary."""
+    _pinned.set(True)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+def has_written():
+    return _wrote.get()
+
+
+def reset_pinning(pinned=False):
+    """Start a fresh routing context (called at the start of each request/task)."""
+    _pinned.set(pinned)
+    _wrote.set(False)
+
+
+@contextmanager
+def use_primary():
+    """Context manager forcing reads inside the block to the primary."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def get_replica_aliases():
+    return [
+        alias
+        for alias in getattr(settings, "REPLICA_DATABASES", [])
+        if alias in settings.DATABASES
+    ]
+
+
+class CatalogReplicaRouter:
+    """
+    Route catalog reads to replicas and everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in CATALOG_APP_LABELS:
+            return PRIMARY_DATABASE
+        if _pinned.get() or _wrote.get():
+            return PRIMARY_DATABASE
+        # Related-object lookups on an instance stay on the instance's db.
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        replicas = get_replica_aliases()
+        if not replicas:
+            return PRIMARY_DATABASE
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas carry the same data as the primary, so objects loaded from
+        # any of them can be related to each other.
+        pool = {PRIMARY_DATABASE, *get_replica_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication.
+        return db == PRIMARY_DATABASE
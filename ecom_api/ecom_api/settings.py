@@ -1,7 +1,10 @@
+from importlib.util import find_spec
 from pathlib import Path
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -55,12 +58,23 @@ INSTALLED_APPS = [
     "django_celery_beat",
     "django_celery_results",
     # Local apps
+    "ecom_api.apps.EcomApiConfig",
     "accounts.apps.AccountsConfig",
     "products.apps.ProductsConfig",
     "vendors.apps.VendorsConfig",
+    "cart.apps.CartConfig",
+    "inventory.apps.InventoryConfig",
+    "orders.apps.OrdersConfig",
+    "payments.apps.PaymentsConfig",
+    "reviews.apps.ReviewsConfig",
+    "wishlist.apps.WishlistConfig",
+    "coupons.apps.CouponsConfig",
+    "notifications.apps.NotificationsConfig",
+    "benchmarks.apps.BenchmarksConfig",
 ]
 
 MIDDLEWARE = [
+    "ecom_api.middleware.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,8 +84,62 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     # 'accounts.middleware.UserSessionMiddleware',
     "corsheaders.middleware.CorsMiddleware",
+    "ecom_api.middleware.ReplicaPinningMiddleware",
 ]
 
+# Per-request SQL/cache/latency instrumentation (Server-Timing header). Off by
+# default: the header exposes DB and cache timings to every client.
+REQUEST_PROFILING_ENABLED = os.getenv("REQUEST_PROFILING_ENABLED", "False") == "True"
+# Same SQL repeated this many times with different params is flagged as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Cache (Redis when REDIS_URL is set, local memory otherwise). The backends
+# report hits and misses to the request profiler.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "ecom_api.cache.InstrumentedRedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "ecom_api.cache.InstrumentedLocMemCache",
+        }
+    }
+
+# Anonymous carts are kept in the cache for this many seconds (30 days)
+ANONYMOUS_CART_TTL = int(os.getenv("ANONYMOUS_CART_TTL", str(60 * 60 * 24 * 30)))
+
+# Seconds a user's cached wishlist product ids are kept
+WISHLIST_CACHE_TIMEOUT = int(os.getenv("WISHLIST_CACHE_TIMEOUT", "3600"))
+
+# Seconds a coupon's rules are cached for checkout validation
+COUPON_CACHE_TIMEOUT = int(os.getenv("COUPON_CACHE_TIMEOUT", "900"))
+
+# Seconds a user's cached unread notification count is kept
+NOTIFICATION_COUNT_TIMEOUT = int(os.getenv("NOTIFICATION_COUNT_TIMEOUT", "3600"))
+
+# Seconds a cached vendor storefront page is kept; product and image edits,
+# stock running out or coming back and rating changes invalidate the vendor's
+# pages immediately, renamed categories only show once they expire
+VENDOR_STOREFRONT_CACHE_TIMEOUT = int(
+    os.getenv("VENDOR_STOREFRONT_CACHE_TIMEOUT", "300")
+)
+
+# Seconds unpaid checkouts hold their stock reservations
+STOCK_RESERVATION_TTL = int(os.getenv("STOCK_RESERVATION_TTL", "900"))
+
+# Seconds an ID generator node stays leased to a process that stopped
+# renewing it (see ecom_api.ids)
+ID_NODE_LEASE_SECONDS = int(os.getenv("ID_NODE_LEASE_SECONDS", "900"))
+
+# HMAC secrets used to verify payment webhooks, by gateway name
+PAYMENT_WEBHOOK_SECRETS = {
+    "fake": os.getenv("FAKE_GATEWAY_WEBHOOK_SECRET"),
+}
+
 # S3 Media Storage
 STORAGES = {
     "default": {
@@ -105,6 +173,10 @@ WSGI_APPLICATION = "ecom_api.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Persistent connections: seconds to keep a connection open between requests
+# (0 closes it after every request, "none" keeps it open indefinitely).
+DB_CONN_MAX_AGE = os.getenv("DB_CONN_MAX_AGE", "60")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.mysql",
@@ -116,9 +188,42 @@ DATABASES = {
         "OPTIONS": {
             "charset": "utf8mb4",
         },
+        "CONN_MAX_AGE": (
+            None if DB_CONN_MAX_AGE.lower() == "none" else int(DB_CONN_MAX_AGE)
+        ),
+        # Ping a persistent connection before reusing it in a new request.
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
     }
 }
 
+# Read replicas for catalog reads (products, vendors).
+# DB_REPLICA_HOSTS is a comma separated list of "host" or "host:port" entries;
+# each one becomes a "replica_<n>" alias sharing the primary's credentials
+# unless DB_REPLICA_USER / DB_REPLICA_PASSWORD are set.
+REPLICA_DATABASES = []
+for index, replica in enumerate(
+    h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(",") if h.strip()
+):
+    replica_host, _, replica_port = replica.partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "USER": os.getenv("DB_REPLICA_USER", DATABASES["default"]["USER"]),
+        "PASSWORD": os.getenv(
+            "DB_REPLICA_PASSWORD", DATABASES["default"]["PASSWORD"]
+        ),
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        # Tests run against the primary only.
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["ecom_api.routers.CatalogReplicaRouter"]
+
+# How long a client keeps reading from the primary after it wrote something.
+REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", "5"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -194,6 +299,22 @@ REST_FRAMEWORK = {
         "user": "1000/day",
     },
 }
+# Render and parse JSON with orjson (pip install orjson), several times faster.
+# Off by default because with it NaN and infinity render as null instead of
+# raising under STRICT_JSON (see ecom_api.renderers for how floats differ).
+USE_ORJSON = os.getenv("USE_ORJSON", "False") == "True"
+if USE_ORJSON:
+    if find_spec("orjson") is None:
+        raise ImproperlyConfigured("USE_ORJSON is set but orjson is not installed.")
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "ecom_api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = (
+        "ecom_api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    )
 # JWT Configuration
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
@@ -231,6 +352,9 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASS")
 
+# Recipient of low-stock digests for admin-owned products
+LOW_STOCK_ALERT_EMAIL = os.getenv("LOW_STOCK_ALERT_EMAIL")
+
 # Frontend URL for email verification links
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 
@@ -249,3 +373,29 @@ if os.getenv("FRONTEND_URL"):
 CORS_ALLOWED_ORIGINS = list(set(CORS_ALLOWED_ORIGINS))
 
 CSRF_TRUSTED_ORIGINS = CORS_ALLOWED_ORIGINS.copy()
+
+# Celery
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = "django-db"
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "False") == "True"
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "release-expired-stock-reservations": {
+        "task": "inventory.tasks.release_expired_stock_reservations",
+        "schedule": 60.0,
+    },
+    "process-pending-payment-events": {
+        "task": "payments.tasks.process_pending_payment_events",
+        "schedule": 300.0,
+    },
+    "send-low-stock-alerts": {
+        "task": "inventory.tasks.send_low_stock_alerts",
+        "schedule": crontab(hour=7, minute=0),
+    },
+    # Corrects drift from bulk stock updates, which skip the Product signals
+    "rebuild-vendor-summaries": {
+        "task": "vendors.tasks.rebuild_vendor_summaries",
+        "schedule": crontab(minute=15),
+    },
+}
@@ -0,0 +1,203 @@
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from products.models import Category
+from . import db_metrics, ids
+from .cache import InstrumentedCacheMixin
+from .middleware import RequestProfilingMiddleware
+from .models import IdNodeLease
+
+
+class FakeConnection:
+    def __init__(self, alias):
+        self.alias = alias
+        self.connection = None
+
+    def connect(self):
+        self.connection = object()
+        connection_created.send(sender=type(self), connection=self)
+
+    def close(self):
+        self.connection = None
+
+
+class ConnectionMetricsTests(SimpleTestCase):
+    def setUp(self):
+        # Only the metrics receivers should see the simulated requests
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+        db_metrics.reset()
+        self.addCleanup(db_metrics.reset)
+
+        self.conn = FakeConnection("default")
+        patcher = mock.patch("ecom_api.db_metrics.connections")
+        patcher.start().all.return_value = [self.conn]
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("ecom_api.db_metrics.time")
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, work=None):
+        request_started.send(sender=self.__class__)
+        if work:
+            work()
+        request_finished.send(sender=self.__class__)
+
+    def test_counts_opened_reused_and_closed_connections(self):
+        self.clock.monotonic.return_value = 100.0
+        self.request(self.conn.connect)
+        self.request()
+        self.assertEqual(
+            {
+                key: value
+                for key, value in db_metrics.snapshot()["default"].items()
+                if key in ("opened", "reused", "closed")
+            },
+            {"opened": 1, "reused": 1, "closed": 0},
+        )
+
+        self.clock.monotonic.return_value = 130.0
+        self.request(self.conn.close)
+        stats = db_metrics.snapshot()["default"]
+        self.assertEqual((stats["opened"], stats["reused"], stats["closed"]), (1, 2, 1))
+        self.assertEqual(stats["total_lifetime"], 30.0)
+        self.assertEqual(stats["max_lifetime"], 30.0)
+        self.assertEqual(stats["avg_lifetime"], 30.0)
+        # Opened by the first request, reused by the other two
+        self.assertEqual(stats["total_requests"], 3)
+        self.assertEqual(stats["avg_requests_per_connection"], 3.0)
+
+    def test_lifetimes_of_several_connections(self):
+        self.clock.monotonic.return_value = 0.0
+        self.request(self.conn.connect)
+        self.clock.monotonic.return_value = 10.0
+        self.request(self.conn.close)
+        self.request(self.conn.connect)
+        self.clock.monotonic.return_value = 40.0
+        self.request(self.conn.close)
+
+        stats = db_metrics.snapshot()["default"]
+        self.assertEqual((stats["opened"], stats["closed"]), (2, 2))
+        self.assertEqual(stats["total_lifetime"], 40.0)
+        self.assertEqual(stats["max_lifetime"], 30.0)
+        self.assertEqual(stats["avg_lifetime"], 20.0)
+        # Each served the request that opened it and the one that closed it
+        self.assertEqual(stats["avg_requests_per_connection"], 2.0)
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, N_PLUS_ONE_THRESHOLD=5)
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get("/api/category/")
+
+    def profile(self, view):
+        def get_response(request):
+            view()
+            return HttpResponse()
+
+        return RequestProfilingMiddleware(get_response)(self.request)
+
+    def metrics(self, response):
+        return {
+            metric.split(";")[0]: metric
+            for metric in response["Server-Timing"].split(", ")
+        }
+
+    def test_server_timing_reports_queries_and_cache_lookups(self):
+        self.assertIsInstance(caches["default"], InstrumentedCacheMixin)
+
+        def view():
+            list(Category.objects.all())
+            Category.objects.exists()
+            cache.set("present", 1)
+            cache.get("present")
+            cache.get("absent")
+            cache.get_many(["present", "other", "another"])
+
+        metrics = self.metrics(self.profile(view))
+        self.assertEqual(set(metrics), {"db", "cache", "app"})
+        self.assertRegex(metrics["db"], r'^db;dur=\d+\.\d{2};desc="2 queries"$')
+        self.assertEqual(metrics["cache"], 'cache;desc="2 hits 3 misses"')
+        self.assertRegex(metrics["app"], r'^app;dur=\d+\.\d{2};desc="middleware and view"$')
+
+    def test_repeated_queries_are_flagged(self):
+        def view():
+            for pk in range(6):
+                Category.objects.filter(pk=pk).exists()
+
+        with self.assertLogs("ecom_api.middleware", "WARNING") as logs:
+            response = self.profile(view)
+        self.assertEqual(
+            self.metrics(response)["nplusone"], 'nplusone;desc="1 repeated queries"'
+        )
+        self.assertIn("query ran 6 times", logs.output[0])
+
+    def test_same_query_with_same_params_is_not_flagged(self):
+        def view():
+            for _ in range(6):
+                Category.objects.filter(pk=1).exists()
+
+        self.assertNotIn("nplusone", self.metrics(self.profile(view)))
+
+    @override_settings(REQUEST_PROFILING_ENABLED=False)
+    def test_disabled(self):
+        self.assertNotIn("Server-Timing", self.profile(lambda: None))
+
+
+class IdNodeTests(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, ids, "_lease", ids._lease)
+        self.addCleanup(setattr, ids, "_generator", ids._generator)
+        IdNodeLease.objects.all().delete()
+
+    def test_lowest_free_node_is_leased(self):
+        nodes = [ids.claim_node()[0] for _ in range(3)]
+        self.assertEqual(nodes, [0, 1, 2])
+        IdNodeLease.objects.filter(node=1).delete()
+        self.assertEqual(ids.claim_node()[0], 1)
+
+    def test_expired_leases_are_reused(self):
+        node, holder = ids.claim_node()
+        lease = timedelta(seconds=settings.ID_NODE_LEASE_SECONDS)
+        IdNodeLease.objects.update(renewed_at=timezone.now() - lease * 2)
+        self.assertEqual(ids.claim_node()[0], node)
+        self.assertFalse(ids.renew_node(node, holder))
+        self.assertEqual(IdNodeLease.objects.count(), 1)
+
+    def test_fails_loudly_when_every_node_is_leased(self):
+        IdNodeLease.objects.bulk_create(
+            IdNodeLease(node=node, holder=uuid.uuid4(), renewed_at=timezone.now())
+            for node in range(ids.MAX_NODE + 1)
+        )
+        with self.assertRaisesMessage(RuntimeError, "nodes are leased"):
+            ids.claim_node()
+
+    def test_generator_renews_its_lease_and_releases_a_lost_one(self):
+        ids._reset_after_fork()
+        generator = ids.get_generator()
+        self.assertIs(ids.get_generator(), generator)
+
+        with mock.patch("ecom_api.ids.time.monotonic", return_value=10**9):
+            with self.assertNumQueries(1):
+                # The lease is still held: renewed in one UPDATE
+                self.assertIs(ids.get_generator(), generator)
+
+            IdNodeLease.objects.all().delete()
+            IdNodeLease.objects.create(
+                node=generator.node, holder=uuid.uuid4(), renewed_at=timezone.now()
+            )
+        with mock.patch("ecom_api.ids.time.monotonic", return_value=2 * 10**9):
+            replacement = ids.get_generator()
+        self.assertNotEqual(replacement.node, generator.node)
@@ -6,6 +6,14 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
-    path('api/', include('products.urls'))
+    path('api/', include('products.urls')),
+    path('api/cart/', include('cart.urls')),
+    path('api/orders/', include('orders.urls')),
+    path('api/payments/', include('payments.urls')),
+    path('api/reviews/', include('reviews.urls')),
+    path('api/wishlist/', include('wishlist.urls')),
+    path('api/coupons/', include('coupons.urls')),
+    path('api/notifications/', include('notifications.urls')),
+    path('api/vendors/', include('vendors.urls')),
     
 ]
@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import StockReservation
 
-# Register your models here.
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'product', 'variant', 'quantity', 'deducted', 'status', 'expires_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('reference', 'product__sku', 'variant__sku')
+    raw_id_fields = ('product', 'variant')
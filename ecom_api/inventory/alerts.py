@@ -0,0 +1,94 @@
+"""
+Low-stock digests.
+
+``Product.low_stock`` and ``ProductVariant.low_stock`` are stored generated
+columns mirroring ``is_low_stock``, so the job below finds every low-stock
+SKU with two indexed queries and sends one email per vendor over a single
+SMTP connection.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from products.models import Product, ProductVariant
+from vendors.models import Vendor
+
+
+def collect_low_stock():
+    """Low-stock products and variants grouped by vendor id (None = admin)."""
+    grouped = defaultdict(list)
+    products = (
+        Product.objects.filter(low_stock=True, is_active=True)
+        .order_by('vendor_id', 'stock_quantity')
+        .values_list(
+            'vendor_id', 'name', 'sku', 'stock_quantity', 'low_stock_threshold'
+        )
+    )
+    for vendor_id, name, sku, stock, threshold in products:
+        grouped[vendor_id].append({
+            'name': name,
+            'sku': sku,
+            'stock_quantity': stock,
+            'low_stock_threshold': threshold,
+        })
+
+    variants = (
+        ProductVariant.objects.filter(
+            low_stock=True, is_active=True, product__is_active=True
+        )
+        .order_by('product__vendor_id', 'stock_quantity')
+        .values_list(
+            'product__vendor_id',
+            'product__name',
+            'variant_value',
+            'sku',
+            'stock_quantity',
+            'low_stock_threshold',
+        )
+    )
+    for vendor_id, name, value, sku, stock, threshold in variants:
+        grouped[vendor_id].append({
+            'name': f'{name} - {value}',
+            'sku': sku,
+            'stock_quantity': stock,
+            'low_stock_threshold': threshold,
+        })
+    return grouped
+
+
+def build_digest(recipient, vendor, items):
+    context = {'vendor': vendor, 'items': items}
+    html_message = render_to_string('emails/low_stock_digest.html', context)
+    message = EmailMultiAlternatives(
+        subject=f'{len(items)} item(s) running low on stock',
+        body=strip_tags(html_message),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient],
+    )
+    message.attach_alternative(html_message, 'text/html')
+    return message
+
+
+def send_low_stock_digests():
+    """Send one digest per vendor with low-stock items; returns the count sent."""
+    grouped = collect_low_stock()
+    if not grouped:
+        return 0
+
+    vendors = Vendor.objects.in_bulk([pk for pk in grouped if pk is not None])
+    messages = []
+    for vendor_id, items in grouped.items():
+        vendor = vendors.get(vendor_id)
+        if vendor_id is None:
+            recipient = settings.LOW_STOCK_ALERT_EMAIL
+        else:
+            recipient = vendor.email if vendor and vendor.is_active else None
+        if recipient:
+            messages.append(build_digest(recipient, vendor, items))
+
+    if not messages:
+        return 0
+    return get_connection().send_messages(messages) or 0
@@ -1,3 +1,53 @@
 from django.db import models
 
-# Create your models here.
+
+class StockReservation(models.Model):
+    """
+    Stock held for a checkout until it is paid (committed) or given back.
+
+    ``deducted`` is how much was actually taken from the stock counter: it is
+    0 for products that don't track inventory and can be less than
+    ``quantity`` for backordered products.
+    """
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('committed', 'Committed'),
+        ('released', 'Released'),
+        ('expired', 'Expired'),
+    )
+
+    reference = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text='Checkout/order this reservation belongs to'
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='stock_reservations'
+    )
+    variant = models.ForeignKey(
+        'products.ProductVariant',
+        on_delete=models.CASCADE,
+        related_name='stock_reservations',
+        blank=True,
+        null=True
+    )
+    quantity = models.PositiveIntegerField()
+    deducted = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stock_reservations'
+        ordering = ['-created_at']
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.reference}: {self.quantity} x {self.product_id}"
@@ -0,0 +1,271 @@
+"""
+Atomic stock reservations.
+
+Stock is taken with conditional updates of the form::
+
+    UPDATE products
+       SET stock_quantity = stock_quantity - CASE id WHEN ... END
+     WHERE (id = 1 AND stock_quantity >= 2) OR (id = 7 AND stock_quantity >= 1) ...
+
+All product lines of a checkout are reserved in one such statement and all
+variant lines in another. If fewer rows match than lines were requested,
+some line lacked stock and the whole transaction is rolled back. The check
+and the decrement happen in the same statement under the row lock, so
+concurrent checkouts can never oversell.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from notifications.tasks import notify_back_in_stock
+from products.models import Product, ProductVariant
+from vendors.storefront import invalidate_product_vendors
+from .models import StockReservation
+
+
+class InsufficientStock(Exception):
+    def __init__(self, lines):
+        self.lines = lines
+        super().__init__(
+            "Insufficient stock for "
+            + ", ".join(
+                f"product {product_id}" + (f" variant {variant_id}" if variant_id else "")
+                for product_id, variant_id in lines
+            )
+        )
+
+
+def _aggregate(lines):
+    """Sum quantities per (product_id, variant_id)."""
+    totals = defaultdict(int)
+    for product_id, variant_id, quantity in lines:
+        totals[(product_id, variant_id)] += quantity
+    return totals
+
+
+def _deduct(model, amounts):
+    """
+    Decrement ``stock_quantity`` by ``amounts[pk]`` for every row, in a single
+    UPDATE that only matches rows with enough stock. Returns the row count.
+    """
+    if not amounts:
+        return 0
+    condition = Q()
+    cases = []
+    for pk, amount in amounts.items():
+        condition |= Q(pk=pk, stock_quantity__gte=amount)
+        cases.append(When(pk=pk, then=F('stock_quantity') - Value(amount)))
+    return model.objects.filter(condition).update(
+        stock_quantity=Case(
+            *cases, default=F('stock_quantity'), output_field=IntegerField()
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _restore(model, amounts):
+    amounts = {pk: amount for pk, amount in amounts.items() if amount}
+    if not amounts:
+        return 0
+    return model.objects.filter(pk__in=amounts).update(
+        stock_quantity=Case(
+            *[
+                When(pk=pk, then=F('stock_quantity') + Value(amount))
+                for pk, amount in amounts.items()
+            ],
+            default=F('stock_quantity'),
+            output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _shortages(totals, flags):
+    """Lines that cannot be served with the current stock (diagnostics only)."""
+    totals = {
+        key: quantity
+        for key, quantity in totals.items()
+        if flags[key[0]] == (True, False)
+    }
+    products = dict(
+        Product.objects.filter(
+            id__in={product_id for product_id, variant_id in totals}
+        ).values_list('id', 'stock_quantity')
+    )
+    variants = dict(
+        ProductVariant.objects.filter(
+            id__in={variant_id for product_id, variant_id in totals if variant_id}
+        ).values_list('id', 'stock_quantity')
+    )
+    return [
+        (product_id, variant_id)
+        for (product_id, variant_id), quantity in totals.items()
+        if (variants if variant_id else products).get(variant_id or product_id, 0) < quantity
+    ]
+
+
+@transaction.atomic
+def _reserve(totals, flags, reference, expires_at):
+    """Deduct stock for ``totals`` and record the reservations, all or nothing."""
+    strict = {Product: {}, ProductVariant: {}}
+    backorder = {Product: {}, ProductVariant: {}}
+    for (product_id, variant_id), quantity in totals.items():
+        track_inventory, allow_backorder = flags[product_id]
+        if not track_inventory:
+            continue
+        model = ProductVariant if variant_id else Product
+        target = backorder if allow_backorder else strict
+        target[model][variant_id or product_id] = quantity
+
+    # Backordered lines take what is left: lock those rows to learn how
+    # much that is, then deduct exactly that amount.
+    deducted = {Product: {}, ProductVariant: {}}
+    for model, quantities in backorder.items():
+        if not quantities:
+            continue
+        for pk, stock in (
+            model.objects.select_for_update()
+            .filter(pk__in=quantities)
+            .values_list('pk', 'stock_quantity')
+        ):
+            deducted[model][pk] = min(stock, quantities[pk])
+
+    for model in (Product, ProductVariant):
+        deducted[model].update(strict[model])
+        amounts = {pk: amount for pk, amount in deducted[model].items() if amount}
+        if _deduct(model, amounts) != len(amounts):
+            # Raising rolls back every decrement made above
+            raise InsufficientStock([])
+
+    sold_out = [pk for pk, amount in deducted[Product].items() if amount]
+    if sold_out:
+        # Storefront pages show these as in stock until their vendor's
+        # pages are invalidated
+        invalidate_product_vendors(
+            Product.objects.filter(pk__in=sold_out, stock_quantity__lte=0)
+        )
+
+    return StockReservation.objects.bulk_create([
+        StockReservation(
+            reference=reference,
+            product_id=product_id,
+            variant_id=variant_id,
+            quantity=quantity,
+            deducted=deducted[ProductVariant if variant_id else Product].get(
+                variant_id or product_id, 0
+            ),
+            expires_at=expires_at,
+        )
+        for (product_id, variant_id), quantity in totals.items()
+    ])
+
+
+def reserve_stock(lines, reference, ttl=None):
+    """
+    Reserve ``(product_id, variant_id, quantity)`` lines for ``reference``.
+
+    Products with ``track_inventory=False`` are reserved without touching
+    stock. Products with ``allow_backorder=True`` take whatever stock is
+    left and never fail. Anything else raises ``InsufficientStock`` and
+    leaves stock untouched. Reservations expire after ``ttl`` (default
+    ``settings.STOCK_RESERVATION_TTL`` seconds) unless committed.
+    """
+    totals = _aggregate(lines)
+    if not totals:
+        return []
+    ttl = settings.STOCK_RESERVATION_TTL if ttl is None else ttl
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+
+    flags = {
+        pk: (track_inventory, allow_backorder)
+        for pk, track_inventory, allow_backorder in Product.objects.filter(
+            id__in={product_id for product_id, variant_id in totals}
+        ).values_list('id', 'track_inventory', 'allow_backorder')
+    }
+    missing = [key for key in totals if key[0] not in flags]
+    if missing:
+        raise InsufficientStock(missing)
+
+    try:
+        return _reserve(totals, flags, reference, expires_at)
+    except InsufficientStock:
+        # Work out which lines were short once the decrements are rolled back
+        raise InsufficientStock(_shortages(totals, flags)) from None
+
+
+def commit_reservations(reference):
+    """Make the active reservations of ``reference`` permanent (order paid)."""
+    return StockReservation.objects.filter(
+        reference=reference, status='active'
+    ).update(status='committed', updated_at=timezone.now())
+
+
+def _out_of_stock(amounts):
+    """Ids of the products about to get stock back after running out."""
+    restocked = set()
+    amounts = {
+        model: [pk for pk, amount in model_amounts.items() if amount]
+        for model, model_amounts in amounts.items()
+    }
+    if amounts[Product]:
+        restocked.update(
+            Product.objects.filter(
+                pk__in=amounts[Product], stock_quantity__lte=0
+            ).values_list('pk', flat=True)
+        )
+    if amounts[ProductVariant]:
+        restocked.update(
+            ProductVariant.objects.filter(
+                pk__in=amounts[ProductVariant], stock_quantity__lte=0
+            ).values_list('product_id', flat=True)
+        )
+    return restocked
+
+
+def _release(queryset, status):
+    with transaction.atomic():
+        reservations = list(
+            queryset.filter(status='active')
+            .select_for_update()
+            .values_list('id', 'product_id', 'variant_id', 'deducted')
+        )
+        if not reservations:
+            return 0
+        restore = {Product: defaultdict(int), ProductVariant: defaultdict(int)}
+        for pk, product_id, variant_id, amount in reservations:
+            if variant_id:
+                restore[ProductVariant][variant_id] += amount
+            else:
+                restore[Product][product_id] += amount
+        restocked = _out_of_stock(restore)
+        for model, amounts in restore.items():
+            _restore(model, amounts)
+        if restocked:
+            invalidate_product_vendors(Product.objects.filter(pk__in=restocked))
+            transaction.on_commit(partial(notify_back_in_stock.delay, sorted(restocked)))
+        StockReservation.objects.filter(
+            id__in=[reservation[0] for reservation in reservations]
+        ).update(status=status, updated_at=timezone.now())
+    return len(reservations)
+
+
+def release_reservations(reference):
+    """Give the stock held for ``reference`` back (checkout abandoned/failed)."""
+    return _release(StockReservation.objects.filter(reference=reference), 'released')
+
+
+def release_expired_reservations(batch_size=500):
+    """Return stock of reservations that expired unpaid; returns the count."""
+    expired_ids = list(
+        StockReservation.objects.filter(
+            status='active', expires_at__lte=timezone.now()
+        ).values_list('id', flat=True)[:batch_size]
+    )
+    if not expired_ids:
+        return 0
+    return _release(StockReservation.objects.filter(id__in=expired_ids), 'expired')
@@ -0,0 +1,21 @@
+from celery import shared_task
+
+from .alerts import send_low_stock_digests
+from .reservations import release_expired_reservations
+
+
+@shared_task
+def release_expired_stock_reservations():
+    """Give back stock held by checkouts that were never paid."""
+    released = 0
+    while True:
+        count = release_expired_reservations()
+        released += count
+        if not count:
+            return released
+
+
+@shared_task
+def send_low_stock_alerts():
+    """Email each vendor a digest of its low-stock products and variants."""
+    return send_low_stock_digests()
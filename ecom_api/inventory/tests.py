@@ -1,3 +1,122 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from benchmarks.seed import seed_all
+from products.models import Product, ProductVariant
+from vendors.models import Vendor
+from .alerts import collect_low_stock, send_low_stock_digests
+from .models import StockReservation
+from .reservations import (
+    InsufficientStock,
+    commit_reservations,
+    release_expired_reservations,
+    release_reservations,
+    reserve_stock,
+)
+
+
+class StockReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 1, "products": 3, "variants": 1, "users": 0})
+        cls.product, cls.backordered, cls.untracked = Product.objects.order_by("id")
+        cls.variant = ProductVariant.objects.filter(product=cls.product).get()
+        Product.objects.filter(pk=cls.product.pk).update(stock_quantity=5)
+        Product.objects.filter(pk=cls.backordered.pk).update(
+            stock_quantity=1, allow_backorder=True
+        )
+        Product.objects.filter(pk=cls.untracked.pk).update(
+            stock_quantity=0, track_inventory=False
+        )
+        ProductVariant.objects.filter(pk=cls.variant.pk).update(stock_quantity=2)
+
+    def stock(self, obj):
+        return type(obj).objects.values_list("stock_quantity", flat=True).get(pk=obj.pk)
+
+    def test_reserve_deducts_every_line(self):
+        reserve_stock(
+            [
+                (self.product.id, None, 3),
+                (self.product.id, None, 1),
+                (self.product.id, self.variant.id, 2),
+                (self.backordered.id, None, 4),
+                (self.untracked.id, None, 10),
+            ],
+            "order-1",
+        )
+        self.assertEqual(self.stock(self.product), 1)
+        self.assertEqual(self.stock(self.variant), 0)
+        self.assertEqual(self.stock(self.backordered), 0)
+        self.assertEqual(self.stock(self.untracked), 0)
+        self.assertEqual(StockReservation.objects.filter(reference="order-1").count(), 4)
+
+    def test_shortage_rolls_back_all_lines(self):
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve_stock(
+                [(self.product.id, None, 2), (self.product.id, self.variant.id, 3)],
+                "order-2",
+            )
+        self.assertEqual(raised.exception.lines, [(self.product.id, self.variant.id)])
+        self.assertEqual(self.stock(self.product), 5)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_release_restores_deducted_stock(self):
+        reserve_stock(
+            [(self.product.id, None, 2), (self.backordered.id, None, 3)], "order-3"
+        )
+        self.assertEqual(release_reservations("order-3"), 2)
+        self.assertEqual(self.stock(self.product), 5)
+        self.assertEqual(self.stock(self.backordered), 1)
+        # Releasing twice gives nothing back
+        self.assertEqual(release_reservations("order-3"), 0)
+        self.assertEqual(self.stock(self.product), 5)
+
+    def test_expired_reservations_are_released_unless_committed(self):
+        reserve_stock([(self.product.id, None, 1)], "paid", ttl=0)
+        reserve_stock([(self.product.id, None, 2)], "abandoned", ttl=0)
+        commit_reservations("paid")
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(release_expired_reservations(), 1)
+        self.assertEqual(self.stock(self.product), 4)
+        self.assertEqual(
+            StockReservation.objects.get(reference="abandoned").status, "expired"
+        )
+
+
+class LowStockDigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 1, "products": 4, "variants": 1, "users": 0})
+        cls.vendor = Vendor.objects.create(name="Acme", email="acme@example.com")
+        low, healthy, admin_owned, sold_out = Product.objects.order_by("id")
+        Product.objects.filter(pk__in=[low.pk, healthy.pk]).update(vendor=cls.vendor)
+        Product.objects.filter(pk=low.pk).update(stock_quantity=3, low_stock_threshold=5)
+        Product.objects.filter(pk=healthy.pk).update(stock_quantity=50)
+        Product.objects.filter(pk=admin_owned.pk).update(
+            stock_quantity=1, low_stock_threshold=5
+        )
+        Product.objects.filter(pk=sold_out.pk).update(stock_quantity=0)
+        ProductVariant.objects.filter(product=healthy).update(
+            stock_quantity=2, low_stock_threshold=5
+        )
+        ProductVariant.objects.exclude(product=healthy).update(stock_quantity=100)
+        cls.low, cls.admin_owned = low, admin_owned
+
+    def test_collect_groups_products_and_variants_per_vendor(self):
+        with self.assertNumQueries(2):
+            grouped = collect_low_stock()
+        self.assertEqual(set(grouped), {self.vendor.pk, None})
+        self.assertEqual(len(grouped[self.vendor.pk]), 2)
+        self.assertEqual([item["sku"] for item in grouped[None]], [self.admin_owned.sku])
+
+    @override_settings(LOW_STOCK_ALERT_EMAIL="stock@example.com")
+    def test_sends_one_digest_per_vendor(self):
+        self.assertEqual(send_low_stock_digests(), 2)
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertEqual(recipients, ["acme@example.com", "stock@example.com"])
+        vendor_mail = next(m for m in mail.outbox if m.to == ["acme@example.com"])
+        self.assertIn(self.low.sku, vendor_mail.body)
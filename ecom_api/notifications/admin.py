@@ -1,3 +1,17 @@
 from django.contrib import admin
+from .models import Notification, NotificationCounter
 
-# Register your models here.
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'title', 'is_read', 'created_at')
+    list_filter = ('kind', 'is_read')
+    search_fields = ('user__email', 'title')
+    raw_id_fields = ('user',)
+
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread_count')
+    search_fields = ('user__email',)
+    raw_id_fields = ('user',)
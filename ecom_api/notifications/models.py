@@ -1,3 +1,59 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class Notification(models.Model):
+    KINDS = (
+        ('order_placed', 'Order Placed'),
+        ('order_paid', 'Order Paid'),
+        ('back_in_stock', 'Back In Stock'),
+        ('review_approved', 'Review Approved'),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    kind = models.CharField(max_length=30, choices=KINDS)
+    title = models.CharField(max_length=255)
+    message = models.TextField(blank=True, default='')
+    data = models.JSONField(default=dict, blank=True)
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'notifications'
+        ordering = ['-created_at']
+        verbose_name = 'Notification'
+        verbose_name_plural = 'Notifications'
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['user', 'is_read']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.user_id}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Unread notifications of a user, kept up to date by every write so the
+    badge never needs a COUNT over the notifications table.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter'
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'notification_counters'
+        verbose_name = 'Notification Counter'
+        verbose_name_plural = 'Notification Counters'
+
+    def __str__(self):
+        return f"{self.unread_count} unread for {self.user_id}"
@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = (
+            "id",
+            "kind",
+            "title",
+            "message",
+            "data",
+            "is_read",
+            "read_at",
+            "created_at",
+        )
@@ -0,0 +1,23 @@
+from celery import shared_task
+
+from products.models import Product
+from wishlist.models import WishlistItem
+from .utils import notify
+
+
+@shared_task
+def notify_back_in_stock(product_ids):
+    """Tell everyone who wishlisted one of ``product_ids`` that it is available again."""
+    sent = 0
+    for product in Product.objects.filter(pk__in=product_ids, is_active=True).only(
+        "id", "name", "slug"
+    ):
+        sent += notify(
+            WishlistItem.objects.filter(product=product)
+            .values_list("user_id", flat=True)
+            .iterator(),
+            "back_in_stock",
+            f"{product.name} is back in stock",
+            data={"product": product.pk, "slug": product.slug},
+        )
+    return sent
@@ -1,3 +1,144 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from benchmarks.seed import seed_all
+from ecom_api.query_budget import QueryBudgetMixin
+from inventory.reservations import release_reservations, reserve_stock
+from products.models import Product
+from wishlist.models import WishlistItem
+from .models import Notification, NotificationCounter
+from .tasks import notify_back_in_stock
+from .urls import query_budgets, urlpatterns
+from .utils import mark_all_read, notify, unread_count
+
+
+class NotificationTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 1, "products": 2, "variants": 0, "users": 5})
+        cls.users = list(
+            User.objects.filter(email__startswith="bench-user-").order_by("email")
+        )
+        cls.user = cls.users[0]
+        cls.product = Product.objects.order_by("id").first()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def notify_all(self, title="Hello"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return notify([user.pk for user in self.users], "order_placed", title)
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_fan_out_is_batched(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.notify_all(), 5)
+        # Notifications, counter rows, counter increments (plus the transaction)
+        self.assertLessEqual(len(captured), 5)
+        self.assertEqual(Notification.objects.count(), 5)
+
+        self.notify_all("Again")
+        self.assertEqual(
+            set(NotificationCounter.objects.values_list("unread_count", flat=True)), {2}
+        )
+
+    def test_cached_count_is_adjusted_incrementally(self):
+        self.assertEqual(unread_count(self.user), 0)
+        self.notify_all()
+        self.notify_all()
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(unread_count(self.user), 2)
+        self.assertEqual(len(captured), 0)
+
+        notification = Notification.objects.filter(user=self.user).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.assertWithinQueryBudget(
+                "notification_read",
+                self.client.post,
+                reverse("notification_read", args=[notification.pk]),
+            )
+        self.assertEqual(response.status_code, 200)
+        # Marking it read twice only decrements once
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("notification_read", args=[notification.pk]))
+        self.assertEqual(unread_count(self.user), 1)
+        cache.clear()
+        self.assertEqual(unread_count(self.user), 1)
+
+    def test_badge_never_counts_notifications(self):
+        self.notify_all()
+        for cached in (False, True):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.assertWithinQueryBudget(
+                    "notification_unread_count",
+                    self.client.get,
+                    reverse("notification_unread_count"),
+                )
+            self.assertEqual(response.data["data"]["unread_count"], 1)
+            self.assertFalse(
+                any("COUNT(" in query["sql"].upper() for query in captured)
+            )
+            self.assertEqual(len(captured), 0 if cached else 1)
+
+    def test_mark_all_read_is_one_update(self):
+        self.notify_all()
+        self.notify_all()
+        with CaptureQueriesContext(connection) as captured:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(mark_all_read(self.user), 2)
+        updates = [
+            query["sql"]
+            for query in captured
+            if query["sql"].startswith('UPDATE "notifications"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(unread_count(self.user), 0)
+        self.assertFalse(
+            Notification.objects.filter(user=self.user, is_read=False).exists()
+        )
+
+        response = self.assertWithinQueryBudget(
+            "notification_read_all", self.client.post, reverse("notification_read_all")
+        )
+        self.assertEqual(response.data["data"]["updated"], 0)
+
+    def test_list(self):
+        self.notify_all("First")
+        self.notify_all("Second")
+        mark_all_read(self.user)
+        self.notify_all("Third")
+        response = self.assertWithinQueryBudget(
+            "notification_list", self.client.get, reverse("notification_list")
+        )
+        self.assertEqual(
+            [item["title"] for item in response.data["data"]["results"]],
+            ["Third", "Second", "First"],
+        )
+        response = self.client.get(reverse("notification_list"), {"unread": "1"})
+        self.assertEqual(len(response.data["data"]["results"]), 1)
+
+    def test_back_in_stock_notifies_wishlisters(self):
+        Product.objects.filter(pk=self.product.pk).update(
+            stock_quantity=1, track_inventory=True, allow_backorder=False
+        )
+        WishlistItem.objects.bulk_create(
+            [WishlistItem(user=user, product=self.product) for user in self.users[:3]]
+        )
+        reserve_stock([(self.product.pk, None, 1)], "order-bis")
+        with self.captureOnCommitCallbacks() as callbacks:
+            release_reservations("order-bis")
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(notify_back_in_stock([self.product.pk]), 3)
+        self.assertEqual(Notification.objects.filter(kind="back_in_stock").count(), 3)
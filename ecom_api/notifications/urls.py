@@ -0,0 +1,25 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.notification_list, name="notification_list"),
+    path(
+        "unread-count/",
+        views.notification_unread_count,
+        name="notification_unread_count",
+    ),
+    path("read-all/", views.notification_read_all, name="notification_read_all"),
+    path(
+        "<int:notification_id>/read/",
+        views.notification_read,
+        name="notification_read",
+    ),
+]
+
+# Maximum SQL queries per request, enforced by notifications/tests.py
+query_budgets = {
+    "notification_list": 1,
+    "notification_unread_count": 1,
+    "notification_read": 4,
+    "notification_read_all": 4,
+}
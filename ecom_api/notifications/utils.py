@@ -0,0 +1,125 @@
+"""
+Notifications and unread counters.
+
+``notify`` fans a notification out to any number of users with one
+``bulk_create`` per batch plus two statements for their counters, instead
+of one INSERT per recipient. Every user has a ``NotificationCounter`` row
+that is adjusted in the same transaction as the notifications, and the
+cached copy of it is adjusted with ``incr``/``decr`` once the transaction
+commits. The unread badge reads the cache, or the counter row on a miss,
+and never counts notifications. Marking everything read is one UPDATE.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification, NotificationCounter
+
+FANOUT_BATCH_SIZE = 1000
+
+
+def unread_cache_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def unread_count(user):
+    """Unread notifications of ``user``: cached, or one primary key lookup."""
+    key = unread_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = (
+            NotificationCounter.objects.filter(user=user)
+            .values_list("unread_count", flat=True)
+            .first()
+        ) or 0
+        cache.set(key, count, timeout=settings.NOTIFICATION_COUNT_TIMEOUT)
+    return max(count, 0)
+
+
+def _adjust_cached(user_ids, delta):
+    def adjust():
+        for user_id in user_ids:
+            try:
+                cache.incr(unread_cache_key(user_id), delta)
+            except ValueError:
+                # Not cached: the next read loads the counter row
+                pass
+
+    transaction.on_commit(adjust)
+
+
+def _set_cached(user_id, count):
+    transaction.on_commit(
+        lambda: cache.set(
+            unread_cache_key(user_id), count, timeout=settings.NOTIFICATION_COUNT_TIMEOUT
+        )
+    )
+
+
+def _notify_batch(user_ids, kind, title, message, data):
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                user_id=user_id, kind=kind, title=title, message=message, data=data
+            )
+            for user_id in user_ids
+        ]
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    NotificationCounter.objects.filter(user_id__in=user_ids).update(
+        unread_count=F("unread_count") + 1
+    )
+    _adjust_cached(user_ids, 1)
+
+
+@transaction.atomic(savepoint=False)
+def notify(user_ids, kind, title, message="", data=None):
+    """
+    Send the same notification to every user in ``user_ids``.
+
+    Each batch of ``FANOUT_BATCH_SIZE`` recipients costs three statements
+    however many users it holds. Returns the number of notifications.
+    """
+    batch = []
+    total = 0
+    for user_id in dict.fromkeys(user_ids):
+        batch.append(user_id)
+        if len(batch) == FANOUT_BATCH_SIZE:
+            _notify_batch(batch, kind, title, message, data or {})
+            total += len(batch)
+            batch = []
+    if batch:
+        _notify_batch(batch, kind, title, message, data or {})
+        total += len(batch)
+    return total
+
+
+@transaction.atomic(savepoint=False)
+def mark_read(user, notification_id):
+    """Mark one notification read; False if it was not an unread one of ``user``."""
+    updated = Notification.objects.filter(
+        pk=notification_id, user=user, is_read=False
+    ).update(is_read=True, read_at=timezone.now())
+    if updated:
+        NotificationCounter.objects.filter(user=user, unread_count__gt=0).update(
+            unread_count=F("unread_count") - 1
+        )
+        _adjust_cached([user.pk], -1)
+    return bool(updated)
+
+
+@transaction.atomic(savepoint=False)
+def mark_all_read(user):
+    """Mark every unread notification of ``user`` read; returns how many."""
+    updated = Notification.objects.filter(user=user, is_read=False).update(
+        is_read=True, read_at=timezone.now()
+    )
+    if updated:
+        NotificationCounter.objects.filter(user=user).update(unread_count=0)
+    _set_cached(user.pk, 0)
+    return updated
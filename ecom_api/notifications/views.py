@@ -1,3 +1,90 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from ecom_api.pagination import KeysetPagination
+from .models import Notification
+from .serializers import NotificationSerializer
+from .utils import mark_all_read, mark_read, unread_count
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def notification_list(request):
+    """
+    The user's notifications, newest first.
+    GET /api/notifications/?cursor=<next cursor>&unread=1
+    """
+    notifications = Notification.objects.filter(user=request.user)
+    if request.query_params.get("unread") in ("1", "true"):
+        notifications = notifications.filter(is_read=False)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(notifications, request)
+    return Response(
+        {
+            "success": True,
+            "message": "Notifications retrieved successfully",
+            "data": paginator.get_paginated_data(
+                NotificationSerializer(page, many=True).data
+            ),
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def notification_unread_count(request):
+    """
+    Number of unread notifications, for the badge.
+    GET /api/notifications/unread-count/
+
+    Read from the cache, or the user's counter row when it is cold; the
+    notifications are never counted.
+    """
+    return Response(
+        {
+            "success": True,
+            "message": "Unread count retrieved successfully",
+            "data": {"unread_count": unread_count(request.user)},
+        }
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def notification_read(request, notification_id):
+    """
+    Mark one notification read.
+    POST /api/notifications/<id>/read/
+    """
+    if not mark_read(request.user, notification_id):
+        if not Notification.objects.filter(
+            pk=notification_id, user=request.user
+        ).exists():
+            return Response(
+                {
+                    "success": False,
+                    "message": "Notification not found",
+                    "code": "not_found",
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+    return Response({"success": True, "message": "Notification marked as read"})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def notification_read_all(request):
+    """
+    Mark every notification read with a single UPDATE.
+    POST /api/notifications/read-all/
+    """
+    updated = mark_all_read(request.user)
+    return Response(
+        {
+            "success": True,
+            "message": "All notifications marked as read",
+            "data": {"updated": updated},
+        }
+    )
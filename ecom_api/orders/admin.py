@@ -1,3 +1,17 @@
 from django.contrib import admin
+from .models import Order, OrderItem
 
-# Register your models here.
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ('product', 'variant', 'vendor')
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ('order_number', 'user', 'status', 'total', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('order_number', 'user__email')
+    raw_id_fields = ('user',)
+    inlines = [OrderItemInline]
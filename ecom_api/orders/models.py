@@ -1,3 +1,119 @@
 from django.db import models
+from django.conf import settings
+from django.core.validators import MinValueValidator
 
-# Create your models here.
+
+class Order(models.Model):
+    """A placed order. Prices are snapshotted from the cart at checkout."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending Payment'),
+        ('paid', 'Paid'),
+        ('processing', 'Processing'),
+        ('shipped', 'Shipped'),
+        ('delivered', 'Delivered'),
+        ('cancelled', 'Cancelled'),
+    )
+
+    order_number = models.CharField(max_length=32, unique=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='orders'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+
+    # Totals
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2)
+    discount_total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text='Savings against compare-at prices'
+    )
+    coupon_code = models.CharField(max_length=50, blank=True, default='')
+    coupon_discount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    total_weight = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    requires_shipping = models.BooleanField(default=True)
+
+    # Summary for the order history, written at placement so listing orders
+    # never has to touch order_items
+    item_count = models.PositiveIntegerField(default=0)
+    first_item_image = models.CharField(max_length=255, blank=True, default='')
+
+    # Address copied at checkout so later edits don't change past orders
+    shipping_address = models.JSONField(default=dict, blank=True)
+    notes = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'orders'
+        ordering = ['-created_at']
+        verbose_name = 'Order'
+        verbose_name_plural = 'Orders'
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return self.order_number
+
+
+class OrderItem(models.Model):
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.SET_NULL,
+        related_name='order_items',
+        blank=True,
+        null=True
+    )
+    variant = models.ForeignKey(
+        'products.ProductVariant',
+        on_delete=models.SET_NULL,
+        related_name='order_items',
+        blank=True,
+        null=True
+    )
+    vendor = models.ForeignKey(
+        'vendors.Vendor',
+        on_delete=models.SET_NULL,
+        related_name='order_items',
+        blank=True,
+        null=True
+    )
+
+    # Snapshot of the catalog at checkout
+    product_name = models.CharField(max_length=300)
+    sku = models.CharField(max_length=100)
+    is_digital = models.BooleanField(default=False)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    compare_at_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    line_total = models.DecimalField(max_digits=12, decimal_places=2)
+    discount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'order_items'
+        ordering = ['id']
+        verbose_name = 'Order Item'
+        verbose_name_plural = 'Order Items'
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_name}"
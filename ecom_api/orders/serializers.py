@@ -0,0 +1,86 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from accounts.models import Address
+from .models import Order, OrderItem
+
+
+class CheckoutSerializer(serializers.Serializer):
+    address = serializers.PrimaryKeyRelatedField(
+        queryset=Address.objects.none(), required=False, allow_null=True
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, default="")
+    coupon_code = serializers.CharField(
+        max_length=50, required=False, allow_blank=True, default=""
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only the customer's own addresses can be used
+        self.fields["address"].queryset = Address.objects.filter(
+            user=self.context["request"].user
+        )
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = (
+            "id",
+            "product",
+            "variant",
+            "product_name",
+            "sku",
+            "is_digital",
+            "unit_price",
+            "compare_at_price",
+            "quantity",
+            "line_total",
+            "discount",
+        )
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """Order history row; reads only columns of the orders table."""
+    first_item_image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = (
+            "id",
+            "order_number",
+            "status",
+            "total",
+            "item_count",
+            "first_item_image",
+            "created_at",
+        )
+
+    def get_first_item_image(self, obj):
+        if not obj.first_item_image:
+            return None
+        return default_storage.url(obj.first_item_image)
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = (
+            "id",
+            "order_number",
+            "status",
+            "subtotal",
+            "discount_total",
+            "coupon_code",
+            "coupon_discount",
+            "total",
+            "total_weight",
+            "requires_shipping",
+            "shipping_address",
+            "notes",
+            "item_count",
+            "items",
+            "created_at",
+        )
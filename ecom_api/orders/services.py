@@ -0,0 +1,181 @@
+"""
+Order placement.
+
+``place_order`` turns a user's cart into an order inside one transaction:
+the cart row is locked (so a double-submitted checkout cannot order the
+same cart twice), prices are snapshotted with the batched cart pricing,
+stock is reserved with the conditional bulk UPDATEs of
+``inventory.reservations``, and the order and all of its lines are written
+with one INSERT each. The query count is the same for a 1-line cart and a
+100-line cart. A coupon is validated from the cache and redeemed with a
+conditional increment in the same transaction. Notifications are only
+enqueued once the transaction has committed.
+"""
+from functools import partial
+
+from django.db import IntegrityError, transaction
+
+from cart.models import Cart
+from cart.pricing import price_cart
+from cart.utils import UserCart
+from coupons.utils import CouponError, redeem_coupon, validate_coupon
+from ecom_api.ids import make_order_number
+from inventory.reservations import InsufficientStock, reserve_stock
+from notifications.utils import notify
+from products.models import ProductImage
+from .models import Order, OrderItem
+from .tasks import send_order_confirmation
+
+ADDRESS_SNAPSHOT_FIELDS = (
+    "full_name",
+    "phone_number",
+    "address_line_1",
+    "address_line_2",
+    "city",
+    "state",
+    "country",
+    "postal_code",
+)
+
+
+class CheckoutError(Exception):
+    def __init__(self, message, code, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.errors = errors
+
+
+def snapshot_address(address):
+    if address is None:
+        return {}
+    return {name: getattr(address, name) for name in ADDRESS_SNAPSHOT_FIELDS}
+
+
+def first_image(product_id):
+    """Storage name of the primary (or first) image of a product."""
+    return (
+        ProductImage.objects.filter(product_id=product_id)
+        .order_by("-is_primary", "display_order", "id")
+        .values_list("image", flat=True)
+        .first()
+    ) or ""
+
+
+def build_order_items(order, pricing):
+    return [
+        OrderItem(
+            order=order,
+            product_id=line.product_id,
+            variant_id=line.variant_id,
+            vendor_id=line.vendor_id,
+            product_name=line.name,
+            sku=line.sku,
+            is_digital=line.is_digital,
+            unit_price=line.unit_price,
+            compare_at_price=line.compare_at_price,
+            quantity=line.quantity,
+            line_total=line.line_total,
+            discount=line.discount,
+        )
+        for line in pricing.lines
+    ]
+
+
+def create_order(**fields):
+    """
+    Insert an order under a new order number.
+
+    Numbers come from the ID generator and need no lookup; should two
+    processes ever share a generator node, retry once with a fresh number.
+    """
+    try:
+        with transaction.atomic():
+            return Order.objects.create(order_number=make_order_number(), **fields)
+    except IntegrityError:
+        return Order.objects.create(order_number=make_order_number(), **fields)
+
+
+@transaction.atomic
+def place_order(user, address=None, notes="", coupon_code=""):
+    """
+    Place an order for everything in ``user``'s cart and empty the cart.
+
+    Raises ``CheckoutError`` (and leaves cart, stock and coupon usage
+    untouched) when the cart is empty, holds unavailable or out-of-stock
+    lines, needs a shipping address that was not given, or the coupon
+    cannot be applied.
+    """
+    # Serialises concurrent checkouts of the same cart
+    if not Cart.objects.select_for_update().filter(user=user).exists():
+        raise CheckoutError("Your cart is empty", "empty_cart")
+    cart = UserCart(user)
+    lines = cart.lines()
+    if not lines:
+        raise CheckoutError("Your cart is empty", "empty_cart")
+
+    pricing = price_cart(lines)
+    unavailable = [line.product_id for line in pricing.lines if not line.available]
+    if unavailable:
+        raise CheckoutError(
+            "Some items in your cart are no longer available",
+            "unavailable_items",
+            {"products": unavailable},
+        )
+    if pricing.requires_shipping and address is None:
+        raise CheckoutError("A shipping address is required", "address_required")
+
+    coupon = None
+    coupon_discount = 0
+    if coupon_code:
+        try:
+            coupon, coupon_discount = validate_coupon(coupon_code, pricing)
+        except CouponError as exc:
+            raise CheckoutError(exc.message, exc.code) from None
+
+    order = create_order(
+        user=user,
+        subtotal=pricing.subtotal,
+        discount_total=pricing.discount_total,
+        coupon_code=coupon["code"] if coupon else "",
+        coupon_discount=coupon_discount,
+        total=pricing.subtotal - coupon_discount,
+        total_weight=pricing.total_weight,
+        requires_shipping=pricing.requires_shipping,
+        item_count=pricing.item_count,
+        first_item_image=first_image(lines[0][0]),
+        shipping_address=snapshot_address(address),
+        notes=notes,
+    )
+    try:
+        # Rolled back with the order if stock runs out
+        reserve_stock(lines, order.order_number)
+    except InsufficientStock as exc:
+        raise CheckoutError(
+            "Some items in your cart are out of stock",
+            "out_of_stock",
+            {
+                "lines": [
+                    {"product": product_id, "variant": variant_id}
+                    for product_id, variant_id in exc.lines
+                ]
+            },
+        ) from None
+
+    OrderItem.objects.bulk_create(build_order_items(order, pricing))
+    if coupon:
+        try:
+            redeem_coupon(coupon, user, order, coupon_discount)
+        except CouponError as exc:
+            # Rolls back the order and the stock reservations
+            raise CheckoutError(exc.message, exc.code) from None
+    cart.clear()
+    notify(
+        [user.pk],
+        "order_placed",
+        f"Order {order.order_number} placed",
+        data={"order_number": order.order_number},
+    )
+
+    transaction.on_commit(partial(send_order_confirmation.delay, order.id))
+    return order
@@ -0,0 +1,18 @@
+from celery import shared_task
+
+from .models import Order
+from .utils import send_order_confirmation_email
+
+
+@shared_task
+def send_order_confirmation(order_id):
+    """Email the customer a summary of a newly placed order."""
+    order = (
+        Order.objects.select_related('user')
+        .prefetch_related('items')
+        .filter(pk=order_id)
+        .first()
+    )
+    if order is None:
+        return False
+    return send_order_confirmation_email(order)
@@ -1,3 +1,239 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from benchmarks.seed import seed_all
+from cart.utils import UserCart
+from ecom_api.query_budget import QueryBudgetMixin
+from inventory.models import StockReservation
+from products.models import Product
+from .models import Order, OrderItem
+from .tasks import send_order_confirmation
+from .urls import query_budgets, urlpatterns
+
+
+class CheckoutTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all(
+            {"categories": 2, "products": 12, "variants": 0, "users": 2, "addresses": 1}
+        )
+        Product.objects.update(
+            stock_quantity=100, track_inventory=True, allow_backorder=False
+        )
+        cls.user, cls.other = User.objects.filter(
+            email__startswith="bench-user-"
+        ).order_by("email")
+        cls.products = list(Product.objects.order_by("id"))
+
+    def setUp(self):
+        cache.clear()
+
+    def checkout(self, user, **data):
+        client = APIClient()
+        client.force_authenticate(user)
+        data.setdefault("address", user.addresses.get().pk)
+        return self.assertWithinQueryBudget(
+            "checkout", client.post, reverse("checkout"), data, format="json"
+        )
+
+    def stock(self, product):
+        return Product.objects.values_list("stock_quantity", flat=True).get(pk=product.pk)
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_checkout_places_order_and_clears_cart(self):
+        UserCart(self.user).add(self.products[1].id, quantity=3)
+        UserCart(self.user).add(self.products[2].id, quantity=1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.checkout(self.user, notes="Leave at the door")
+
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.data["data"]["id"])
+        self.assertEqual(order.items.count(), 2)
+        self.assertEqual(order.shipping_address["city"], "Pune")
+        self.assertEqual(
+            order.total, sum(item.line_total for item in order.items.all())
+        )
+        self.assertEqual(self.stock(self.products[1]), 97)
+        self.assertEqual(
+            StockReservation.objects.filter(reference=order.order_number).count(), 2
+        )
+        self.assertEqual(UserCart(self.user).lines(), [])
+        self.assertEqual(order.item_count, 4)
+        self.assertTrue(order.first_item_image.startswith("products/bench/"))
+        self.assertTrue(
+            self.user.notifications.filter(
+                kind="order_placed", data__order_number=order.order_number
+            ).exists()
+        )
+        # The confirmation and the cached unread count only follow the commit
+        self.assertEqual(len(callbacks), 2)
+
+    def test_query_count_does_not_depend_on_cart_size(self):
+        UserCart(self.user).add(self.products[1].id)
+        for product in self.products[1:11]:
+            UserCart(self.other).add(product.id, quantity=2)
+
+        counts = []
+        for user in (self.user, self.other):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.checkout(user)
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(captured))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_out_of_stock_leaves_cart_and_stock_untouched(self):
+        Product.objects.filter(pk=self.products[2].pk).update(stock_quantity=1)
+        UserCart(self.user).add(self.products[1].id, quantity=2)
+        UserCart(self.user).add(self.products[2].id, quantity=2)
+
+        response = self.checkout(self.user)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["code"], "out_of_stock")
+        self.assertEqual(
+            response.data["errors"]["lines"],
+            [{"product": self.products[2].id, "variant": None}],
+        )
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.stock(self.products[1]), 100)
+        self.assertEqual(len(UserCart(self.user).lines()), 2)
+
+    def test_taken_order_number_is_retried(self):
+        UserCart(self.user).add(self.products[1].id)
+        first = self.checkout(self.user).data["data"]
+        UserCart(self.user).add(self.products[2].id)
+        with mock.patch(
+            "orders.services.make_order_number",
+            side_effect=[first["order_number"], "ORD-RETRIED"],
+        ):
+            # The failed insert is over the budget of a normal checkout
+            client = APIClient()
+            client.force_authenticate(self.user)
+            response = client.post(
+                reverse("checkout"),
+                {"address": self.user.addresses.get().pk},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["data"]["order_number"], "ORD-RETRIED")
+        self.assertEqual(
+            StockReservation.objects.filter(reference="ORD-RETRIED").count(), 1
+        )
+
+    def test_empty_cart_is_rejected(self):
+        response = self.checkout(self.user)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["code"], "empty_cart")
+
+    def test_confirmation_email(self):
+        UserCart(self.user).add(self.products[1].id)
+        order_id = self.checkout(self.user).data["data"]["id"]
+
+        self.assertTrue(send_order_confirmation(order_id))
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertIn(Order.objects.get(pk=order_id).order_number, mail.outbox[0].subject)
+
+
+class OrderHistoryTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all(
+            {"categories": 1, "products": 2, "variants": 0, "users": 2, "addresses": 0}
+        )
+        cls.user, cls.other = User.objects.filter(
+            email__startswith="bench-user-"
+        ).order_by("email")
+        Order.objects.bulk_create(
+            [
+                Order(
+                    order_number=f"ORD-TEST-{index:04d}",
+                    user=cls.user,
+                    subtotal=index,
+                    total=index,
+                    item_count=1,
+                )
+                for index in range(25)
+            ]
+            + [Order(order_number="ORD-OTHER", user=cls.other, subtotal=1, total=1)]
+        )
+        # Pairs of orders share a timestamp so the id tie-breaker is exercised
+        base = timezone.now()
+        for index in range(25):
+            Order.objects.filter(order_number=f"ORD-TEST-{index:04d}").update(
+                created_at=base - timedelta(minutes=index // 2)
+            )
+        order = Order.objects.get(order_number="ORD-TEST-0000")
+        product = Product.objects.first()
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    product=product,
+                    product_name=product.name,
+                    sku=product.sku,
+                    unit_price=product.price,
+                    quantity=quantity,
+                    line_total=product.price * quantity,
+                )
+                for quantity in (1, 2)
+            ]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_history_is_paged_by_cursor(self):
+        numbers = []
+        url = reverse("order_list") + "?page_size=10"
+        while url:
+            response = self.assertWithinQueryBudget("order_list", self.client.get, url)
+            self.assertEqual(response.status_code, 200)
+            numbers += [order["order_number"] for order in response.data["data"]["results"]]
+            url = response.data["data"]["next"]
+
+        expected = list(
+            Order.objects.filter(user=self.user)
+            .order_by("-created_at", "-id")
+            .values_list("order_number", flat=True)
+        )
+        self.assertEqual(numbers, expected)
+        self.assertEqual(len(numbers), 25)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("order_list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_detail_prefetches_items(self):
+        response = self.assertWithinQueryBudget(
+            "order_detail",
+            self.client.get,
+            reverse("order_detail", kwargs={"order_number": "ORD-TEST-0000"}),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]["items"]), 2)
 
-# Create your tests here.
+    def test_other_users_orders_are_hidden(self):
+        response = self.client.get(
+            reverse("order_detail", kwargs={"order_number": "ORD-OTHER"})
+        )
+        self.assertEqual(response.status_code, 404)
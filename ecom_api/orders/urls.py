@@ -0,0 +1,15 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.order_list, name="order_list"),
+    path("checkout/", views.checkout, name="checkout"),
+    path("<str:order_number>/", views.order_detail, name="order_detail"),
+]
+
+# Maximum SQL queries per request, enforced by orders/tests.py
+query_budgets = {
+    "order_list": 1,
+    "order_detail": 2,
+    "checkout": 22,
+}
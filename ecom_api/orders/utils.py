@@ -0,0 +1,31 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+logger = logging.getLogger(__name__)
+
+
+def send_order_confirmation_email(order):
+    """Send the order confirmation email to the customer."""
+    try:
+        context = {
+            'user': order.user,
+            'order': order,
+            'items': order.items.all(),
+        }
+        html_message = render_to_string('emails/order_confirmation.html', context)
+        send_mail(
+            subject=f'Order {order.order_number} confirmed',
+            message=strip_tags(html_message),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[order.user.email],
+            html_message=html_message,
+            fail_silently=False
+        )
+        return True
+    except Exception:
+        logger.exception("Error sending confirmation email for order %s", order.pk)
+        return False
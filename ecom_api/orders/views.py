@@ -1,3 +1,115 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from ecom_api.pagination import KeysetPagination
+from .models import Order
+from .serializers import CheckoutSerializer, OrderSerializer, OrderSummarySerializer
+from .services import CheckoutError, place_order
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def order_list(request):
+    """
+    The user's order history, newest first.
+    GET /api/orders/?cursor=<next cursor>&page_size=20
+
+    Paged by a cursor on (created_at, id) rather than an offset, so deep
+    pages cost the same as the first one.
+    """
+    paginator = KeysetPagination()
+    orders = paginator.paginate_queryset(
+        Order.objects.filter(user=request.user).only(
+            *OrderSummarySerializer.Meta.fields
+        ),
+        request,
+    )
+    return Response(
+        {
+            "success": True,
+            "message": "Orders retrieved successfully",
+            "data": paginator.get_paginated_data(
+                OrderSummarySerializer(orders, many=True).data
+            ),
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def order_detail(request, order_number):
+    """
+    A single order with its items.
+    GET /api/orders/<order_number>/
+    """
+    order = (
+        Order.objects.filter(user=request.user, order_number=order_number)
+        .prefetch_related("items")
+        .first()
+    )
+    if order is None:
+        return Response(
+            {"success": False, "message": "Order not found", "code": "not_found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(
+        {
+            "success": True,
+            "message": "Order retrieved successfully",
+            "data": OrderSerializer(order).data,
+        }
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def checkout(request):
+    """
+    Place an order for the contents of the user's cart.
+    POST /api/orders/checkout/
+    {"address": <address id>, "notes": "...", "coupon_code": "SUMMER10"}
+    """
+    serializer = CheckoutSerializer(data=request.data, context={"request": request})
+    if not serializer.is_valid():
+        return Response(
+            {
+                "success": False,
+                "message": "Invalid checkout data",
+                "code": "invalid_checkout",
+                "errors": serializer.errors,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        order = place_order(
+            request.user,
+            address=serializer.validated_data.get("address"),
+            notes=serializer.validated_data["notes"],
+            coupon_code=serializer.validated_data["coupon_code"],
+        )
+    except CheckoutError as exc:
+        return Response(
+            {
+                "success": False,
+                "message": exc.message,
+                "code": exc.code,
+                "errors": exc.errors,
+            },
+            status=(
+                status.HTTP_409_CONFLICT
+                if exc.code == "out_of_stock"
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+    return Response(
+        {
+            "success": True,
+            "message": "Order placed successfully",
+            "data": OrderSerializer(order).data,
+        },
+        status=status.HTTP_201_CREATED,
+    )
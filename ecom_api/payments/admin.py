@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import Payment, PaymentWebhookEvent
 
-# Register your models here.
+
+@admin.register(PaymentWebhookEvent)
+class PaymentWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('gateway', 'event_id', 'event_type', 'status', 'attempts', 'occurred_at', 'received_at')
+    list_filter = ('gateway', 'status', 'event_type')
+    search_fields = ('event_id',)
+    readonly_fields = ('payload',)
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ('gateway_payment_id', 'gateway', 'order', 'amount', 'currency', 'status', 'updated_at')
+    list_filter = ('gateway', 'status')
+    search_fields = ('gateway_payment_id', 'order__order_number')
+    raw_id_fields = ('order',)
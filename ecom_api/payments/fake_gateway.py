@@ -0,0 +1,61 @@
+"""
+A local stand-in for a payment gateway, used to load test the webhook
+receiver. It produces signed events in the gateway's format and can
+redeliver and reorder them the way real gateways do.
+"""
+import json
+import random
+import time
+
+from ecom_api.ids import next_id
+from .webhooks import SIGNATURE_HEADER, sign
+
+
+class FakeGateway:
+    name = "fake"
+
+    def __init__(self, secret, seed=None):
+        self.secret = secret
+        self.rng = random.Random(seed)
+
+    def event(self, event_type, order, payment_id, created):
+        return {
+            "id": f"evt_{next_id()}",
+            "type": event_type,
+            "created": created,
+            "data": {
+                "payment_id": payment_id,
+                "order_number": order.order_number,
+                "amount": str(order.total),
+                "currency": "INR",
+            },
+        }
+
+    def payment_events(self, order, fail=False):
+        """Events of one payment attempt, in the order they happened."""
+        payment_id = f"pay_{next_id()}"
+        created = int(time.time())
+        return [
+            self.event("payment.authorized", order, payment_id, created),
+            self.event(
+                "payment.failed" if fail else "payment.succeeded",
+                order,
+                payment_id,
+                created + 1,
+            ),
+        ]
+
+    def deliveries(self, orders, failure_rate=0.0, duplicate_rate=0.0, shuffle=False):
+        """Events for ``orders``, with redeliveries and optionally reordered."""
+        events = []
+        for order in orders:
+            events += self.payment_events(order, fail=self.rng.random() < failure_rate)
+        events += [event for event in events if self.rng.random() < duplicate_rate]
+        if shuffle:
+            self.rng.shuffle(events)
+        return events
+
+    def encode(self, event):
+        """Request body and headers for delivering ``event``."""
+        body = json.dumps(event).encode()
+        return body, {SIGNATURE_HEADER: sign(body, self.secret)}
@@ -0,0 +1,150 @@
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from accounts.models import User
+from ecom_api.ids import make_order_number
+from orders.models import Order
+from payments import views
+from payments.fake_gateway import FakeGateway
+from payments.models import PaymentWebhookEvent
+from payments.services import process_event
+from payments.webhooks import get_webhook_secret
+
+
+class Command(BaseCommand):
+    help = (
+        "Pay pending orders through a fake gateway by replaying signed webhook "
+        "events, with redeliveries and out-of-order delivery, for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=1000)
+        parser.add_argument(
+            "--create-orders",
+            action="store_true",
+            help="Create synthetic pending orders when there are not enough.",
+        )
+        parser.add_argument("--failure-rate", type=float, default=0.05)
+        parser.add_argument("--duplicate-rate", type=float, default=0.1)
+        parser.add_argument("--shuffle", action="store_true")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument(
+            "--url",
+            help="Webhook URL of a running server. Without it events are "
+            "delivered and processed in this process.",
+        )
+        parser.add_argument("--workers", type=int, default=8)
+
+    def handle(self, *args, **options):
+        secret = get_webhook_secret(FakeGateway.name)
+        if secret is None:
+            raise CommandError("Set FAKE_GATEWAY_WEBHOOK_SECRET first.")
+        gateway = FakeGateway(secret, seed=options["seed"])
+
+        orders = self.get_orders(options["orders"], options["create_orders"])
+        events = gateway.deliveries(
+            orders,
+            failure_rate=options["failure_rate"],
+            duplicate_rate=options["duplicate_rate"],
+            shuffle=options["shuffle"],
+        )
+        self.stdout.write(f"Delivering {len(events)} events for {len(orders)} orders ...")
+
+        if options["url"]:
+            elapsed, statuses = self.deliver_http(
+                gateway, events, options["url"], options["workers"]
+            )
+        else:
+            elapsed, statuses = self.deliver_in_process(gateway, events)
+        self.stdout.write(
+            f"Delivered in {elapsed:.2f}s ({len(events) / elapsed:.1f} events/s), "
+            f"responses: {dict(sorted(statuses.items()))}"
+        )
+
+        if not options["url"]:
+            start = time.perf_counter()
+            pending = list(
+                PaymentWebhookEvent.objects.filter(status="pending")
+                .order_by("received_at")
+                .values_list("id", flat=True)
+            )
+            for event_id in pending:
+                process_event(event_id)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"Processed {len(pending)} events in {elapsed:.2f}s "
+                f"({len(pending) / elapsed if elapsed else 0:.1f} events/s)"
+            )
+            paid = Order.objects.filter(pk__in=[order.pk for order in orders], status="paid")
+            self.stdout.write(f"{paid.count()} of {len(orders)} orders paid")
+
+    def get_orders(self, count, create):
+        orders = list(Order.objects.filter(status="pending").order_by("id")[:count])
+        missing = count - len(orders)
+        if missing and create:
+            user = User.objects.order_by("id").first()
+            if user is None:
+                raise CommandError("Create a user first.")
+            Order.objects.bulk_create(
+                [
+                    Order(
+                        order_number=make_order_number(),
+                        user=user,
+                        subtotal=100,
+                        total=100,
+                    )
+                    for _ in range(missing)
+                ],
+                batch_size=1000,
+            )
+            orders = list(Order.objects.filter(status="pending").order_by("id")[:count])
+        if not orders:
+            raise CommandError("No pending orders to pay (use --create-orders).")
+        return orders
+
+    def deliver_in_process(self, gateway, events):
+        """Call the webhook view directly; processing is done afterwards."""
+        factory = RequestFactory()
+        statuses = {}
+        start = time.perf_counter()
+        with mock.patch("payments.webhooks.process_payment_event"):
+            for event in events:
+                body, headers = gateway.encode(event)
+                request = factory.post(
+                    f"/api/payments/webhooks/{gateway.name}/",
+                    body,
+                    content_type="application/json",
+                    headers=headers,
+                )
+                response = views.payment_webhook(request, gateway.name)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        return time.perf_counter() - start, statuses
+
+    def deliver_http(self, gateway, events, url, workers):
+        def post(event):
+            body, headers = gateway.encode(event)
+            request = urllib.request.Request(
+                url,
+                data=body,
+                headers={**headers, "Content-Type": "application/json"},
+                method="POST",
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    return response.status
+            except urllib.error.HTTPError as exc:
+                return exc.code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            codes = list(executor.map(post, events))
+        statuses = {}
+        for code in codes:
+            statuses[code] = statuses.get(code, 0) + 1
+        return time.perf_counter() - start, statuses
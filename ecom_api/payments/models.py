@@ -1,3 +1,102 @@
 from django.db import models
 
-# Create your models here.
+
+class PaymentWebhookEvent(models.Model):
+    """
+    Raw event delivered by a payment gateway.
+
+    Stored as received before any processing; the unique (gateway, event_id)
+    constraint makes redelivered events no-ops.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    )
+
+    gateway = models.CharField(max_length=50)
+    event_id = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    occurred_at = models.DateTimeField(help_text='When the gateway created the event')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'payment_webhook_events'
+        ordering = ['-received_at']
+        verbose_name = 'Payment Webhook Event'
+        verbose_name_plural = 'Payment Webhook Events'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['gateway', 'event_id'],
+                name='unique_gateway_event'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.gateway}:{self.event_id}"
+
+
+class Payment(models.Model):
+    """A payment at a gateway, kept in sync from its webhook events."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('authorized', 'Authorized'),
+        ('failed', 'Failed'),
+        ('succeeded', 'Succeeded'),
+        ('refunded', 'Refunded'),
+    )
+    # A payment only moves forward through these; events that would move it
+    # back (late or out-of-order deliveries) are ignored
+    STATUS_RANK = {
+        'pending': 0,
+        'authorized': 1,
+        'failed': 2,
+        'succeeded': 3,
+        'refunded': 4,
+    }
+
+    order = models.ForeignKey(
+        'orders.Order',
+        on_delete=models.PROTECT,
+        related_name='payments'
+    )
+    gateway = models.CharField(max_length=50)
+    gateway_payment_id = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    currency = models.CharField(max_length=3, default='INR')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    last_event_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'payments'
+        ordering = ['-created_at']
+        verbose_name = 'Payment'
+        verbose_name_plural = 'Payments'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['gateway', 'gateway_payment_id'],
+                name='unique_gateway_payment'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.gateway}:{self.gateway_payment_id} ({self.status})"
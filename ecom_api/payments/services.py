@@ -0,0 +1,111 @@
+"""
+Processing stored gateway events.
+
+Events are applied one at a time under a row lock on the event, so a
+redelivered or re-enqueued event is applied at most once. Gateways do not
+guarantee delivery order, so a payment only ever moves forward in
+``Payment.STATUS_RANK``: a ``payment.authorized`` that arrives after
+``payment.succeeded`` is recorded as ignored instead of reverting it.
+"""
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from inventory.reservations import commit_reservations
+from notifications.utils import notify
+from orders.models import Order
+from .models import Payment, PaymentWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+EVENT_STATUSES = {
+    "payment.authorized": "authorized",
+    "payment.failed": "failed",
+    "payment.succeeded": "succeeded",
+    "payment.refunded": "refunded",
+}
+
+
+class EventError(Exception):
+    pass
+
+
+def apply_event(event):
+    """Apply ``event`` to its payment and order; returns the new event status."""
+    status = EVENT_STATUSES.get(event.event_type)
+    if status is None:
+        return "ignored"
+
+    data = event.payload.get("data") or {}
+    try:
+        payment_id = str(data["payment_id"])
+        amount = Decimal(str(data["amount"]))
+        order = Order.objects.select_for_update().get(order_number=data["order_number"])
+    except (KeyError, InvalidOperation):
+        raise EventError("Event data is incomplete")
+    except Order.DoesNotExist:
+        raise EventError(f"Unknown order {data['order_number']}")
+
+    payment, created = Payment.objects.select_for_update().get_or_create(
+        gateway=event.gateway,
+        gateway_payment_id=payment_id,
+        defaults={
+            "order": order,
+            "amount": amount,
+            "currency": data.get("currency") or "INR",
+        },
+    )
+    if payment.order_id != order.pk:
+        raise EventError(f"Payment {payment_id} belongs to another order")
+    if Payment.STATUS_RANK[status] <= Payment.STATUS_RANK[payment.status]:
+        # Stale or out-of-order delivery
+        return "ignored"
+
+    if status == "succeeded":
+        if amount != order.total:
+            raise EventError(f"Paid {amount} but order total is {order.total}")
+        if order.status == "pending":
+            order.status = "paid"
+            order.save(update_fields=["status", "updated_at"])
+            notify(
+                [order.user_id],
+                "order_paid",
+                f"Payment received for order {order.order_number}",
+                data={"order_number": order.order_number},
+            )
+        if not commit_reservations(order.order_number):
+            logger.warning(
+                "Order %s was paid after its stock reservations expired",
+                order.order_number,
+            )
+
+    payment.status = status
+    payment.last_event_at = max(
+        filter(None, [payment.last_event_at, event.occurred_at])
+    )
+    payment.save(update_fields=["status", "last_event_at", "updated_at"])
+    return "processed"
+
+
+def process_event(event_id):
+    """Process a stored event once; safe to call again for the same event."""
+    with transaction.atomic():
+        event = (
+            PaymentWebhookEvent.objects.select_for_update()
+            .filter(pk=event_id, status="pending")
+            .first()
+        )
+        if event is None:
+            return None
+        event.attempts += 1
+        try:
+            with transaction.atomic():
+                event.status = apply_event(event)
+        except EventError as exc:
+            event.status = "failed"
+            event.error = str(exc)
+        event.processed_at = timezone.now()
+        event.save(update_fields=["status", "attempts", "error", "processed_at"])
+        return event.status
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from .models import PaymentWebhookEvent
+from .services import process_event
+
+
+@shared_task
+def process_payment_event(event_id):
+    """Apply one stored gateway event."""
+    return process_event(event_id)
+
+
+@shared_task
+def process_pending_payment_events(older_than=60, batch_size=500):
+    """Pick up events whose processing task was lost (e.g. broker outage)."""
+    event_ids = list(
+        PaymentWebhookEvent.objects.filter(
+            status="pending",
+            received_at__lte=timezone.now() - timedelta(seconds=older_than),
+        )
+        .order_by("occurred_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    for event_id in event_ids:
+        process_event(event_id)
+    return len(event_ids)
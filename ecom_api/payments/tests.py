@@ -1,3 +1,168 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from kombu.exceptions import OperationalError
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from benchmarks.seed import seed_all
+from ecom_api.query_budget import QueryBudgetMixin
+from inventory.models import StockReservation
+from inventory.reservations import reserve_stock
+from orders.models import Order
+from products.models import Product
+from .fake_gateway import FakeGateway
+from .models import Payment, PaymentWebhookEvent
+from .services import process_event
+from .urls import query_budgets, urlpatterns
+from .webhooks import SIGNATURE_HEADER, sign
+
+SECRET = "test-webhook-secret"
+
+
+@override_settings(PAYMENT_WEBHOOK_SECRETS={"fake": SECRET})
+class PaymentWebhookTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 1, "products": 1, "variants": 0, "users": 1})
+        cls.user = User.objects.get(email="bench-user-0@example.com")
+        cls.product = Product.objects.get()
+        Product.objects.update(stock_quantity=10, track_inventory=True)
+        cls.order = Order.objects.create(
+            order_number="ORD-PAY-1", user=cls.user, subtotal=100, total=100
+        )
+        reserve_stock([(cls.product.id, None, 2)], cls.order.order_number)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.gateway = FakeGateway(SECRET, seed=1)
+
+    def deliver(self, event, gateway="fake", secret=SECRET):
+        body, headers = FakeGateway(secret).encode(event)
+        return self.assertWithinQueryBudget(
+            "payment_webhook",
+            self.client.post,
+            reverse("payment_webhook", kwargs={"gateway": gateway}),
+            body,
+            content_type="application/json",
+            headers=headers,
+        )
+
+    def deliver_and_process(self, *events):
+        for event in events:
+            with self.captureOnCommitCallbacks():
+                self.deliver(event)
+        for event in events:
+            stored = PaymentWebhookEvent.objects.get(event_id=event["id"])
+            process_event(stored.pk)
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_event_is_stored_and_processed_later(self):
+        authorized, succeeded = self.gateway.payment_events(self.order)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.deliver(succeeded)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(callbacks), 1)
+        event = PaymentWebhookEvent.objects.get()
+        self.assertEqual(event.status, "pending")
+        self.assertFalse(Payment.objects.exists())
+
+    def test_broker_outage_still_acknowledges_the_event(self):
+        authorized, succeeded = self.gateway.payment_events(self.order)
+        with mock.patch(
+            "payments.webhooks.process_payment_event.delay",
+            side_effect=OperationalError("broker down"),
+        ):
+            with self.assertLogs("payments.webhooks", "ERROR"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.deliver(succeeded)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PaymentWebhookEvent.objects.get().status, "pending")
+
+    def test_rejects_bad_requests(self):
+        authorized, succeeded = self.gateway.payment_events(self.order)
+        self.assertEqual(self.deliver(succeeded, secret="wrong").status_code, 403)
+        self.assertEqual(self.deliver(succeeded, gateway="other").status_code, 404)
+        response = self.client.post(
+            reverse("payment_webhook", kwargs={"gateway": "fake"}),
+            b"not json",
+            content_type="application/json",
+            headers={SIGNATURE_HEADER: sign(b"not json", SECRET)},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaymentWebhookEvent.objects.exists())
+
+    def test_duplicate_delivery_is_acknowledged_once(self):
+        authorized, succeeded = self.gateway.payment_events(self.order)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(self.deliver(succeeded).status_code, 200)
+            self.assertEqual(self.deliver(succeeded).status_code, 200)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(PaymentWebhookEvent.objects.count(), 1)
+
+    def test_success_marks_order_paid_and_commits_stock(self):
+        self.deliver_and_process(*self.gateway.payment_events(self.order))
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "paid")
+        self.assertEqual(Payment.objects.get().status, "succeeded")
+        self.assertEqual(
+            set(StockReservation.objects.values_list("status", flat=True)),
+            {"committed"},
+        )
+
+    def test_out_of_order_delivery_does_not_regress(self):
+        authorized, succeeded = self.gateway.payment_events(self.order)
+        self.deliver_and_process(succeeded, authorized)
+
+        self.assertEqual(Payment.objects.get().status, "succeeded")
+        self.assertEqual(
+            PaymentWebhookEvent.objects.get(event_id=authorized["id"]).status,
+            "ignored",
+        )
+
+    def test_processing_is_idempotent(self):
+        authorized, succeeded = self.gateway.payment_events(self.order)
+        self.deliver_and_process(succeeded)
+        event = PaymentWebhookEvent.objects.get()
+
+        self.assertIsNone(process_event(event.pk))
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 1)
+
+    def test_amount_mismatch_fails_the_event(self):
+        authorized, succeeded = self.gateway.payment_events(self.order)
+        succeeded["data"]["amount"] = "1.00"
+        self.deliver_and_process(succeeded)
+
+        event = PaymentWebhookEvent.objects.get()
+        self.assertEqual(event.status, "failed")
+        self.assertIn("order total", event.error)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "pending")
+
+    def test_fake_gateway_replay(self):
+        Order.objects.all().delete()
+        StockReservation.objects.all().delete()
+        call_command(
+            "replay_fake_gateway",
+            orders=20,
+            create_orders=True,
+            failure_rate=0,
+            duplicate_rate=0.5,
+            shuffle=True,
+            seed=3,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Order.objects.filter(status="paid").count(), 20)
+        self.assertEqual(Payment.objects.filter(status="succeeded").count(), 20)
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("webhooks/<str:gateway>/", views.payment_webhook, name="payment_webhook"),
+]
+
+# Maximum SQL queries per request, enforced by payments/tests.py
+query_budgets = {
+    "payment_webhook": 4,
+}
@@ -1,3 +1,60 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+    throttle_classes,
+)
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
-# Create your views here.
+from .webhooks import (
+    SIGNATURE_HEADER,
+    InvalidWebhook,
+    get_webhook_secret,
+    parse_event,
+    store_event,
+    verify_signature,
+)
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([])
+def payment_webhook(request, gateway):
+    """
+    Receive a payment gateway event.
+    POST /api/payments/webhooks/<gateway>/
+
+    The event is verified and stored, then processed asynchronously, so
+    this answers 200 right away. Redelivered events are acknowledged
+    without being stored again.
+    """
+    secret = get_webhook_secret(gateway)
+    if secret is None:
+        return Response(
+            {"success": False, "message": "Unknown gateway"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    body = request.body
+    if not verify_signature(body, request.headers.get(SIGNATURE_HEADER), secret):
+        return Response(
+            {"success": False, "message": "Invalid signature"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    try:
+        event = parse_event(body)
+    except InvalidWebhook as exc:
+        return Response(
+            {"success": False, "message": str(exc)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    stored = store_event(gateway, event)
+    return Response(
+        {
+            "success": True,
+            "message": "Event received" if stored else "Duplicate event ignored",
+        }
+    )
@@ -0,0 +1,84 @@
+"""
+Receiving gateway webhooks.
+
+Gateways POST a JSON event::
+
+    {"id": "evt_...", "type": "payment.succeeded", "created": 1760000000,
+     "data": {"payment_id": "pay_...", "order_number": "ORD-...",
+              "amount": "499.00", "currency": "INR"}}
+
+signed with HMAC-SHA256 of the raw body in the ``X-Webhook-Signature``
+header. The receiver only verifies, parses and stores the event; all
+processing happens in a Celery task so the gateway gets its 200 at once.
+"""
+import hashlib
+import hmac
+import json
+import logging
+from datetime import datetime, timezone
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from kombu.exceptions import OperationalError
+
+from .models import PaymentWebhookEvent
+from .tasks import process_payment_event
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+class InvalidWebhook(Exception):
+    pass
+
+
+def get_webhook_secret(gateway):
+    return settings.PAYMENT_WEBHOOK_SECRETS.get(gateway) or None
+
+
+def sign(body, secret):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature, secret):
+    return bool(signature) and hmac.compare_digest(sign(body, secret), signature)
+
+
+def parse_event(body):
+    try:
+        payload = json.loads(body)
+        return {
+            "event_id": str(payload["id"]),
+            "event_type": str(payload["type"]),
+            "occurred_at": datetime.fromtimestamp(int(payload["created"]), tz=timezone.utc),
+            "payload": payload,
+        }
+    except (ValueError, TypeError, KeyError, OverflowError) as exc:
+        raise InvalidWebhook(f"Malformed event: {exc}") from None
+
+
+def store_event(gateway, event):
+    """
+    Save a parsed event and enqueue its processing.
+
+    Returns the new event, or None when the gateway redelivered an event
+    that was already stored.
+    """
+    try:
+        with transaction.atomic():
+            stored = PaymentWebhookEvent.objects.create(gateway=gateway, **event)
+    except IntegrityError:
+        return None
+    transaction.on_commit(partial(enqueue_event, stored.pk))
+    return stored
+
+
+def enqueue_event(event_id):
+    try:
+        process_payment_event.delay(event_id)
+    except (OperationalError, OSError):
+        # The event is stored as pending and the gateway must still get its
+        # 200; process_pending_payment_events picks it up later
+        logger.exception("Could not enqueue payment event %s", event_id)
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('vendors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='low_stock',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('stock_quantity__gt', 0), ('stock_quantity__lte', models.F('low_stock_threshold')), ('track_inventory', True)), output_field=models.BooleanField()),
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='low_stock',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('stock_quantity__gt', 0), ('stock_quantity__lte', models.F('low_stock_threshold'))), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['low_stock', 'vendor'], name='products_low_sto_99c41e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(fields=['low_stock'], name='product_var_low_sto_e88053_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def fill_rating_histogram(apps, schema_editor):
+    """
+    Count the stars of reviews approved before the rating_N counters
+    existed, with the grouped aggregate of ``Product.update_rating``.
+    """
+    Product = apps.get_model('products', 'Product')
+    ProductReview = apps.get_model('reviews', 'ProductReview')
+    histograms = (
+        ProductReview.objects.filter(status='approved')
+        .values('product_id')
+        .annotate(**{
+            f'rating_{stars}': Count('id', filter=Q(rating=stars))
+            for stars in range(1, 6)
+        })
+        .order_by()
+    )
+    for histogram in histograms.iterator():
+        product_id = histogram.pop('product_id')
+        Product.objects.filter(pk=product_id).update(**histogram)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_child_updated_at'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_rating_histogram, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
-import uuid
+from django.db.models import F, Q
+from ecom_api.ids import make_sku
 from django.utils import timezone
 
 class Category(models.Model):
@@ -184,6 +185,16 @@ class Product(models.Model):
         default=False,
         help_text='Allow customers to purchase out-of-stock products'
     )
+    # Stored copy of is_low_stock so low-stock products can be found by index
+    low_stock = models.GeneratedField(
+        expression=Q(
+            track_inventory=True,
+            stock_quantity__gt=0,
+            stock_quantity__lte=F('low_stock_threshold'),
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
     
     # Product details
     weight = models.DecimalField(
@@ -253,6 +264,16 @@ class Product(models.Model):
         default=0
     )
     review_count = models.PositiveIntegerField(default=0)
+    # Sum of approved ratings, so average_rating can be adjusted incrementally
+    rating_sum = models.PositiveIntegerField(default=0)
+    # Number of approved reviews per star rating
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    # Number of wishlists containing the product (popularity)
+    wishlist_count = models.PositiveIntegerField(default=0)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -269,11 +290,37 @@ class Product(models.Model):
             models.Index(fields=['is_featured', 'is_active']),
             models.Index(fields=['is_bestseller', 'is_active']),
             models.Index(fields=['vendor', 'is_active']),
+            models.Index(fields=['low_stock', 'vendor']),
         ]
     
     def __str__(self):
         return self.name
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Values as loaded, so save hooks can tell what changed without a query
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # The reloaded values are what later saves must be compared with
+        refreshed = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and (fields is None or field.attname in fields or field.name in fields)
+        }
+        self._loaded_values = {
+            **(getattr(self, '_loaded_values', None) or {}),
+            **refreshed,
+        }
+    
+    @staticmethod
+    def sku_prefix(category_name):
+        return category_name[:3].upper() if category_name else 'PRO'
+    
     def save(self, *args, **kwargs):
         # Generate slug if empty
         if not self.slug:
@@ -294,20 +341,23 @@ class Product(models.Model):
                 except Product.DoesNotExist:
                     slug_exists = False
         
-        # Generate SKU if empty
-        if not self.sku:
-            # Generate a unique SKU
-            prefix = self.category.name[:3].upper() if self.category else 'PRO'
-            self.sku = f"{prefix}-{uuid.uuid4().hex[:8].upper()}"
-            
-            # Check if SKU already exists (extremely unlikely but possible)
-            while Product.objects.filter(sku=self.sku).exists():
-                self.sku = f"{prefix}-{uuid.uuid4().hex[:8].upper()}"
-        
         # Set published_at if product is being activated
         if self.is_active and not self.published_at:
             self.published_at = timezone.now()
         
+        # Generate SKU if empty
+        if not self.sku:
+            # IDs from the generator are unique, no existence check needed;
+            # should two processes ever share a node, retry with a new ID
+            prefix = self.sku_prefix(self.category.name if self.category else None)
+            self.sku = make_sku(prefix)
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                self.sku = make_sku(prefix)
+        
         super().save(*args, **kwargs)
     
     @property
@@ -346,6 +396,11 @@ class Product(models.Model):
             return f"{self.length} × {self.width} × {self.height} cm"
         return None
     
+    @property
+    def rating_distribution(self):
+        """Approved review count per star rating, 1 to 5"""
+        return {stars: getattr(self, f'rating_{stars}') for stars in range(1, 6)}
+    
     def get_weight_display(self):
         """Get formatted weight string"""
         if self.weight:
@@ -353,8 +408,14 @@ class Product(models.Model):
         return None
     
     def update_rating(self):
-        """Update average rating and review count"""
-        from django.db.models import Avg, Count
+        """
+        Recompute the rating aggregates from all approved reviews.
+
+        Review transitions keep these up to date incrementally (see
+        ``reviews.models.adjust_product_rating``); this full recount is only
+        needed to repair them.
+        """
+        from django.db.models import Avg, Count, Q, Sum
         from reviews.models import ProductReview
         
         reviews = ProductReview.objects.filter(
@@ -362,12 +423,23 @@ class Product(models.Model):
             status='approved'
         ).aggregate(
             average=Avg('rating'),
-            count=Count('id')
+            count=Count('id'),
+            total=Sum('rating'),
+            **{
+                f'rating_{stars}': Count('id', filter=Q(rating=stars))
+                for stars in range(1, 6)
+            }
         )
         
-        self.average_rating = reviews['average'] or 0
+        self.average_rating = round(reviews['average'] or 0, 2)
         self.review_count = reviews['count'] or 0
-        self.save(update_fields=['average_rating', 'review_count'])   
+        self.rating_sum = reviews['total'] or 0
+        for stars in range(1, 6):
+            setattr(self, f'rating_{stars}', reviews[f'rating_{stars}'])
+        self.save(update_fields=[
+            'average_rating', 'review_count', 'rating_sum',
+            'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5',
+        ])   
  
 class ProductImage(models.Model):
     product = models.ForeignKey(
@@ -395,6 +467,7 @@ class ProductImage(models.Model):
         help_text='Order in which images are displayed (lower number first)'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'product_images'
@@ -454,6 +527,15 @@ class ProductVariant(models.Model):
     )
     stock_quantity = models.PositiveIntegerField(default=0)
     low_stock_threshold = models.PositiveIntegerField(default=5)
+    # Stored copy of is_low_stock so low-stock variants can be found by index
+    low_stock = models.GeneratedField(
+        expression=Q(
+            stock_quantity__gt=0,
+            stock_quantity__lte=F('low_stock_threshold'),
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
     weight_adjustment = models.DecimalField(
         max_digits=8, 
         decimal_places=2, 
@@ -479,6 +561,9 @@ class ProductVariant(models.Model):
         unique_together = ['product', 'variant_type', 'variant_value']
         verbose_name = 'Product Variant'
         verbose_name_plural = 'Product Variants'
+        indexes = [
+            models.Index(fields=['low_stock']),
+        ]
     
     def __str__(self):
         return f"{self.product.name} - {self.variant_value}"
@@ -489,15 +574,16 @@ class ProductVariant(models.Model):
             base_sku = self.product.sku
             variant_code = self.variant_value[:3].upper().replace(' ', '')
             self.sku = f"{base_sku}-{variant_code}"
-            
-            # Ensure SKU uniqueness
-            counter = 1
-            original_sku = self.sku
-            
-            while ProductVariant.objects.filter(sku=self.sku).exclude(pk=self.pk).exists():
-                self.sku = f"{original_sku}-{counter}"
-                counter += 1
-        
+
+            # Try the readable SKU first; if another variant already has it
+            # fall back to a generated suffix instead of probing for a free one
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                self.sku = make_sku(self.sku)
+
         super().save(*args, **kwargs)
     
     @property
@@ -535,6 +621,7 @@ class ProductAttribute(models.Model):
         help_text='Show this attribute in filter options'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'product_attributes'
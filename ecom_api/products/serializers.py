@@ -1,10 +1,14 @@
+from django.core.files.storage import default_storage
+from django.db.models import OuterRef, Subquery
 from rest_framework import serializers
+
+from ecom_api.fieldsets import SparseFieldsetMixin
 from .models import Category , Product , ProductImage , ProductVariant , ProductAttribute
 
 
 
 
-class CategorySerializers(serializers.ModelSerializer):
+class CategorySerializers(SparseFieldsetMixin, serializers.ModelSerializer):
     children= serializers.SerializerMethodField()
     product_count=serializers.SerializerMethodField()
     parent_name=serializers.CharField(source='parent.name',read_only=True)
@@ -34,11 +38,19 @@ class CategorySerializers(serializers.ModelSerializer):
         ]
     def get_children(self, obj):
         """Get active child categories"""
-        children = obj.get_active_children()
-        return CategorySerializers(children, many=True).data
+        tree = self.context.get('category_tree')
+        if tree is None:
+            children = obj.get_active_children()
+            return CategorySerializers(children, many=True).data
+        children = tree.active_children(obj.id)
+        # Same context, so nested categories keep the tree and the fieldset
+        return CategorySerializers(children, many=True, context=self.context).data
 
     def get_product_count(self, obj):
-        return obj.get_products_count()
+        tree = self.context.get('category_tree')
+        if tree is None:
+            return obj.get_products_count()
+        return tree.product_count(obj.id)
 
     def validate_parent(self, value):
         """Prevent circular parent relationships"""
@@ -46,8 +58,183 @@ class CategorySerializers(serializers.ModelSerializer):
         if value and getattr(self, 'instance', None) and value.parent and value.parent.id == self.instance.id:
             raise serializers.ValidationError("Can not set a child category as parent.")
         return value
-            
-            
-         
-        
-        
+
+
+def main_image_subquery():
+    """Storage name of a product's primary (or first) image, for annotate()"""
+    return Subquery(
+        ProductImage.objects.filter(product=OuterRef('pk'))
+        .order_by('-is_primary', 'display_order', 'id')
+        .values('image')[:1]
+    )
+
+
+class ProductListSerializer(serializers.ModelSerializer):
+    """
+    Product card for listing pages.
+
+    Expects a queryset with ``select_related('category')`` and annotated
+    with ``main_image_path=main_image_subquery()``, so a page of products is
+    serialized from a single query.
+    """
+    category_name = serializers.CharField(
+        source='category.name', read_only=True, default=None
+    )
+    main_image = serializers.SerializerMethodField()
+    discount_percentage = serializers.FloatField(read_only=True)
+    is_in_stock = serializers.BooleanField(read_only=True)
+
+    #: Columns the serializer reads, for ``only()``
+    only_fields = [
+        'id',
+        'name',
+        'slug',
+        'sku',
+        'short_description',
+        'price',
+        'compare_at_price',
+        'category',
+        'category__name',
+        'average_rating',
+        'review_count',
+        'track_inventory',
+        'stock_quantity',
+        'is_featured',
+        'is_new',
+        'created_at',
+    ]
+
+    class Meta:
+        model = Product
+        fields = [
+            'id',
+            'name',
+            'slug',
+            'sku',
+            'short_description',
+            'price',
+            'compare_at_price',
+            'discount_percentage',
+            'category',
+            'category_name',
+            'main_image',
+            'average_rating',
+            'review_count',
+            'is_in_stock',
+            'is_featured',
+            'is_new',
+            'created_at',
+        ]
+
+    def get_main_image(self, obj):
+        path = getattr(obj, 'main_image_path', None)
+        if not path:
+            return None
+        return default_storage.url(path)
+
+
+
+class ProductImageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductImage
+        fields = ['id', 'image', 'alt_text', 'caption', 'is_primary', 'display_order']
+
+
+class ProductVariantSerializer(serializers.ModelSerializer):
+    final_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    is_in_stock = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = ProductVariant
+        fields = [
+            'id',
+            'variant_type',
+            'variant_value',
+            'sku',
+            'price_adjustment',
+            'final_price',
+            'stock_quantity',
+            'is_in_stock',
+            'image',
+            'display_order',
+        ]
+
+
+class ProductAttributeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductAttribute
+        fields = [
+            'id', 'attribute_name', 'attribute_value', 'is_filterable', 'display_order'
+        ]
+
+
+class ProductDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Full product page. Expects ``select_related('category', 'vendor')`` and
+    prefetched ``images``, ``variants`` and ``attributes`` for the fields in
+    ``context['fields']``.
+    """
+    category = serializers.SerializerMethodField()
+    vendor = serializers.SerializerMethodField()
+    images = ProductImageSerializer(many=True, read_only=True)
+    variants = ProductVariantSerializer(many=True, read_only=True)
+    attributes = ProductAttributeSerializer(many=True, read_only=True)
+    discount_percentage = serializers.FloatField(read_only=True)
+    is_in_stock = serializers.BooleanField(read_only=True)
+    is_low_stock = serializers.BooleanField(read_only=True)
+    rating_distribution = serializers.DictField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = [
+            'id',
+            'name',
+            'slug',
+            'sku',
+            'short_description',
+            'description',
+            'category',
+            'vendor',
+            'price',
+            'compare_at_price',
+            'discount_percentage',
+            'stock_quantity',
+            'is_in_stock',
+            'is_low_stock',
+            'allow_backorder',
+            'weight',
+            'length',
+            'width',
+            'height',
+            'is_featured',
+            'is_bestseller',
+            'is_new',
+            'is_digital',
+            'average_rating',
+            'review_count',
+            'rating_distribution',
+            'meta_title',
+            'meta_description',
+            'meta_keywords',
+            'images',
+            'variants',
+            'attributes',
+            'published_at',
+            'updated_at',
+        ]
+
+    def get_category(self, obj):
+        if obj.category is None:
+            return None
+        return {
+            'id': obj.category.id,
+            'name': obj.category.name,
+            'slug': obj.category.slug,
+        }
+
+    def get_vendor(self, obj):
+        if obj.vendor is None:
+            return None
+        return {'name': obj.vendor.name, 'slug': obj.vendor.slug}
@@ -0,0 +1,57 @@
+"""
+Bump the catalog version when the category tree or its product counts change,
+and a product's ``updated_at`` when one of its children is deleted.
+"""
+from django.db.models import QuerySet
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Category, Product, ProductAttribute, ProductImage, ProductVariant
+from .utils import bump_catalog_version
+
+#: Product fields that decide which category counts a product is in
+COUNTED_FIELDS = ('category_id', 'is_active')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(pre_save, sender=Product)
+def check_product_counts(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    instance._counts_changed = instance._state.adding or any(
+        name not in loaded or loaded[name] != getattr(instance, name)
+        for name in COUNTED_FIELDS
+    )
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    if getattr(instance, '_counts_changed', True):
+        bump_catalog_version()
+    instance._loaded_values = {
+        **(getattr(instance, '_loaded_values', None) or {}),
+        **{name: getattr(instance, name) for name in COUNTED_FIELDS},
+    }
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_delete, sender=ProductAttribute)
+def product_child_deleted(sender, instance, origin=None, **kwargs):
+    # A deleted child leaves no timestamp behind; moving the product's keeps
+    # the detail page's Last-Modified honest (see utils.product_validators)
+    if isinstance(origin, Product) or (
+        isinstance(origin, QuerySet) and origin.model is Product
+    ):
+        return
+    Product.objects.filter(pk=instance.product_id).update(updated_at=Now())
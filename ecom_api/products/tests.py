@@ -1,3 +1,547 @@
-from django.test import TestCase
+import io
+import json
+import uuid
+import warnings
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock, skipIf
 
-# Create your tests here.
+from celery.signals import task_prerun
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from benchmarks.seed import seed_all
+from ecom_api import ids, renderers, routers
+from ecom_api.middleware import REPLICA_PIN_COOKIE, ReplicaPinningMiddleware
+from ecom_api.query_budget import QueryBudgetMixin
+from accounts.models import User
+from vendors.models import Vendor
+from .models import Category, Product, ProductAttribute, ProductImage, ProductVariant
+from .serializers import CategorySerializers
+from .urls import query_budgets, urlpatterns
+from .utils import CategoryTree, assign_skus
+
+
+@mock.patch("ecom_api.routers.get_replica_aliases", return_value=["replica_0"])
+class CatalogReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.CatalogReplicaRouter()
+        routers.reset_pinning()
+        self.addCleanup(routers.reset_pinning)
+
+    def test_catalog_reads_go_to_replica(self, _):
+        self.assertEqual(self.router.db_for_read(Category), "replica_0")
+        self.assertEqual(self.router.db_for_read(Product), "replica_0")
+
+    def test_other_apps_read_from_primary(self, _):
+        self.assertEqual(self.router.db_for_read(User), "default")
+
+    def test_writes_go_to_primary(self, _):
+        self.assertEqual(self.router.db_for_write(Category), "default")
+
+    def test_reads_after_write_stick_to_primary(self, _):
+        self.router.db_for_write(User)
+        self.assertEqual(self.router.db_for_read(Category), "default")
+
+    def test_pinned_context_reads_from_primary(self, _):
+        with routers.use_primary():
+            self.assertEqual(self.router.db_for_read(Category), "default")
+        self.assertEqual(self.router.db_for_read(Category), "replica_0")
+
+    def test_no_replicas_configured(self, get_replica_aliases):
+        get_replica_aliases.return_value = []
+        self.assertEqual(self.router.db_for_read(Category), "default")
+
+    def test_migrations_only_run_on_primary(self, _):
+        self.assertTrue(self.router.allow_migrate("default", "products"))
+        self.assertFalse(self.router.allow_migrate("replica_0", "products"))
+
+
+class ReplicaDatabaseTests(TestCase):
+    """
+    Routing against a second SQLite database standing in for a replica.
+
+    Only the category table exists on the replica and it stays empty, so a
+    read that returns the categories created here ran on the primary.
+    """
+    # replica_0 is added once the alias exists; the test runner would try
+    # to create it as a test database otherwise
+    databases = {'default'}
+
+    @classmethod
+    def setUpClass(cls):
+        replica = connections.configure_settings({
+            **settings.DATABASES,
+            'replica_0': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+        })['replica_0']
+        connections.settings['replica_0'] = replica
+        cls.database_settings = override_settings(
+            DATABASES={**settings.DATABASES, 'replica_0': replica},
+            REPLICA_DATABASES=['replica_0'],
+        )
+        with warnings.catch_warnings():
+            # Overriding DATABASES warns; the alias was added to connections above
+            warnings.simplefilter('ignore')
+            cls.database_settings.enable()
+        with connections['replica_0'].schema_editor() as editor:
+            editor.create_model(Category)
+        cls.databases = {'default', 'replica_0'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica_0'].close()
+        del connections['replica_0']
+        del connections.settings['replica_0']
+        cls.database_settings.disable()
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name='Shoes')
+
+    def setUp(self):
+        cache.clear()
+        routers.reset_pinning()
+        self.addCleanup(routers.reset_pinning)
+
+    def test_catalog_reads_run_on_the_replica(self):
+        with CaptureQueriesContext(connections['replica_0']) as replica:
+            with CaptureQueriesContext(connections['default']) as primary:
+                self.assertEqual(list(Category.objects.all()), [])
+                self.assertFalse(User.objects.exists())
+        self.assertEqual(len(replica), 1)
+        self.assertEqual(len(primary), 1)
+        self.assertIn(Category._meta.db_table, replica[0]['sql'])
+
+    def test_reads_after_a_write_run_on_the_primary(self):
+        Category.objects.create(name='Hats')
+        self.assertEqual(Category.objects.count(), 2)
+
+    def test_use_primary(self):
+        with routers.use_primary():
+            self.assertEqual(Category.objects.count(), 1)
+        self.assertEqual(Category.objects.count(), 0)
+
+    def test_write_sets_the_pin_cookie(self):
+        def write(request):
+            Category.objects.create(name='Hats')
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        response = ReplicaPinningMiddleware(write)(request)
+        cookie = response.cookies[REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_PIN_SECONDS)
+        self.assertTrue(cookie['httponly'])
+        # The pinning ends with the request
+        self.assertFalse(routers.has_written())
+
+        response = ReplicaPinningMiddleware(lambda request: HttpResponse())(request)
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_reads_from_the_primary(self):
+        url = reverse('category_list')
+        params = {'fields': 'id,name'}
+        self.assertEqual(self.client.get(url, params).data['count'], 0)
+        self.client.cookies[REPLICA_PIN_COOKIE] = '1'
+        self.assertEqual(self.client.get(url, params).data['count'], 1)
+
+    def test_celery_tasks_start_unpinned(self):
+        routers.CatalogReplicaRouter().db_for_write(Category)
+        self.assertEqual(Category.objects.count(), 1)
+        task_prerun.send(sender=None, task_id='task', task=None)
+        self.assertFalse(routers.has_written())
+        self.assertEqual(Category.objects.count(), 0)
+
+
+class ProductEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({'categories': 60, 'products': 300, 'users': 0})
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_category_list(self):
+        response = self.assertWithinQueryBudget(
+            'category_list', self.client.get, reverse('category_list')
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_category_list_filtered_by_parent(self):
+        response = self.assertWithinQueryBudget(
+            'category_list', self.client.get, reverse('category_list'), {'parent': 'null'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_category_tree(self):
+        response = self.assertWithinQueryBudget(
+            'category_tree', self.client.get, reverse('category_tree')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data)
+
+    def test_sparse_category_list_skips_the_tree(self):
+        with self.assertNumQueries(2):
+            # count + page
+            response = self.client.get(
+                reverse('category_list'), {'fields': 'id,name,slug'}
+            )
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'slug'})
+
+        with self.assertNumQueries(3):
+            # count + page + categories, without the product count aggregate
+            response = self.client.get(
+                reverse('category_list'), {'fields': 'id,name', 'expand': 'children'}
+            )
+        category = response.data['results'][0]
+        self.assertEqual(set(category), {'id', 'name', 'children'})
+        for child in category['children']:
+            self.assertEqual(set(child), {'id', 'name', 'children'})
+
+    def test_sparse_category_tree(self):
+        full = self.client.get(reverse('category_tree')).data
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('category_tree'), {'fields': 'id,slug'})
+        self.assertEqual(set(response.data[0]), {'id', 'slug', 'children'})
+        self.assertEqual(
+            [node['slug'] for node in response.data], [node['slug'] for node in full]
+        )
+        with self.assertNumQueries(0):
+            self.client.get(reverse('category_tree'), {'fields': 'slug,id,bogus'})
+
+    def test_tree_matches_nested_serializer(self):
+        tree = CategoryTree.build()
+        expected = CategorySerializers(
+            tree.roots(), many=True, context={'category_tree': tree}
+        ).data
+        response = self.client.get(reverse('category_tree'))
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def test_depth_and_root_need_no_queries(self):
+        self.client.get(reverse('category_tree'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('category_tree'), {'depth': 2})
+        self.assertTrue(response.data)
+        for node in response.data:
+            for child in node['children']:
+                self.assertEqual(child['children'], [])
+
+        child = Category.objects.filter(parent__parent__isnull=True).exclude(
+            parent=None
+        ).first()
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('category_tree'), {'root': child.slug, 'depth': 1}
+            )
+        self.assertEqual([node['slug'] for node in response.data], [child.slug])
+        self.assertEqual(response.data[0]['children'], [])
+
+        response = self.client.get(reverse('category_tree'), {'root': child.slug})
+        self.assertEqual(
+            [node['slug'] for node in response.data[0]['children']],
+            [c.slug for c in child.get_active_children()],
+        )
+
+    def test_invalid_tree_parameters(self):
+        response = self.client.get(reverse('category_tree'), {'root': 'nope'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('category_tree'), {'depth': '0'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 'invalid_depth')
+
+    def test_unchanged_tree_is_not_modified(self):
+        etag = self.client.get(reverse('category_tree'))['ETag']
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(
+                reverse('category_tree'), headers={'if-none-match': etag}
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(len(captured), 0)
+
+        response = self.client.get(
+            reverse('category_list'), headers={'if-none-match': etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_category_writes_change_the_etag(self):
+        etag = self.client.get(reverse('category_tree'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Brand New Category')
+        response = self.assertWithinQueryBudget(
+            'category_tree',
+            self.client.get,
+            reverse('category_tree'),
+            headers={'if-none-match': etag},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Brand New Category', [c['name'] for c in response.data])
+
+    def test_moving_a_product_changes_the_etag(self):
+        etag = self.client.get(reverse('category_tree'))['ETag']
+        product = Product.objects.order_by('id').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = 'Renamed'
+            product.save()
+        self.assertEqual(self.client.get(reverse('category_tree'))['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.is_active = not product.is_active
+            product.save()
+        self.assertNotEqual(self.client.get(reverse('category_tree'))['ETag'], etag)
+
+
+class ProductDetailTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all(
+            {'categories': 2, 'products': 2, 'variants': 3, 'images': 2, 'users': 0}
+        )
+        cls.product = Product.objects.order_by('id').first()
+        ProductAttribute.objects.bulk_create([
+            ProductAttribute(
+                product=cls.product, attribute_name=name, attribute_value='x'
+            )
+            for name in ('Colour', 'Fabric', 'Fit')
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('product-detail', kwargs={'slug': self.product.slug})
+
+    def get(self, **headers):
+        return self.assertWithinQueryBudget(
+            'product-detail', self.client.get, self.url, headers=headers
+        )
+
+    def test_detail_loads_children_in_fixed_queries(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual(len(data['images']), 2)
+        self.assertEqual(len(data['variants']), 3)
+        self.assertEqual(len(data['attributes']), 3)
+        self.assertEqual(data['category']['id'], self.product.category_id)
+        self.assertEqual(self.product.get_absolute_url, self.url)
+        self.assertTrue(response['ETag'])
+
+    def test_sparse_detail_skips_unrequested_children(self):
+        with self.assertNumQueries(3):
+            # validators + product + images
+            response = self.client.get(
+                self.url, {'fields': 'id,name', 'expand': 'images'}
+            )
+        data = response.data['data']
+        self.assertEqual(set(data), {'id', 'name', 'images'})
+        self.assertEqual(len(data['images']), 2)
+
+    def test_unknown_product(self):
+        response = self.client.get(reverse('product-detail', kwargs={'slug': 'nope'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.get()
+        with CaptureQueriesContext(connection) as captured:
+            cached = self.get(if_none_match=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(len(captured), 1)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+        cached = self.get(if_modified_since=response['Last-Modified'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_child_changes_change_the_etag(self):
+        etag = self.get()['ETag']
+        ProductAttribute.objects.filter(product=self.product).first().delete()
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+        etag = self.get()['ETag']
+        variant = self.product.variants.first()
+        variant.variant_value = 'Changed'
+        variant.save()
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_deleting_a_child_moves_last_modified(self):
+        past = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for model in (ProductImage, ProductVariant, ProductAttribute):
+            model.objects.filter(product=self.product).update(updated_at=past)
+        Product.objects.filter(pk=self.product.pk).update(updated_at=past)
+        Category.objects.filter(pk=self.product.category_id).update(updated_at=past)
+        Vendor.objects.filter(pk=self.product.vendor_id).update(updated_at=past)
+        last_modified = self.get()['Last-Modified']
+
+        self.product.images.first().delete()
+        response = self.get(if_modified_since=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    data = {
+        "price": Decimal("19.90"),
+        "created_at": datetime(2025, 3, 1, 12, 30, 5, 120000, tzinfo=timezone.utc),
+        "token": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "counts": {1: 2, 3: 4},
+        "name": "Caf\u00e9 \u2028 \u2029",
+        "label": gettext_lazy("Products"),
+        "children": [{"id": 1, "children": []}, None, True, 1.5],
+    }
+
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(self.data),
+            JSONRenderer().render(self.data),
+        )
+
+    def test_floats(self):
+        data = {"values": [0.1, 1.5, 1e16, 1e-7, -2.5e-8]}
+        rendered = renderers.ORJSONRenderer().render(data)
+        # Same numbers, shorter exponents than the json module writes
+        self.assertEqual(json.loads(rendered), data)
+        self.assertEqual(rendered, b'{"values":[0.1,1.5,1e16,1e-7,-2.5e-8]}')
+
+    def test_non_finite_floats_render_as_null(self):
+        data = {"nan": float("nan"), "inf": float("inf")}
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(data), b'{"nan":null,"inf":null}'
+        )
+
+    def test_unsupported_data_falls_back_to_json_renderer(self):
+        data = {"big": 2**70, "small": -(2**64)}
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indent_falls_back_to_json_renderer(self):
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(
+                self.data, "application/json; indent=2"
+            ),
+            JSONRenderer().render(self.data, "application/json; indent=2"),
+        )
+
+    def test_parser(self):
+        body = '{"name": "Caf\u00e9", "items": [1, 2.5, null]}'.encode()
+        parser = renderers.ORJSONParser()
+        self.assertEqual(
+            parser.parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body))
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b"{broken"))
+
+
+class IdGeneratorTests(SimpleTestCase):
+    def test_ids_are_unique_and_increasing(self):
+        generator = ids.IdGenerator(node=3)
+        numbers = generator.next_ints(10000) + [generator.next_int()]
+        self.assertEqual(numbers, sorted(set(numbers)))
+        self.assertTrue(all(number >> 12 & ids.MAX_NODE == 3 for number in numbers))
+
+    def test_nodes_do_not_collide(self):
+        first = ids.IdGenerator(node=1).next_ints(100)
+        second = ids.IdGenerator(node=2).next_ints(100)
+        self.assertFalse(set(first) & set(second))
+
+    def test_base36(self):
+        self.assertEqual(ids.to_base36(0), "0")
+        self.assertEqual(ids.to_base36(36 * 36 - 1), "ZZ")
+        self.assertRegex(ids.make_order_number(), r"^ORD-[0-9A-Z]{1,13}$")
+
+
+class SkuGenerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Shoes")
+
+    def test_product_sku_needs_no_lookup(self):
+        ids.get_generator()
+        product = Product(name="Runner", category=self.category, price=10)
+        with self.assertNumQueries(4):
+            # slug check + insert, in a savepoint for the collision fallback
+            product.save()
+        self.assertTrue(product.sku.startswith("SHO-"))
+
+    def test_product_sku_falls_back_on_collision(self):
+        taken = Product.objects.create(name="Runner", category=self.category, price=10)
+        product = Product(name="Runner", category=self.category, price=10)
+        with mock.patch(
+            "products.models.make_sku", side_effect=[taken.sku, "SHO-NEW"]
+        ):
+            product.save()
+        self.assertEqual(product.sku, "SHO-NEW")
+
+    def test_variant_sku_falls_back_on_collision(self):
+        product = Product.objects.create(name="Runner", sku="RUN", price=10)
+        first = ProductVariant.objects.create(
+            product=product, variant_type="size", variant_value="Large"
+        )
+        second = ProductVariant.objects.create(
+            product=product, variant_type="color", variant_value="Larch"
+        )
+        self.assertEqual(first.sku, "RUN-LAR")
+        self.assertRegex(second.sku, r"^RUN-LAR-[0-9A-Z]+$")
+
+    def test_assign_skus_for_bulk_create(self):
+        products = assign_skus(
+            [
+                Product(
+                    name=f"Bulk {index}",
+                    slug=f"bulk-{index}",
+                    price=1,
+                    category=self.category,
+                )
+                for index in range(3)
+            ]
+            + [Product(name="Own", slug="own", sku="OWN-1", price=1)]
+        )
+        Product.objects.bulk_create(products)
+        skus = [product.sku for product in products]
+        self.assertEqual(len(set(skus)), 4)
+        self.assertTrue(all(sku.startswith("SHO-") for sku in skus[:3]))
+        self.assertEqual(skus[3], "OWN-1")
+
+    def test_assign_skus_reads_variant_products_once(self):
+        products = [
+            Product.objects.create(name=f"Shirt {index}", sku=f"SH{index}", price=1)
+            for index in range(2)
+        ]
+        variants = [
+            ProductVariant(
+                product_id=products[index % 2].pk,
+                variant_type="size",
+                variant_value=str(index),
+            )
+            for index in range(6)
+        ] + [ProductVariant(product=products[0], variant_type="size", variant_value="L")]
+        with self.assertNumQueries(1):
+            assign_skus(variants)
+        self.assertEqual(
+            [variant.sku.split("-")[0] for variant in variants],
+            ["SH0", "SH1"] * 3 + ["SH0"],
+        )
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CategoryViewSet
+from .views import CategoryViewSet, product_detail
 
 category_list = CategoryViewSet.as_view({'get': 'list'})
 category_tree = CategoryViewSet.as_view({'get': 'tree'})
@@ -7,4 +7,12 @@ category_tree = CategoryViewSet.as_view({'get': 'tree'})
 urlpatterns = [
     path('category/', category_list, name='category_list'),
     path('category/tree/', category_tree, name='category_tree'),
+    path('products/<slug:slug>/', product_detail, name='product-detail'),
 ]
+
+# Maximum SQL queries per request, enforced by products/tests.py
+query_budgets = {
+    'category_list': 4,
+    'category_tree': 2,
+    'product-detail': 5,
+}
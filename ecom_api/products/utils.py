@@ -0,0 +1,235 @@
+import hashlib
+import time
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+
+from django.db.models import (
+    Count,
+    DateTimeField,
+    IntegerField,
+    Max,
+    OuterRef,
+    Subquery,
+)
+
+from ecom_api.ids import next_ids
+from .models import Category, Product, ProductAttribute, ProductImage, ProductVariant
+
+
+CATALOG_VERSION_KEY = 'catalog:version'
+# The version also expires, so product counts changed by bulk writes (which
+# do not bump it) reach clients within the same hour as before
+CATALOG_VERSION_TIMEOUT = 3600
+
+
+def catalog_version():
+    """
+    Version stamp of the category tree, used as its ETag and cache key.
+
+    Starts from the current time in milliseconds, so a version that expired
+    or was evicted never comes back with a number clients already hold.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(
+            CATALOG_VERSION_KEY, time.time_ns() // 1_000_000, CATALOG_VERSION_TIMEOUT
+        )
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Give the category tree a new version once the transaction commits."""
+
+    def bump():
+        try:
+            cache.incr(CATALOG_VERSION_KEY)
+        except ValueError:
+            # Not set: the next read starts a fresh version
+            pass
+
+    transaction.on_commit(bump)
+
+
+class CategoryTree:
+    """
+    In-memory index of the whole category hierarchy.
+
+    Built from one query for the categories and, optionally, one aggregate
+    query for product counts, so serializing any number of nested
+    categories costs no further queries.
+    """
+
+    def __init__(self, categories, product_counts=None):
+        self.categories = {category.id: category for category in categories}
+        self.children = {}
+        self.direct_counts = product_counts or {}
+        self._subtree_counts = {}
+
+        parent_field = Category._meta.get_field('parent')
+        for category in self.categories.values():
+            parent = self.categories.get(category.parent_id)
+            # Attach the parent so parent_name never triggers a lookup
+            parent_field.set_cached_value(category, parent)
+            self.children.setdefault(category.parent_id, []).append(category)
+
+    @classmethod
+    def build(cls, with_product_counts=True):
+        categories = list(Category.objects.all())
+        product_counts = None
+        if with_product_counts:
+            product_counts = dict(
+                Product.objects.filter(is_active=True, category__isnull=False)
+                .values_list('category')
+                .annotate(count=Count('id'))
+                .order_by()
+            )
+        return cls(categories, product_counts)
+
+    def roots(self):
+        """Active root categories in display order"""
+        return [c for c in self.children.get(None, []) if c.is_active]
+
+    def active_children(self, category_id):
+        """Active direct children in display order"""
+        return [c for c in self.children.get(category_id, []) if c.is_active]
+
+    def walk(self, category_id=None):
+        """Active categories below ``category_id`` (or the roots), parents first"""
+        for category in self.active_children(category_id):
+            yield category
+            yield from self.walk(category.id)
+
+    def product_count(self, category_id):
+        """Active products in this category and all of its descendants"""
+        if category_id not in self._subtree_counts:
+            total = self.direct_counts.get(category_id, 0)
+            for child in self.children.get(category_id, []):
+                total += self.product_count(child.id)
+            self._subtree_counts[category_id] = total
+        return self._subtree_counts[category_id]
+
+
+def nest_category_tree(rows, root=None, depth=None):
+    """
+    Nested category tree from flat ``(id, parent_id, slug, node)`` rows in
+    ``CategoryTree.walk`` order, where every ``node`` has a ``children`` key.
+    The nodes are modified in place, so pass rows fresh from the cache.
+
+    ``root`` is the slug of the category to start from instead of the roots
+    and ``depth`` the number of levels to keep; nodes on the last level get
+    an empty ``children`` list. Returns an empty list if ``root`` is not in
+    the rows.
+    """
+    levels = {}
+    nodes = {}
+    top = []
+    for pk, parent_id, slug, node in rows:
+        if parent_id in levels:
+            level = levels[parent_id] + 1
+        elif (slug == root) if root is not None else (parent_id is None):
+            level = 1
+        else:
+            continue
+        if depth is not None and level > depth:
+            continue
+        node['children'] = []
+        if level == 1:
+            top.append(node)
+        else:
+            nodes[parent_id]['children'].append(node)
+        levels[pk] = level
+        nodes[pk] = node
+    return top
+
+
+def assign_skus(objects):
+    """
+    Fill in the SKU of unsaved products or variants that have none.
+
+    ``bulk_create`` skips ``save()``, so call this first. IDs come from the
+    generator in one block; category names for the product prefixes and the
+    SKUs of variant products that are not loaded yet are read with one query
+    each.
+    """
+    missing = [obj for obj in objects if not obj.sku]
+    if not missing:
+        return objects
+    category_ids = {
+        obj.category_id for obj in missing if isinstance(obj, Product) and obj.category_id
+    }
+    names = dict(
+        Category.objects.filter(id__in=category_ids).values_list('id', 'name')
+    ) if category_ids else {}
+
+    product_field = ProductVariant._meta.get_field('product')
+    product_ids = {
+        obj.product_id for obj in missing
+        if isinstance(obj, ProductVariant) and not product_field.is_cached(obj)
+    }
+    product_skus = dict(
+        Product.objects.filter(id__in=product_ids).values_list('id', 'sku')
+    ) if product_ids else {}
+
+    for obj, unique_id in zip(missing, next_ids(len(missing))):
+        if isinstance(obj, ProductVariant):
+            if product_field.is_cached(obj):
+                base_sku = obj.product.sku
+            else:
+                base_sku = product_skus[obj.product_id]
+            obj.sku = f"{base_sku}-{unique_id}"
+        else:
+            obj.sku = f"{Product.sku_prefix(names.get(obj.category_id))}-{unique_id}"
+    return objects
+
+
+def _child_aggregate(model, aggregate, output_field):
+    return Subquery(
+        model.objects.filter(product=OuterRef('pk'))
+        .order_by()
+        .values('product')
+        .annotate(value=aggregate)
+        .values('value'),
+        output_field=output_field,
+    )
+
+
+def product_validators(queryset, **lookup):
+    """
+    ``(pk, etag, last_modified)`` of the product matching ``lookup``, or None.
+
+    One query reads the ``updated_at`` of the product, its category and
+    vendor, and the latest ``updated_at`` and row count of its images,
+    variants and attributes. Anything shown on the detail page changes one
+    of them, so the values make a strong validator without loading or
+    serializing the product. Deleting a child also moves the product's
+    ``updated_at`` (see ``signals``), so the latest timestamp is a sound
+    Last-Modified as well.
+    """
+    children = {}
+    for name, model in (
+        ('images', ProductImage),
+        ('variants', ProductVariant),
+        ('attributes', ProductAttribute),
+    ):
+        children[f'{name}_updated_at'] = _child_aggregate(
+            model, Max('updated_at'), DateTimeField()
+        )
+        children[f'{name}_count'] = _child_aggregate(
+            model, Count('id'), IntegerField()
+        )
+    row = (
+        queryset.filter(**lookup)
+        .annotate(**children)
+        .values_list(
+            'pk', 'updated_at', 'category__updated_at', 'vendor__updated_at', *children
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    etag = hashlib.md5(repr(row).encode()).hexdigest()
+    timestamps = [value for value in row[1:] if isinstance(value, datetime)]
+    return row[0], etag, max(timestamps)
@@ -1,9 +1,19 @@
+from django.db.models import Prefetch
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import status, filters, viewsets
 from rest_framework.permissions import AllowAny
-from .models import Category
-from .serializers import CategorySerializers
-from rest_framework.decorators import action
+from ecom_api.fieldsets import requested_fields, wants_field
+from .models import Category, Product, ProductVariant
+from .serializers import CategorySerializers, ProductDetailSerializer
+from .utils import (
+    CategoryTree,
+    catalog_version,
+    nest_category_tree,
+    product_validators,
+)
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django.core.cache import cache
 
@@ -23,18 +33,181 @@ class CategoryViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(parent__isnull=True)
             else:
                 queryset = queryset.filter(parent__slug=parent)
-        return queryset.select_related('parent')
+        if wants_field(requested_fields(self.request), 'parent_name'):
+            queryset = queryset.select_related('parent')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'GET':
+            fields = requested_fields(self.request)
+            context['fields'] = fields
+            # Children and product counts come from one in-memory tree
+            # instead of two queries per serialized category; it is only
+            # built, and only counts products, when those fields are wanted
+            if wants_field(fields, 'children') or wants_field(fields, 'product_count'):
+                context['category_tree'] = CategoryTree.build(
+                    with_product_counts=wants_field(fields, 'product_count')
+                )
+        return context
     
+    def catalog_etag(self):
+        # The version read also serves as the cache key of the tree
+        self.version = catalog_version()
+        return quote_etag(f'categories-{self.version}')
+
+    def not_modified(self, request, etag):
+        """304 response if the client's If-None-Match matches ``etag``"""
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag = self.catalog_etag()
+        response = self.not_modified(request, etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+            response['ETag'] = etag
+        return response
+
     @action(detail=False, methods=['get'])
     def tree(self,request):
-        """Get complete category tree for navigation"""
-        cache_key='category_tree'
-        category_tree=cache.get(cache_key)
-        if not category_tree:
-            # Get root categories (no parent)
-            root_category=self.queryset.filter(parent__isnull=True)
-            serializer=CategorySerializers(root_category, many=True)
-            category_tree=serializer.data
-            cache.set(cache_key, category_tree,timeout=3600) # Cache for 1 hour
-        return Response(category_tree)
-    
\ No newline at end of file
+        """
+        Get complete category tree for navigation
+
+        The tree is cached per catalog version, which is also its ETag, so
+        a client that already has the current tree gets an empty 304 after
+        a single cache read. ``?fields=`` trims every node; ``children`` is
+        always included.
+
+        ``?root=<slug>`` returns only the subtree under that category and
+        ``?depth=`` only that many levels. The cache holds the tree as flat
+        rows and every variant is nested from them, so they need no queries
+        of their own.
+        """
+        depth = request.query_params.get('depth')
+        if depth is not None:
+            depth = int(depth) if depth.isdigit() else 0
+            if depth < 1:
+                return Response(
+                    {
+                        'success': False,
+                        'message': 'depth must be a positive integer',
+                        'code': 'invalid_depth',
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        etag = self.catalog_etag()
+        not_modified = self.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        fields = requested_fields(request)
+        cache_key=f'category_tree_rows:{self.version}'
+        if fields is not None:
+            # Only known names, so arbitrary query strings cannot add cache keys
+            fields = (fields & set(CategorySerializers.Meta.fields)) | {'children'}
+            cache_key += ':' + ','.join(sorted(fields))
+        rows=cache.get(cache_key)
+        if rows is None:
+            rows = self.tree_rows(fields)
+            cache.set(cache_key, rows,timeout=3600) # Cache for 1 hour
+
+        root = request.query_params.get('root')
+        category_tree = nest_category_tree(rows, root=root, depth=depth)
+        if root is not None and not category_tree:
+            return Response(
+                {'success': False, 'message': 'Category not found', 'code': 'not_found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        response = Response(category_tree)
+        response['ETag'] = etag
+        return response
+
+    def tree_rows(self, fields):
+        """``(id, parent_id, slug, node)`` of every category in the tree"""
+        tree = CategoryTree.build(
+            with_product_counts=wants_field(fields, 'product_count')
+        )
+        categories = list(tree.walk())
+        names = [
+            name for name in CategorySerializers.Meta.fields if wants_field(fields, name)
+        ]
+        # Serialize each node on its own; children are filled in when nesting
+        nodes = CategorySerializers(
+            categories,
+            many=True,
+            context={'category_tree': tree, 'fields': set(names) - {'children'}},
+        ).data
+        return [
+            (
+                category.id,
+                category.parent_id,
+                category.slug,
+                # Keep the keys and key order of the nested serializer output
+                {
+                    name: node.get(name)
+                    for name in names
+                    if name in node or name == 'children'
+                },
+            )
+            for category, node in zip(categories, nodes)
+        ]
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def product_detail(request, slug):
+    """
+    A product with its category, vendor, images, variants and attributes.
+    GET /api/products/<slug>/
+
+    A validator query runs first; when the client's If-None-Match or
+    If-Modified-Since still matches, the response is a 304 and nothing is
+    loaded or serialized. Otherwise the product is loaded in four more
+    queries however many children it has; with ``?fields=`` the images,
+    variants and attributes that are not requested are not fetched.
+    """
+    products = Product.objects.filter(is_active=True, status='approved')
+    validators = product_validators(products, slug=slug)
+    if validators is None:
+        return Response(
+            {'success': False, 'message': 'Product not found', 'code': 'not_found'},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    pk, etag, last_modified = validators
+    etag = quote_etag(etag)
+    timestamp = int(last_modified.timestamp())
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if not_modified is None:
+        fields = requested_fields(request)
+        related = [name for name in ('category', 'vendor') if wants_field(fields, name)]
+        prefetches = [
+            lookup
+            for lookup in (
+                'images',
+                Prefetch(
+                    'variants', queryset=ProductVariant.objects.filter(is_active=True)
+                ),
+                'attributes',
+            )
+            if wants_field(fields, getattr(lookup, 'prefetch_to', lookup))
+        ]
+        if related:
+            products = products.select_related(*related)
+        product = products.prefetch_related(*prefetches).get(pk=pk)
+        response = Response({
+            'success': True,
+            'message': 'Product retrieved successfully',
+            'data': ProductDetailSerializer(product, context={'fields': fields}).data,
+        })
+    else:
+        response = not_modified
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(timestamp)
+    response['Cache-Control'] = 'no-cache'
+    return response
+
@@ -1,3 +1,27 @@
 from django.contrib import admin
+from .models import ProductReview
 
-# Register your models here.
+
+@admin.register(ProductReview)
+class ProductReviewAdmin(admin.ModelAdmin):
+    list_display = ('product', 'user', 'rating', 'status', 'is_verified_purchase', 'created_at')
+    list_filter = ('status', 'rating', 'is_verified_purchase')
+    search_fields = ('product__name', 'user__email', 'title')
+    raw_id_fields = ('product', 'user')
+    # Moderate through the actions, which keep the product aggregates in step
+    readonly_fields = ('status', 'rating')
+    actions = ['approve_reviews', 'reject_reviews']
+
+    @admin.action(description='Approve selected reviews')
+    def approve_reviews(self, request, queryset):
+        for review in queryset:
+            review.approve()
+
+    @admin.action(description='Reject selected reviews')
+    def reject_reviews(self, request, queryset):
+        for review in queryset:
+            review.reject()
+
+    def delete_queryset(self, request, queryset):
+        for review in queryset:
+            review.delete()
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_rating_histogram'),
+        ('reviews', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewHelpfulVote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Review Helpful Vote',
+                'verbose_name_plural': 'Review Helpful Votes',
+                'db_table': 'review_helpful_votes',
+            },
+        ),
+        migrations.AddField(
+            model_name='productreview',
+            name='helpful_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', 'status', '-created_at', '-id'], name='product_rev_product_6e47f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', 'status', '-helpful_count', '-id'], name='product_rev_product_2cfac4_idx'),
+        ),
+        migrations.AddField(
+            model_name='reviewhelpfulvote',
+            name='review',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='helpful_votes', to='reviews.productreview'),
+        ),
+        migrations.AddField(
+            model_name='reviewhelpfulvote',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_helpful_votes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reviewhelpfulvote',
+            unique_together={('review', 'user')},
+        ),
+    ]
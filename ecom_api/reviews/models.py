@@ -1,3 +1,153 @@
-from django.db import models
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.db.models import Case, DecimalField, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Now, Round
 
-# Create your models here.
+from notifications.utils import notify
+from products.models import Product
+from vendors.storefront import invalidate_product_vendors
+
+
+def adjust_product_rating(product_id, rating, delta):
+    """
+    Add (``delta=1``) or remove (``delta=-1``) one approved ``rating`` from
+    a product's aggregates and star counters in one UPDATE.
+
+    ``average_rating`` is assigned first: MySQL evaluates SET assignments
+    left to right using already-updated values, so computing it before
+    ``review_count``/``rating_sum`` change keeps the statement correct on
+    every backend.
+    """
+    new_count = F('review_count') + Value(delta)
+    new_sum = F('rating_sum') + Value(delta * rating)
+    star_field = f'rating_{rating}'
+    updated = Product.objects.filter(pk=product_id).update(
+        average_rating=Case(
+            When(
+                Q(review_count__gt=-delta),
+                then=Round(Cast(new_sum, FloatField()) / new_count, 2),
+            ),
+            default=Value(0),
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        ),
+        review_count=new_count,
+        rating_sum=new_sum,
+        **{star_field: F(star_field) + Value(delta)},
+        updated_at=Now(),
+    )
+    # The rating and review count show on the vendor's storefront pages
+    invalidate_product_vendors(Product.objects.filter(pk=product_id))
+    return updated
+
+
+class ProductReview(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+    )
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='reviews'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='reviews'
+    )
+    rating = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(5)]
+    )
+    title = models.CharField(max_length=200, blank=True, default='')
+    comment = models.TextField(blank=True, default='')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    is_verified_purchase = models.BooleanField(default=False)
+    helpful_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'product_reviews'
+        ordering = ['-created_at']
+        unique_together = ['product', 'user']
+        verbose_name = 'Product Review'
+        verbose_name_plural = 'Product Reviews'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            # Keyset-paginated listings on the product page
+            models.Index(fields=['product', 'status', '-created_at', '-id']),
+            models.Index(fields=['product', 'status', '-helpful_count', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.rating}* on {self.product_id} by {self.user_id}"
+
+    def _transition(self, status):
+        """
+        Move the review to ``status`` and adjust the product aggregates.
+
+        The current row is locked so concurrent moderators cannot count the
+        same review twice. Returns False if the review already had ``status``.
+        """
+        with transaction.atomic():
+            current = ProductReview.objects.select_for_update().filter(
+                pk=self.pk
+            ).values_list('status', 'rating', 'user_id').first()
+            if current is None or current[0] == status:
+                return False
+            old_status, rating, user_id = current
+            was, now = old_status == 'approved', status == 'approved'
+            ProductReview.objects.filter(pk=self.pk).update(status=status)
+            if was != now:
+                adjust_product_rating(self.product_id, rating, 1 if now else -1)
+            if now:
+                notify(
+                    [user_id],
+                    'review_approved',
+                    'Your review has been published',
+                    data={'review': self.pk, 'product': self.product_id},
+                )
+        self.status = status
+        return True
+
+    def approve(self):
+        return self._transition('approved')
+
+    def reject(self):
+        return self._transition('rejected')
+
+    def delete(self, *args, **kwargs):
+        # The pre_delete receiver takes it out of the aggregates first
+        # (see reviews.signals), including when a user's reviews cascade
+        return super().delete(*args, **kwargs)
+
+
+class ReviewHelpfulVote(models.Model):
+    """A user marking a review as helpful; counted in ``helpful_count``."""
+    review = models.ForeignKey(
+        ProductReview,
+        on_delete=models.CASCADE,
+        related_name='helpful_votes'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='review_helpful_votes'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'review_helpful_votes'
+        unique_together = ['review', 'user']
+        verbose_name = 'Review Helpful Vote'
+        verbose_name_plural = 'Review Helpful Votes'
+
+    def __str__(self):
+        return f"{self.user_id} found {self.review_id} helpful"
@@ -0,0 +1,14 @@
+from rest_framework.permissions import BasePermission
+
+
+def is_moderator(user):
+    return bool(
+        user and user.is_authenticated and (user.is_staff or user.role in ("admin", "staff"))
+    )
+
+
+class IsModerator(BasePermission):
+    """Admins and staff, who approve and reject reviews."""
+
+    def has_permission(self, request, view):
+        return is_moderator(request.user)
@@ -0,0 +1,42 @@
+from rest_framework import serializers
+
+from products.models import Product
+from .models import ProductReview
+
+
+class ProductReviewSerializer(serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(
+        queryset=Product.objects.filter(is_active=True)
+    )
+    user_name = serializers.CharField(source="user.first_name", read_only=True)
+
+    class Meta:
+        model = ProductReview
+        fields = (
+            "id",
+            "product",
+            "user_name",
+            "rating",
+            "title",
+            "comment",
+            "status",
+            "is_verified_purchase",
+            "helpful_count",
+            "created_at",
+        )
+        read_only_fields = ("status", "is_verified_purchase", "helpful_count")
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            attrs.pop("product", None)
+        return attrs
+
+
+class RatingSummarySerializer(serializers.ModelSerializer):
+    distribution = serializers.DictField(
+        source="rating_distribution", child=serializers.IntegerField()
+    )
+
+    class Meta:
+        model = Product
+        fields = ("average_rating", "review_count", "distribution")
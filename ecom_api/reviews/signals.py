@@ -0,0 +1,24 @@
+"""
+Keep product rating aggregates in step with deleted reviews.
+
+Every delete path (``review.delete()``, ``QuerySet.delete()``, the admin's
+"Delete selected" action and cascades from a deleted user) sends
+``pre_delete`` for each review, so an approved review is taken out of its
+product's aggregates before the row goes away.
+"""
+from django.db.models import QuerySet
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from products.models import Product
+from .models import ProductReview
+
+
+@receiver(pre_delete, sender=ProductReview)
+def remove_deleted_rating(sender, instance, origin=None, **kwargs):
+    # A deleted product takes its aggregates with it
+    if isinstance(origin, Product) or (
+        isinstance(origin, QuerySet) and origin.model is Product
+    ):
+        return
+    instance.reject()
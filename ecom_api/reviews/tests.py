@@ -1,3 +1,251 @@
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from benchmarks.seed import seed_all
+from ecom_api.query_budget import QueryBudgetMixin
+from orders.models import Order, OrderItem
+from products.models import Product
+from .models import ProductReview, ReviewHelpfulVote
+from .urls import query_budgets, urlpatterns
+
+
+class ProductReviewTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 1, "products": 2, "variants": 0, "users": 50})
+        users = list(User.objects.filter(email__startswith="bench-user-").order_by("id"))
+        cls.author, cls.customer = users[:2]
+        cls.moderator = User.objects.create_user(
+            email="moderator@example.com", password="x", role="staff"
+        )
+        cls.product, cls.other_product = Product.objects.order_by("id")
+        # Existing approved reviews: the aggregates must not be recounted
+        ProductReview.objects.bulk_create(
+            [
+                ProductReview(
+                    product=cls.product, user=user, rating=index % 5 + 1, status="approved"
+                )
+                for index, user in enumerate(users[2:])
+            ]
+        )
+        cls.product.update_rating()
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def aggregates(self, product=None):
+        return Product.objects.values_list(
+            "average_rating",
+            "review_count",
+            "rating_sum",
+            "rating_1",
+            "rating_2",
+            "rating_3",
+            "rating_4",
+            "rating_5",
+        ).get(pk=(product or self.product).pk)
+
+    def recounted(self, product=None):
+        product = Product.objects.get(pk=(product or self.product).pk)
+        product.update_rating()
+        return self.aggregates(product)
+
+    def review(self, rating=5, status="pending", product=None):
+        return ProductReview.objects.create(
+            product=product or self.product, user=self.author, rating=rating, status=status
+        )
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_create_review_is_pending(self):
+        response = self.assertWithinQueryBudget(
+            "create_review",
+            self.client_for(self.author).post,
+            reverse("create_review"),
+            {"product": self.product.id, "rating": 4, "title": "Good"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["data"]["status"], "pending")
+        self.assertFalse(response.data["data"]["is_verified_purchase"])
+        self.assertEqual(self.aggregates(), self.recounted())
+
+        response = self.client_for(self.author).post(
+            reverse("create_review"),
+            {"product": self.product.id, "rating": 1},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_verified_purchase(self):
+        order = Order.objects.create(
+            order_number="ORD-REV-1", user=self.author, subtotal=1, total=1, status="paid"
+        )
+        OrderItem.objects.create(
+            order=order,
+            product=self.product,
+            product_name="x",
+            sku="x",
+            unit_price=1,
+            quantity=1,
+            line_total=1,
+        )
+        response = self.client_for(self.author).post(
+            reverse("create_review"), {"product": self.product.id, "rating": 5}, format="json"
+        )
+        self.assertTrue(response.data["data"]["is_verified_purchase"])
+
+    def test_approve_adjusts_aggregates_incrementally(self):
+        review = self.review(rating=1)
+        response = self.assertWithinQueryBudget(
+            "approve_review",
+            self.client_for(self.moderator).post,
+            reverse("approve_review", kwargs={"pk": review.pk}),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.aggregates()[1], 49)
+        self.assertEqual(self.aggregates(), self.recounted())
+
+        # Approving again must not count the review twice
+        review.approve()
+        self.assertEqual(self.aggregates()[1], 49)
+        self.assertEqual(
+            self.author.notifications.filter(kind="review_approved").count(), 1
+        )
+
+    def test_reject_and_delete_remove_the_rating(self):
+        review = self.review(rating=5)
+        review.approve()
+        self.assertWithinQueryBudget(
+            "reject_review",
+            self.client_for(self.moderator).post,
+            reverse("reject_review", kwargs={"pk": review.pk}),
+        )
+        self.assertEqual(self.aggregates()[1], 48)
+        self.assertEqual(self.aggregates(), self.recounted())
+
+        review.approve()
+        response = self.assertWithinQueryBudget(
+            "review_detail",
+            self.client_for(self.author).delete,
+            reverse("review_detail", kwargs={"pk": review.pk}),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.aggregates(), self.recounted())
+
+    def test_last_review_removed_resets_average(self):
+        review = self.review(rating=3, product=self.other_product)
+        review.approve()
+        self.assertEqual(
+            self.aggregates(self.other_product), (Decimal("3.00"), 1, 3, 0, 0, 1, 0, 0)
+        )
+        review.delete()
+        self.assertEqual(
+            self.aggregates(self.other_product), (Decimal("0.00"), 0, 0, 0, 0, 0, 0, 0)
+        )
+
+    def test_bulk_and_cascaded_deletes_remove_the_rating(self):
+        self.review(rating=5).approve()
+        ProductReview.objects.create(
+            product=self.product, user=self.customer, rating=2
+        ).approve()
+        ProductReview.objects.filter(user=self.author).delete()
+        self.assertEqual(self.aggregates()[1], 49)
+        self.assertEqual(self.aggregates(), self.recounted())
+
+        self.customer.delete()
+        self.assertEqual(self.aggregates()[1], 48)
+        self.assertEqual(self.aggregates(), self.recounted())
+
+    def test_migration_fills_the_histogram_of_approved_reviews(self):
+        migration = import_module("products.migrations.0007_fill_rating_histogram")
+        Product.objects.update(**{f"rating_{stars}": 0 for stars in range(1, 6)})
+        migration.fill_rating_histogram(apps, None)
+        self.assertEqual(self.aggregates()[3:], (10, 10, 10, 9, 9))
+        self.assertEqual(self.aggregates(), self.recounted())
+
+    def test_edit_sends_review_back_to_moderation(self):
+        review = self.review(rating=5)
+        review.approve()
+        response = self.assertWithinQueryBudget(
+            "review_detail",
+            self.client_for(self.author).patch,
+            reverse("review_detail", kwargs={"pk": review.pk}),
+            {"rating": 2},
+            format="json",
+        )
+        self.assertEqual(response.data["data"]["status"], "pending")
+        self.assertEqual(response.data["data"]["rating"], 2)
+        self.assertEqual(self.aggregates(), self.recounted())
+
+    def test_only_moderators_can_approve(self):
+        review = self.review()
+        response = self.client_for(self.customer).post(
+            reverse("approve_review", kwargs={"pk": review.pk})
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_product_reviews_are_keyset_paginated(self):
+        ProductReview.objects.filter(product=self.product).update(
+            helpful_count=F("id") % 7
+        )
+        for sort, ordering in (
+            ("recent", ("-created_at", "-id")),
+            ("helpful", ("-helpful_count", "-id")),
+        ):
+            ids = []
+            url = reverse("product_reviews", kwargs={"product_id": self.product.pk})
+            url += f"?sort={sort}&page_size=20"
+            while url:
+                response = self.assertWithinQueryBudget(
+                    "product_reviews", self.client.get, url
+                )
+                data = response.data["data"]
+                ids += [review["id"] for review in data["results"]]
+                url = data["next"]
+            expected = list(
+                ProductReview.objects.filter(product=self.product, status="approved")
+                .order_by(*ordering)
+                .values_list("id", flat=True)
+            )
+            self.assertEqual(ids, expected)
+
+        summary = data["summary"]
+        self.assertEqual(summary["review_count"], 48)
+        star_counts = self.recounted()[3:]
+        self.assertEqual(
+            summary["distribution"],
+            {str(stars): count for stars, count in zip(range(1, 6), star_counts)},
+        )
+
+    def test_helpful_votes_count_once_per_user(self):
+        review = self.review(rating=4)
+        review.approve()
+        url = reverse("review_helpful", kwargs={"pk": review.pk})
+        client = self.client_for(self.customer)
+        for _ in range(2):
+            response = self.assertWithinQueryBudget("review_helpful", client.post, url)
+            self.assertEqual(response.status_code, 200)
+        review.refresh_from_db()
+        self.assertEqual(review.helpful_count, 1)
 
-# Create your tests here.
+        self.assertWithinQueryBudget("review_helpful", client.delete, url)
+        review.refresh_from_db()
+        self.assertEqual(review.helpful_count, 0)
+        self.assertFalse(ReviewHelpfulVote.objects.exists())
@@ -0,0 +1,23 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.create_review, name="create_review"),
+    path(
+        "products/<int:product_id>/", views.product_reviews, name="product_reviews"
+    ),
+    path("<int:pk>/", views.review_detail, name="review_detail"),
+    path("<int:pk>/approve/", views.approve_review, name="approve_review"),
+    path("<int:pk>/reject/", views.reject_review, name="reject_review"),
+    path("<int:pk>/helpful/", views.review_helpful, name="review_helpful"),
+]
+
+# Maximum SQL queries per request, enforced by reviews/tests.py
+query_budgets = {
+    "product_reviews": 2,
+    "create_review": 5,
+    "review_detail": 11,
+    "approve_review": 10,
+    "reject_review": 7,
+    "review_helpful": 7,
+}
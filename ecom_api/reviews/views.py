@@ -1,3 +1,234 @@
-from django.shortcuts import render
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from ecom_api.pagination import KeysetPagination
+from orders.models import OrderItem
+from products.models import Product
+from .models import ProductReview, ReviewHelpfulVote
+from .permissions import IsModerator, is_moderator
+from .serializers import ProductReviewSerializer, RatingSummarySerializer
+
+PURCHASED_ORDER_STATUSES = ("paid", "processing", "shipped", "delivered")
+
+# Keyset orderings for the product review list; each matches an index
+REVIEW_ORDERINGS = {
+    "recent": ("-created_at", "-id"),
+    "helpful": ("-helpful_count", "-id"),
+}
+
+
+def invalid_review_response(errors):
+    return Response(
+        {
+            "success": False,
+            "message": "Invalid review",
+            "code": "invalid_review",
+            "errors": errors,
+        },
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+def review_not_found_response():
+    return Response(
+        {"success": False, "message": "Review not found", "code": "not_found"},
+        status=status.HTTP_404_NOT_FOUND,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def product_reviews(request, product_id):
+    """
+    Rating summary and approved reviews of a product.
+    GET /api/reviews/products/<product_id>/?sort=recent|helpful&cursor=...
+
+    The star distribution is read from counters on the product row and the
+    reviews are keyset paginated, so this is two indexed reads.
+    """
+    ordering = REVIEW_ORDERINGS.get(request.query_params.get("sort", "recent"))
+    if ordering is None:
+        return Response(
+            {
+                "success": False,
+                "message": f"sort must be one of: {', '.join(REVIEW_ORDERINGS)}",
+                "code": "invalid_sort",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    product = (
+        Product.objects.filter(pk=product_id, is_active=True)
+        .only(
+            "average_rating",
+            "review_count",
+            *(f"rating_{stars}" for stars in range(1, 6)),
+        )
+        .first()
+    )
+    if product is None:
+        return Response(
+            {"success": False, "message": "Product not found", "code": "not_found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    paginator = KeysetPagination(ordering=ordering)
+    reviews = paginator.paginate_queryset(
+        ProductReview.objects.filter(
+            product_id=product.pk, status="approved"
+        ).select_related("user"),
+        request,
+    )
+    return Response(
+        {
+            "success": True,
+            "message": "Reviews retrieved successfully",
+            "data": {
+                "summary": RatingSummarySerializer(product).data,
+                **paginator.get_paginated_data(
+                    ProductReviewSerializer(reviews, many=True).data
+                ),
+            },
+        }
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def create_review(request):
+    """
+    Review a product. Reviews are published once a moderator approves them.
+    POST /api/reviews/
+    {"product": 1, "rating": 5, "title": "...", "comment": "..."}
+    """
+    serializer = ProductReviewSerializer(data=request.data)
+    if not serializer.is_valid():
+        return invalid_review_response(serializer.errors)
+
+    product = serializer.validated_data["product"]
+    verified = OrderItem.objects.filter(
+        order__user=request.user,
+        order__status__in=PURCHASED_ORDER_STATUSES,
+        product=product,
+    ).exists()
+    try:
+        with transaction.atomic():
+            review = serializer.save(user=request.user, is_verified_purchase=verified)
+    except IntegrityError:
+        return invalid_review_response(
+            {"product": ["You have already reviewed this product."]}
+        )
+    return Response(
+        {
+            "success": True,
+            "message": "Review submitted for moderation",
+            "data": ProductReviewSerializer(review).data,
+        },
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@api_view(["PATCH", "DELETE"])
+@permission_classes([IsAuthenticated])
+def review_detail(request, pk):
+    """
+    Edit or delete a review.
+    PATCH /api/reviews/<id>/   (author; the review goes back to moderation)
+    DELETE /api/reviews/<id>/  (author or moderator)
+    """
+    review = ProductReview.objects.select_related("user").filter(pk=pk).first()
+    if review is None or (
+        review.user_id != request.user.id and not is_moderator(request.user)
+    ):
+        return review_not_found_response()
+
+    if request.method == "DELETE":
+        review.delete()
+        return Response({"success": True, "message": "Review deleted successfully"})
+
+    if review.user_id != request.user.id:
+        return review_not_found_response()
+    serializer = ProductReviewSerializer(review, data=request.data, partial=True)
+    if not serializer.is_valid():
+        return invalid_review_response(serializer.errors)
+    with transaction.atomic():
+        # Take the old rating out of the aggregates until it is re-approved
+        review._transition("pending")
+        review = serializer.save()
+    return Response(
+        {
+            "success": True,
+            "message": "Review updated and resubmitted for moderation",
+            "data": ProductReviewSerializer(review).data,
+        }
+    )
+
+
+def moderate(pk, action):
+    review = ProductReview.objects.select_related("user").filter(pk=pk).first()
+    if review is None:
+        return review_not_found_response()
+    getattr(review, action)()
+    return Response(
+        {
+            "success": True,
+            "message": f"Review {review.status}",
+            "data": ProductReviewSerializer(review).data,
+        }
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsModerator])
+def approve_review(request, pk):
+    """POST /api/reviews/<id>/approve/"""
+    return moderate(pk, "approve")
+
+
+@api_view(["POST"])
+@permission_classes([IsModerator])
+def reject_review(request, pk):
+    """POST /api/reviews/<id>/reject/"""
+    return moderate(pk, "reject")
+
+
+@api_view(["POST", "DELETE"])
+@permission_classes([IsAuthenticated])
+def review_helpful(request, pk):
+    """
+    Mark (POST) or unmark (DELETE) an approved review as helpful.
+    POST /api/reviews/<id>/helpful/
+    """
+    if not ProductReview.objects.filter(pk=pk, status="approved").exists():
+        return review_not_found_response()
+
+    with transaction.atomic():
+        if request.method == "POST":
+            try:
+                with transaction.atomic():
+                    ReviewHelpfulVote.objects.create(review_id=pk, user=request.user)
+                changed = 1
+            except IntegrityError:
+                changed = 0
+        else:
+            deleted, _ = ReviewHelpfulVote.objects.filter(
+                review_id=pk, user=request.user
+            ).delete()
+            changed = -deleted
+        if changed:
+            ProductReview.objects.filter(pk=pk).update(
+                helpful_count=F("helpful_count") + changed
+            )
+    return Response(
+        {
+            "success": True,
+            "message": (
+                "Review marked as helpful"
+                if request.method == "POST"
+                else "Helpful vote removed"
+            ),
+        }
+    )
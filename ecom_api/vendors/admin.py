@@ -1,3 +1,12 @@
 from django.contrib import admin
+from .models import VendorDashboardSummary
 
-# Register your models here.
+
+@admin.register(VendorDashboardSummary)
+class VendorDashboardSummaryAdmin(admin.ModelAdmin):
+	list_display = (
+		'vendor', 'product_count', 'active_count', 'low_stock_count',
+		'out_of_stock_count', 'stock_value', 'updated_at'
+	)
+	search_fields = ('vendor__name', 'vendor__slug')
+	readonly_fields = [field.name for field in VendorDashboardSummary._meta.fields]
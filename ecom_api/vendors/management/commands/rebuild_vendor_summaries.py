@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from vendors.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dashboard summary row of every vendor (or of the given "
+        "vendor ids) from the products table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("vendor_ids", nargs="*", type=int)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_summaries(
+            options["vendor_ids"] or None, batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} vendor summaries"))
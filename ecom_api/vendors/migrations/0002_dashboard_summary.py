@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorDashboardSummary',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_summary', serialize=False, to='vendors.vendor')),
+                ('product_count', models.IntegerField(default=0)),
+                ('active_count', models.IntegerField(default=0)),
+                ('draft_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('low_stock_count', models.IntegerField(default=0)),
+                ('out_of_stock_count', models.IntegerField(default=0)),
+                ('stock_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Vendor Dashboard Summary',
+                'verbose_name_plural': 'Vendor Dashboard Summaries',
+                'db_table': 'vendor_dashboard_summaries',
+            },
+        ),
+    ]
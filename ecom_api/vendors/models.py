@@ -33,3 +33,33 @@ class Vendor(models.Model):
 				counter += 1
 			self.slug = slug
 		super().save(*args, **kwargs)
+
+
+class VendorDashboardSummary(models.Model):
+	"""
+	Product aggregates of one vendor, maintained by ``vendors.summary`` so
+	the dashboard reads a single row instead of scanning the catalog.
+	"""
+	vendor = models.OneToOneField(
+		Vendor,
+		on_delete=models.CASCADE,
+		primary_key=True,
+		related_name='dashboard_summary'
+	)
+	product_count = models.IntegerField(default=0)
+	active_count = models.IntegerField(default=0)
+	draft_count = models.IntegerField(default=0)
+	pending_count = models.IntegerField(default=0)
+	low_stock_count = models.IntegerField(default=0)
+	out_of_stock_count = models.IntegerField(default=0)
+	# Sum of cost_price * stock_quantity; products without a cost count as 0
+	stock_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		db_table = 'vendor_dashboard_summaries'
+		verbose_name = 'Vendor Dashboard Summary'
+		verbose_name_plural = 'Vendor Dashboard Summaries'
+
+	def __str__(self):
+		return f"Summary of vendor {self.vendor_id}"
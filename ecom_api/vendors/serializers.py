@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from .models import VendorDashboardSummary
+
+
+class VendorDashboardSummarySerializer(serializers.ModelSerializer):
+    vendor = serializers.CharField(source="vendor.slug", read_only=True)
+    vendor_name = serializers.CharField(source="vendor.name", read_only=True)
+
+    class Meta:
+        model = VendorDashboardSummary
+        fields = (
+            "vendor",
+            "vendor_name",
+            "product_count",
+            "active_count",
+            "draft_count",
+            "pending_count",
+            "low_stock_count",
+            "out_of_stock_count",
+            "stock_value",
+            "updated_at",
+        )
@@ -0,0 +1,107 @@
+"""
+Keep ``VendorDashboardSummary`` and the cached storefront pages in step
+with product, product image and vendor writes.
+
+``Product.from_db`` keeps the values a product was loaded with (and
+``refresh_from_db`` replaces them), so working out what a save changed costs
+no query. Products saved without having been
+loaded (or loaded with ``only()``) read their old values in ``pre_save``.
+"""
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from ecom_api.routers import use_primary
+from products.models import Product, ProductImage
+from .models import Vendor, VendorDashboardSummary
+from .storefront import invalidate_product_vendors, invalidate_vendor
+from .summary import SUMMARY_FIELDS, record_change
+
+
+def current_values(instance):
+    return {name: getattr(instance, name) for name in SUMMARY_FIELDS}
+
+
+def loaded_values(instance):
+    loaded = getattr(instance, "_loaded_values", None) or {}
+    if all(name in loaded for name in SUMMARY_FIELDS):
+        return {name: loaded[name] for name in SUMMARY_FIELDS}
+    return None
+
+
+@receiver(pre_save, sender=Product)
+def remember_summary_values(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._summary_before = None
+        return
+    before = loaded_values(instance)
+    if before is None:
+        with use_primary():
+            before = (
+                Product.objects.filter(pk=instance.pk).values(*SUMMARY_FIELDS).first()
+            )
+    instance._summary_before = before
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    after = current_values(instance)
+    before = None if created else getattr(instance, "_summary_before", None)
+    record_change(before, after)
+    for vendor_id in {before and before["vendor_id"], after["vendor_id"]} - {None}:
+        invalidate_vendor(vendor_id)
+    # A second save() of the same instance must diff against this one
+    instance._loaded_values = {**getattr(instance, "_loaded_values", {}), **after}
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, origin=None, **kwargs):
+    if getattr(origin, "model", type(origin)) is Vendor:
+        # The vendor and its summary row are being deleted too
+        return
+    before = loaded_values(instance) or current_values(instance)
+    record_change(before, None)
+    if before["vendor_id"]:
+        invalidate_vendor(before["vendor_id"])
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, raw=False, origin=None, **kwargs):
+    # Storefront cards show the product's main image
+    if raw or isinstance(origin, Product) or (
+        isinstance(origin, QuerySet) and origin.model is Product
+    ):
+        # A deleted product invalidates its vendor itself
+        return
+    invalidate_product_vendors(Product.objects.filter(pk=instance.product_id))
+
+
+@receiver(pre_save, sender=Vendor)
+def remember_vendor_slug(sender, instance, raw=False, **kwargs):
+    instance._previous_slug = None
+    if raw or instance._state.adding:
+        return
+    with use_primary():
+        instance._previous_slug = (
+            Vendor.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Vendor)
+def vendor_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        VendorDashboardSummary.objects.get_or_create(vendor=instance)
+    # A renamed slug must stop resolving from the cache as well
+    invalidate_vendor(
+        instance.pk, instance.slug, getattr(instance, "_previous_slug", None)
+    )
+
+
+@receiver(post_delete, sender=Vendor)
+def vendor_deleted(sender, instance, **kwargs):
+    invalidate_vendor(instance.pk, instance.slug)
@@ -0,0 +1,106 @@
+"""
+Cached vendor storefront pages.
+
+Every cached page of a vendor's storefront has the vendor's cache version
+in its key::
+
+    vendor:<id>:v<version>:products:<hash of the query string>
+
+Changing one of the vendor's products (through ``save()``, or the stock and
+rating UPDATEs that call ``invalidate_product_vendors``) or their images
+bumps only that vendor's version, so all of its pages miss from then on (and
+expire on their own) while every other vendor's pages stay cached. Renaming
+a category does not: the cards' category names catch up when the pages
+expire after ``VENDOR_STOREFRONT_CACHE_TIMEOUT``. Versions start from the
+current time in milliseconds rather than 1, so a version key that was
+evicted can never come back with a number that old pages were stored under.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Vendor
+
+
+def version_key(vendor_id):
+    return f"vendor:{vendor_id}:version"
+
+
+def slug_key(slug):
+    return f"vendor:slug:{slug}"
+
+
+def _initial_version():
+    return time.time_ns() // 1_000_000
+
+
+def get_version(vendor_id):
+    key = version_key(vendor_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(vendor_id):
+    """Invalidate every cached storefront page of ``vendor_id``."""
+    key = version_key(vendor_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def invalidate_vendor(vendor_id, *slugs):
+    """
+    Bump the vendor's version, and forget the cached lookups of ``slugs``,
+    once the current transaction commits.
+    """
+
+    def invalidate():
+        bump_version(vendor_id)
+        cache.delete_many([slug_key(slug) for slug in slugs if slug])
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_product_vendors(products):
+    """
+    Invalidate the storefronts of the vendors of ``products`` (a queryset).
+
+    For writes that bypass ``save()`` but change what the product cards
+    show, such as the stock and rating UPDATEs.
+    """
+    vendor_ids = (
+        products.filter(vendor__isnull=False)
+        .values_list("vendor_id", flat=True)
+        .distinct()
+    )
+    for vendor_id in vendor_ids:
+        invalidate_vendor(vendor_id)
+
+
+def get_vendor(slug):
+    """``{"id", "name", "slug", "description"}`` of an active vendor, or None."""
+    key = slug_key(slug)
+    vendor = cache.get(key)
+    if vendor is None:
+        vendor = (
+            Vendor.objects.filter(slug=slug, is_active=True)
+            .values("id", "name", "slug", "description")
+            .first()
+        ) or {}
+        cache.set(key, vendor, timeout=settings.VENDOR_STOREFRONT_CACHE_TIMEOUT)
+    return vendor or None
+
+
+def page_key(vendor_id, query_params):
+    """Cache key of a storefront page; parameter order does not matter."""
+    query_string = urlencode(sorted(query_params.lists()), doseq=True)
+    digest = hashlib.md5(query_string.encode()).hexdigest()
+    return f"vendor:{vendor_id}:v{get_version(vendor_id)}:products:{digest}"
@@ -0,0 +1,140 @@
+"""
+Per-vendor dashboard aggregates.
+
+``VendorDashboardSummary`` holds one row of counters per vendor. Product
+saves and deletes adjust it incrementally through the signal handlers in
+``vendors.signals``: the handler compares the product's values as loaded
+with its values as saved and applies the difference to the vendor's row in
+one UPDATE, so the dashboard never scans the vendor's products.
+
+Bulk writes skip those signals (``bulk_create``, ``QuerySet.update`` and the
+stock reservation UPDATEs), so ``rebuild_summaries`` recomputes every row
+from one grouped aggregate query. It runs hourly and from the
+``rebuild_vendor_summaries`` management command.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from ecom_api.routers import use_primary
+from products.models import Product
+from .models import Vendor, VendorDashboardSummary
+
+#: Product fields the summary depends on
+SUMMARY_FIELDS = (
+    "vendor_id",
+    "is_active",
+    "status",
+    "cost_price",
+    "stock_quantity",
+    "track_inventory",
+    "low_stock_threshold",
+)
+COUNTERS = (
+    "product_count",
+    "active_count",
+    "draft_count",
+    "pending_count",
+    "low_stock_count",
+    "out_of_stock_count",
+    "stock_value",
+)
+
+
+def contribution(values):
+    """What one product with ``values`` (SUMMARY_FIELDS) adds to its vendor's row."""
+    stock = values["stock_quantity"] or 0
+    tracked = values["track_inventory"]
+    return {
+        "product_count": 1,
+        "active_count": int(values["is_active"]),
+        "draft_count": int(values["status"] == "draft"),
+        "pending_count": int(values["status"] == "pending"),
+        "low_stock_count": int(
+            tracked and 0 < stock <= values["low_stock_threshold"]
+        ),
+        "out_of_stock_count": int(tracked and stock == 0),
+        "stock_value": (values["cost_price"] or Decimal("0")) * stock,
+    }
+
+
+def apply_delta(vendor_id, delta):
+    """Add ``delta`` (counter -> change) to the row of ``vendor_id``."""
+    delta = {name: change for name, change in delta.items() if change}
+    if vendor_id is None or not delta:
+        return
+    updated = VendorDashboardSummary.objects.filter(vendor_id=vendor_id).update(
+        **{name: F(name) + change for name, change in delta.items()}
+    )
+    if not updated:
+        # No row yet: build it from the products, which already include this change
+        rebuild_summaries([vendor_id])
+
+
+def record_change(before, after):
+    """
+    Adjust the summaries for a product going from ``before`` to ``after``
+    (dicts of SUMMARY_FIELDS; None for a created or deleted product).
+    """
+    old = contribution(before) if before else dict.fromkeys(COUNTERS, 0)
+    new = contribution(after) if after else dict.fromkeys(COUNTERS, 0)
+    old_vendor = before["vendor_id"] if before else None
+    new_vendor = after["vendor_id"] if after else None
+    if old_vendor == new_vendor:
+        apply_delta(new_vendor, {name: new[name] - old[name] for name in COUNTERS})
+    else:
+        apply_delta(old_vendor, {name: -old[name] for name in COUNTERS})
+        apply_delta(new_vendor, new)
+
+
+def aggregate_products(vendor_ids=None):
+    """Summary counters per vendor id, computed from the products."""
+    products = Product.objects.filter(vendor__isnull=False)
+    if vendor_ids is not None:
+        products = products.filter(vendor_id__in=vendor_ids)
+    rows = (
+        products.values("vendor_id")
+        .annotate(
+            product_count=Count("id"),
+            active_count=Count("id", filter=Q(is_active=True)),
+            draft_count=Count("id", filter=Q(status="draft")),
+            pending_count=Count("id", filter=Q(status="pending")),
+            low_stock_count=Count("id", filter=Q(low_stock=True)),
+            out_of_stock_count=Count(
+                "id", filter=Q(track_inventory=True, stock_quantity=0)
+            ),
+            stock_value=Coalesce(
+                Sum(
+                    F("cost_price") * F("stock_quantity"),
+                    output_field=DecimalField(max_digits=16, decimal_places=2),
+                ),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=16, decimal_places=2),
+            ),
+        )
+        .order_by()
+    )
+    return {row.pop("vendor_id"): row for row in rows}
+
+
+def rebuild_summaries(vendor_ids=None, batch_size=1000):
+    """
+    Recompute the summary rows of ``vendor_ids`` (every vendor by default)
+    with one aggregate query and write them in bulk; returns the row count.
+    """
+    with use_primary():
+        if vendor_ids is None:
+            vendor_ids = list(Vendor.objects.values_list("id", flat=True))
+        else:
+            vendor_ids = list(vendor_ids)
+        totals = aggregate_products(vendor_ids)
+    summaries = [
+        VendorDashboardSummary(vendor_id=vendor_id, **totals.get(vendor_id, {}))
+        for vendor_id in vendor_ids
+    ]
+    with transaction.atomic():
+        VendorDashboardSummary.objects.filter(vendor_id__in=vendor_ids).delete()
+        VendorDashboardSummary.objects.bulk_create(summaries, batch_size=batch_size)
+    return len(summaries)
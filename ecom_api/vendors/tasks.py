@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .summary import rebuild_summaries
+
+
+@shared_task
+def rebuild_vendor_summaries():
+    """Recompute every vendor's dashboard summary from its products."""
+    return rebuild_summaries()
@@ -1,3 +1,290 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from benchmarks.seed import seed_all
+from ecom_api.query_budget import QueryBudgetMixin
+from inventory.reservations import release_reservations, reserve_stock
+from products.models import Product
+from reviews.models import adjust_product_rating
+from .models import Vendor, VendorDashboardSummary
+from .summary import aggregate_products, rebuild_summaries
+from .urls import query_budgets, urlpatterns
+
+
+class VendorDashboardSummaryTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 2, "products": 10, "variants": 0, "users": 1})
+        cls.vendor = Vendor.objects.create(name="Acme")
+        cls.other = Vendor.objects.create(name="Globex")
+        cls.staff = User.objects.create_user(
+            email="staff@example.com", password="x", is_staff=True
+        )
+        Product.objects.filter(
+            pk__in=Product.objects.order_by("id").values("pk")[:6]
+        ).update(
+            vendor=cls.vendor,
+            cost_price=Decimal("2.50"),
+            stock_quantity=10,
+            track_inventory=True,
+            low_stock_threshold=5,
+            status="approved",
+            is_active=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        rebuild_summaries()
+
+    def assertMatchesProducts(self, vendor=None):
+        vendor = vendor or self.vendor
+        expected = aggregate_products([vendor.pk]).get(vendor.pk)
+        summary = VendorDashboardSummary.objects.get(vendor=vendor)
+        for name, value in expected.items():
+            self.assertEqual(getattr(summary, name), value, name)
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_rebuild(self):
+        summary = VendorDashboardSummary.objects.get(vendor=self.vendor)
+        self.assertEqual(summary.product_count, 6)
+        self.assertEqual(summary.active_count, 6)
+        self.assertEqual(summary.stock_value, Decimal("150.00"))
+        self.assertEqual(
+            VendorDashboardSummary.objects.get(vendor=self.other).product_count, 0
+        )
+
+    def test_saves_adjust_the_summary(self):
+        product = self.vendor.products.order_by("id").first()
+        product.stock_quantity = 3
+        product.save()
+        product.status = "draft"
+        product.is_active = False
+        product.save()
+        self.assertMatchesProducts()
+        summary = VendorDashboardSummary.objects.get(vendor=self.vendor)
+        self.assertEqual(summary.low_stock_count, 1)
+        self.assertEqual(summary.draft_count, 1)
+        self.assertEqual(summary.active_count, 5)
+        self.assertEqual(summary.stock_value, Decimal("132.50"))
+
+        # Saving without loading reads the old values once
+        partial = Product.objects.only("id", "name").get(pk=product.pk)
+        partial.stock_quantity = 0
+        partial.save(update_fields=["stock_quantity"])
+        self.assertEqual(
+            VendorDashboardSummary.objects.get(vendor=self.vendor).out_of_stock_count, 1
+        )
+        self.assertMatchesProducts()
+
+    def test_save_after_refresh_diffs_against_the_refreshed_values(self):
+        product = self.vendor.products.order_by("id").first()
+        other_copy = Product.objects.get(pk=product.pk)
+        other_copy.stock_quantity = 0
+        other_copy.save()
+
+        product.refresh_from_db()
+        product.name = "Renamed"
+        product.save()
+        self.assertEqual(
+            VendorDashboardSummary.objects.get(vendor=self.vendor).out_of_stock_count, 1
+        )
+        self.assertMatchesProducts()
+
+        # Loading a deferred field also refreshes its baseline
+        partial = Product.objects.only("id", "name", "vendor_id").get(pk=product.pk)
+        Product.objects.filter(pk=product.pk).update(stock_quantity=4)
+        rebuild_summaries([self.vendor.pk])
+        self.assertEqual(partial.stock_quantity, 4)
+        partial.stock_quantity = 0
+        partial.save()
+        self.assertMatchesProducts()
+
+    def test_moving_and_deleting_products(self):
+        product = self.vendor.products.order_by("id").first()
+        product.vendor = self.other
+        product.save()
+        self.assertMatchesProducts()
+        self.assertMatchesProducts(self.other)
+
+        Product.objects.create(
+            vendor=self.other,
+            name="New",
+            description="New",
+            price=Decimal("9.99"),
+            cost_price=Decimal("4"),
+            stock_quantity=2,
+            status="pending",
+        )
+        product.delete()
+        self.assertMatchesProducts(self.other)
+        other = VendorDashboardSummary.objects.get(vendor=self.other)
+        self.assertEqual((other.product_count, other.pending_count), (1, 1))
+
+    def test_deleting_a_vendor(self):
+        self.vendor.delete()
+        self.assertFalse(
+            VendorDashboardSummary.objects.filter(vendor_id=self.vendor.pk).exists()
+        )
+
+    def test_command_rebuilds(self):
+        Product.objects.filter(vendor=self.vendor).update(stock_quantity=0)
+        call_command("rebuild_vendor_summaries", self.vendor.pk, stdout=StringIO())
+        self.assertEqual(
+            VendorDashboardSummary.objects.get(vendor=self.vendor).out_of_stock_count, 6
+        )
+
+    def test_dashboard_is_one_query(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = self.assertWithinQueryBudget(
+            "vendor_dashboard",
+            client.get,
+            reverse("vendor_dashboard", kwargs={"slug": self.vendor.slug}),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["product_count"], 6)
+        self.assertEqual(response.data["data"]["stock_value"], "150.00")
+
+        client.force_authenticate(User.objects.get(email="bench-user-0@example.com"))
+        response = client.get(
+            reverse("vendor_dashboard", kwargs={"slug": self.vendor.slug})
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class VendorStorefrontTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all(
+            {"categories": 2, "products": 12, "variants": 0, "images": 1, "users": 0}
+        )
+        cls.vendor = Vendor.objects.create(name="Acme")
+        cls.other = Vendor.objects.create(name="Globex")
+        ids = list(Product.objects.order_by("id").values_list("pk", flat=True))
+        Product.objects.filter(pk__in=ids[:5]).update(
+            vendor=cls.vendor, is_active=True, status="approved"
+        )
+        Product.objects.filter(pk__in=ids[5:8]).update(
+            vendor=cls.other, is_active=True, status="approved"
+        )
+        Product.objects.filter(pk=ids[4]).update(status="pending")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, vendor, **params):
+        return self.assertWithinQueryBudget(
+            "vendor_products",
+            self.client.get,
+            reverse("vendor_products", kwargs={"slug": vendor.slug}),
+            params,
+        )
+
+    def test_lists_active_approved_products(self):
+        response = self.get(self.vendor)
+        self.assertEqual(response.status_code, 200)
+        data = response.data["data"]
+        self.assertEqual(data["vendor"]["name"], "Acme")
+        self.assertEqual(len(data["results"]), 4)
+        self.assertTrue(data["results"][0]["main_image"])
+
+        response = self.get(self.vendor, page_size=3)
+        self.assertEqual(len(response.data["data"]["results"]), 3)
+        self.assertIsNotNone(response.data["data"]["next"])
+
+    def test_unknown_vendor(self):
+        response = self.client.get(reverse("vendor_products", kwargs={"slug": "nope"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached_pages_cost_no_queries(self):
+        self.get(self.vendor)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.get(self.vendor)
+        self.assertEqual(len(captured), 0)
+        self.assertEqual(len(response.data["data"]["results"]), 4)
+
+    def test_product_changes_only_invalidate_their_vendor(self):
+        self.get(self.vendor)
+        self.get(self.other)
+
+        product = self.vendor.products.filter(status="approved").order_by("id").first()
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = "Renamed"
+            product.save()
+
+        with CaptureQueriesContext(connection) as captured:
+            self.get(self.other)
+        self.assertEqual(len(captured), 0)
+
+        response = self.get(self.vendor)
+        names = [item["name"] for item in response.data["data"]["results"]]
+        self.assertIn("Renamed", names)
+
+    def card(self, product):
+        response = self.get(self.vendor)
+        results = response.data["data"]["results"]
+        return next(item for item in results if item["id"] == product.pk)
+
+    def test_stock_and_rating_updates_invalidate_the_vendor(self):
+        product = self.vendor.products.filter(status="approved").order_by("id").first()
+        Product.objects.filter(pk=product.pk).update(
+            stock_quantity=1, track_inventory=True, allow_backorder=False
+        )
+        self.assertTrue(self.card(product)["is_in_stock"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_stock([(product.pk, None, 1)], "ORD-SOLD-OUT")
+        self.assertFalse(self.card(product)["is_in_stock"])
+
+        with mock.patch("inventory.reservations.notify_back_in_stock"):
+            with self.captureOnCommitCallbacks(execute=True):
+                release_reservations("ORD-SOLD-OUT")
+        self.assertTrue(self.card(product)["is_in_stock"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_product_rating(product.pk, 4, 1)
+        card = self.card(product)
+        self.assertEqual((card["review_count"], card["average_rating"]), (1, "4.00"))
+
+    def test_image_changes_invalidate_the_vendor(self):
+        product = self.vendor.products.filter(status="approved").order_by("id").first()
+        image = product.images.get()
+        self.assertTrue(self.card(product)["main_image"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = "products/replaced.jpg"
+            image.save()
+        self.assertIn("products/replaced.jpg", self.card(product)["main_image"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertIsNone(self.card(product)["main_image"])
 
-# Create your tests here.
+    def test_renamed_slug_stops_resolving(self):
+        old_slug = self.vendor.slug
+        self.assertEqual(self.get(self.vendor).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendor.slug = "acme-renamed"
+            self.vendor.save()
+        response = self.client.get(
+            reverse("vendor_products", kwargs={"slug": old_slug})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.get(self.vendor).status_code, 200)
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("<slug:slug>/dashboard/", views.vendor_dashboard, name="vendor_dashboard"),
+    path("<slug:slug>/products/", views.vendor_products, name="vendor_products"),
+]
+
+# Maximum SQL queries per request, enforced by vendors/tests.py
+query_budgets = {
+    "vendor_dashboard": 1,
+    "vendor_products": 2,
+}
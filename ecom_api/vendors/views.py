@@ -1,3 +1,101 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
 
-# Create your views here.
+from ecom_api.pagination import KeysetPagination
+from products.models import Product
+from products.serializers import ProductListSerializer, main_image_subquery
+from .models import Vendor, VendorDashboardSummary
+from .serializers import VendorDashboardSummarySerializer
+from .storefront import get_vendor, page_key
+from .summary import rebuild_summaries
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def vendor_dashboard(request, slug):
+    """
+    Product counts, stock value and low-stock counts of a vendor.
+    GET /api/vendors/<slug>/dashboard/
+
+    Served from the vendor's precomputed summary row in one query.
+    """
+    summary = (
+        VendorDashboardSummary.objects.select_related("vendor")
+        .filter(vendor__slug=slug)
+        .first()
+    )
+    if summary is None:
+        vendor = Vendor.objects.filter(slug=slug).first()
+        if vendor is None:
+            return Response(
+                {"success": False, "message": "Vendor not found", "code": "not_found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        # Vendors added since the last rebuild get their row on first view
+        rebuild_summaries([vendor.pk])
+        summary = VendorDashboardSummary.objects.select_related("vendor").get(
+            vendor=vendor
+        )
+    return Response(
+        {
+            "success": True,
+            "message": "Vendor dashboard retrieved successfully",
+            "data": VendorDashboardSummarySerializer(summary).data,
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def vendor_products(request, slug):
+    """
+    A vendor's storefront: its active, approved products, newest first.
+    GET /api/vendors/<slug>/products/?cursor=<next cursor>&page_size=20
+
+    Pages are cached under the vendor's cache version, which changes
+    whenever one of the vendor's products does, so a cached page costs no
+    queries and other vendors' pages are never flushed.
+    """
+    vendor = get_vendor(slug)
+    if vendor is None:
+        return Response(
+            {"success": False, "message": "Vendor not found", "code": "not_found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    key = page_key(vendor["id"], request.query_params)
+    data = cache.get(key)
+    if data is None:
+        paginator = KeysetPagination()
+        products = paginator.paginate_queryset(
+            Product.objects.filter(
+                vendor_id=vendor["id"], is_active=True, status="approved"
+            )
+            .select_related("category")
+            .only(*ProductListSerializer.only_fields)
+            .annotate(main_image_path=main_image_subquery()),
+            request,
+        )
+        data = {
+            "vendor": {
+                "name": vendor["name"],
+                "slug": vendor["slug"],
+                "description": vendor["description"],
+            },
+            **paginator.get_paginated_data(
+                ProductListSerializer(products, many=True).data
+            ),
+        }
+        cache.set(key, data, timeout=settings.VENDOR_STOREFRONT_CACHE_TIMEOUT)
+
+    return Response(
+        {
+            "success": True,
+            "message": "Vendor products retrieved successfully",
+            "data": data,
+        }
+    )
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import WishlistItem
 
-# Register your models here.
+
+@admin.register(WishlistItem)
+class WishlistItemAdmin(admin.ModelAdmin):
+    list_display = ('user', 'product', 'created_at')
+    search_fields = ('user__email', 'product__name')
+    raw_id_fields = ('user', 'product')
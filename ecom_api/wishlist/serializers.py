@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+from products.models import Product
+from .models import WishlistItem
+
+
+class WishlistItemSerializer(serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(
+        queryset=Product.objects.filter(is_active=True)
+    )
+    name = serializers.CharField(source="product.name", read_only=True)
+    slug = serializers.CharField(source="product.slug", read_only=True)
+    price = serializers.DecimalField(
+        source="product.price", max_digits=10, decimal_places=2, read_only=True
+    )
+    is_active = serializers.BooleanField(source="product.is_active", read_only=True)
+
+    class Meta:
+        model = WishlistItem
+        fields = ("id", "product", "name", "slug", "price", "is_active", "created_at")
@@ -1,3 +1,112 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from benchmarks.seed import seed_all
+from ecom_api.query_budget import QueryBudgetMixin
+from products.models import Product
+from .models import WishlistItem
+from .urls import query_budgets, urlpatterns
+
+
+class WishlistTests(QueryBudgetMixin, TestCase):
+    query_budgets = query_budgets
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_all({"categories": 1, "products": 30, "variants": 0, "users": 2})
+        cls.user, cls.other = User.objects.filter(
+            email__startswith="bench-user-"
+        ).order_by("email")
+        cls.products = list(Product.objects.order_by("id"))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add(self, product, client=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.assertWithinQueryBudget(
+                "wishlist",
+                (client or self.client).post,
+                reverse("wishlist"),
+                {"product": product.pk},
+                format="json",
+            )
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlsHaveBudgets(urlpatterns)
+
+    def test_add_is_idempotent_and_counted(self):
+        self.assertEqual(self.add(self.products[0]).status_code, 201)
+        self.assertEqual(self.add(self.products[0]).status_code, 200)
+        other = APIClient()
+        other.force_authenticate(self.other)
+        self.add(self.products[0], client=other)
+
+        self.assertEqual(WishlistItem.objects.count(), 2)
+        response = self.assertWithinQueryBudget(
+            "wishlist_counts",
+            APIClient().get,
+            reverse("wishlist_counts"),
+            {"ids": f"{self.products[0].pk},{self.products[1].pk}"},
+        )
+        self.assertEqual(
+            response.data["data"],
+            {str(self.products[0].pk): 2, str(self.products[1].pk): 0},
+        )
+
+    def test_membership_for_a_page_comes_from_the_cache(self):
+        for product in self.products[:5]:
+            self.add(product)
+        page = ",".join(str(product.pk) for product in self.products[3:23])
+
+        response = self.assertWithinQueryBudget(
+            "wishlist_check", self.client.get, reverse("wishlist_check"), {"ids": page}
+        )
+        self.assertEqual(
+            response.data["data"]["wishlisted"],
+            [self.products[3].pk, self.products[4].pk],
+        )
+        with self.assertNumQueries(0):
+            self.client.get(reverse("wishlist_check"), {"ids": page})
+
+    def test_removing_invalidates_the_cached_ids(self):
+        self.add(self.products[0])
+        ids = str(self.products[0].pk)
+        self.assertEqual(
+            self.client.get(reverse("wishlist_check"), {"ids": ids}).data["data"],
+            {"wishlisted": [self.products[0].pk]},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.assertWithinQueryBudget(
+                "wishlist_item",
+                self.client.delete,
+                reverse("wishlist_item", kwargs={"product_id": self.products[0].pk}),
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get(reverse("wishlist_check"), {"ids": ids}).data["data"],
+            {"wishlisted": []},
+        )
+        self.assertEqual(
+            Product.objects.get(pk=self.products[0].pk).wishlist_count, 0
+        )
+
+    def test_list_is_keyset_paginated(self):
+        for product in self.products[:25]:
+            self.add(product)
+        ids = []
+        url = reverse("wishlist") + "?page_size=10"
+        while url:
+            response = self.assertWithinQueryBudget("wishlist", self.client.get, url)
+            ids += [item["product"] for item in response.data["data"]["results"]]
+            url = response.data["data"]["next"]
+        self.assertEqual(ids, [product.pk for product in reversed(self.products[:25])])
+
+    def test_invalid_ids(self):
+        response = self.client.get(reverse("wishlist_check"), {"ids": "1,x"})
+        self.assertEqual(response.status_code, 400)
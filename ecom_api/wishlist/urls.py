@@ -0,0 +1,17 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.wishlist, name="wishlist"),
+    path("check/", views.wishlist_check, name="wishlist_check"),
+    path("counts/", views.wishlist_popularity, name="wishlist_counts"),
+    path("<int:product_id>/", views.wishlist_item, name="wishlist_item"),
+]
+
+# Maximum SQL queries per request, enforced by wishlist/tests.py
+query_budgets = {
+    "wishlist": 5,
+    "wishlist_check": 1,
+    "wishlist_counts": 1,
+    "wishlist_item": 4,
+}
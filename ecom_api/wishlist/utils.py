@@ -0,0 +1,79 @@
+"""
+Wishlist membership.
+
+Listing pages ask "which of these 20-100 products has the user saved?".
+The ids of a user's wishlist are cached as one set, so answering that for
+a whole page is a set intersection: no query when the cache is warm and a
+single indexed query when it is not. Adding and removing items drops the
+cached set once the transaction commits.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from products.models import Product
+from .models import WishlistItem
+
+
+def wishlist_cache_key(user_id):
+    return f"wishlist:ids:{user_id}"
+
+
+def get_wishlist_ids(user):
+    """Set of product ids in ``user``'s wishlist."""
+    key = wishlist_cache_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = set(
+            WishlistItem.objects.filter(user=user).values_list("product_id", flat=True)
+        )
+        cache.set(key, ids, timeout=settings.WISHLIST_CACHE_TIMEOUT)
+    return ids
+
+
+def wishlisted(user, product_ids):
+    """The subset of ``product_ids`` that ``user`` has in the wishlist."""
+    if not user.is_authenticated:
+        return set()
+    return get_wishlist_ids(user) & set(product_ids)
+
+
+def _invalidate(user_id):
+    transaction.on_commit(lambda: cache.delete(wishlist_cache_key(user_id)))
+
+
+def add_to_wishlist(user, product_id):
+    """Returns False if the product was already in the wishlist."""
+    try:
+        with transaction.atomic():
+            WishlistItem.objects.create(user=user, product_id=product_id)
+            Product.objects.filter(pk=product_id).update(
+                wishlist_count=F("wishlist_count") + 1
+            )
+    except IntegrityError:
+        return False
+    _invalidate(user.pk)
+    return True
+
+
+def remove_from_wishlist(user, product_id):
+    """Returns False if the product was not in the wishlist."""
+    with transaction.atomic():
+        deleted, _ = WishlistItem.objects.filter(
+            user=user, product_id=product_id
+        ).delete()
+        if deleted:
+            Product.objects.filter(pk=product_id).update(
+                wishlist_count=F("wishlist_count") - 1
+            )
+    if deleted:
+        _invalidate(user.pk)
+    return bool(deleted)
+
+
+def wishlist_counts(product_ids):
+    """Wishlist count per product id, read from the counter column."""
+    return dict(
+        Product.objects.filter(pk__in=product_ids).values_list("id", "wishlist_count")
+    )
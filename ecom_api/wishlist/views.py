@@ -1,3 +1,148 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from ecom_api.pagination import KeysetPagination
+from .models import WishlistItem
+from .serializers import WishlistItemSerializer
+from .utils import (
+    add_to_wishlist,
+    remove_from_wishlist,
+    wishlist_counts,
+    wishlisted,
+)
+
+MAX_IDS = 100
+
+
+def parse_product_ids(request):
+    """``?ids=1,2,3`` as a list of ints; None if malformed or too long."""
+    try:
+        ids = [
+            int(value)
+            for value in request.query_params.get("ids", "").split(",")
+            if value
+        ]
+    except ValueError:
+        return None
+    return ids if len(ids) <= MAX_IDS else None
+
+
+def invalid_ids_response():
+    return Response(
+        {
+            "success": False,
+            "message": (
+                f"ids must be a comma separated list of at most {MAX_IDS} product ids"
+            ),
+            "code": "invalid_ids",
+        },
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+def wishlist(request):
+    """
+    List or add to the user's wishlist.
+    GET /api/wishlist/?cursor=...
+    POST /api/wishlist/  {"product": 1}
+    """
+    if request.method == "POST":
+        serializer = WishlistItemSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "success": False,
+                    "message": "Invalid wishlist item",
+                    "code": "invalid_wishlist_item",
+                    "errors": serializer.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        added = add_to_wishlist(request.user, serializer.validated_data["product"].pk)
+        return Response(
+            {
+                "success": True,
+                "message": "Added to wishlist" if added else "Already in wishlist",
+            },
+            status=status.HTTP_201_CREATED if added else status.HTTP_200_OK,
+        )
+
+    paginator = KeysetPagination()
+    items = paginator.paginate_queryset(
+        WishlistItem.objects.filter(user=request.user).select_related("product"),
+        request,
+    )
+    return Response(
+        {
+            "success": True,
+            "message": "Wishlist retrieved successfully",
+            "data": paginator.get_paginated_data(
+                WishlistItemSerializer(items, many=True).data
+            ),
+        }
+    )
+
+
+@api_view(["DELETE"])
+@permission_classes([IsAuthenticated])
+def wishlist_item(request, product_id):
+    """
+    Remove a product from the wishlist.
+    DELETE /api/wishlist/<product_id>/
+    """
+    if not remove_from_wishlist(request.user, product_id):
+        return Response(
+            {
+                "success": False,
+                "message": "Product is not in your wishlist",
+                "code": "not_found",
+            },
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response({"success": True, "message": "Removed from wishlist"})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def wishlist_check(request):
+    """
+    Which of a page of products are in the user's wishlist.
+    GET /api/wishlist/check/?ids=1,2,3
+
+    Answered from the cached set of wishlist ids (one query when cold).
+    """
+    product_ids = parse_product_ids(request)
+    if product_ids is None:
+        return invalid_ids_response()
+    return Response(
+        {
+            "success": True,
+            "message": "Wishlist membership retrieved successfully",
+            "data": {"wishlisted": sorted(wishlisted(request.user, product_ids))},
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def wishlist_popularity(request):
+    """
+    How many wishlists each product is in.
+    GET /api/wishlist/counts/?ids=1,2,3
+    """
+    product_ids = parse_product_ids(request)
+    if product_ids is None:
+        return invalid_ids_response()
+    return Response(
+        {
+            "success": True,
+            "message": "Wishlist counts retrieved successfully",
+            "data": {
+                str(pk): count for pk, count in wishlist_counts(product_ids).items()
+            },
+        }
+    )